@@ -0,0 +1,302 @@
+"""
+ReAct 循环端到端基准测试
+
+在 Xvfb 虚拟屏幕上（或 --display current 使用当前屏幕），以本地模拟 LLM 服务
+（gui_agent.testing.MockLLMServer）驱动完整的 ReActAgent 循环，按迭代拆分耗时：
+    
+    capture    截屏（后端抓取原始像素，不含等待界面稳定期间的采样）
+    encode     截图编码（PNG/JPEG/WEBP + base64）
+    serialize  请求序列化（构造 payload + JSON 编码）
+    http       HTTP 往返（含模拟服务的延迟与响应解析；流式模式下扣除生成期间执行工具的时间）
+    tool       工具执行中除截屏、编码、等待稳定之外的部分（输入注入等）
+    settle     等待界面稳定
+
+用法:
+    python benchmarks/bench_agent_loop.py --steps 10 --latency 0.2 --repeat 3
+    python benchmarks/bench_agent_loop.py --display current --stream --json result.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gui_agent import AgentConfig, ReActAgent, get_all_tools
+from gui_agent.agent.base import ToolResult
+from gui_agent.backends import Frame, create_capture_backend
+from gui_agent.config import SAVE_SCREENSHOTS
+from gui_agent.runner.displays import XvfbDisplay
+from gui_agent.testing import MockLLMServer
+from gui_agent.tools import screenshot
+from gui_agent.tools.base import DisplaySession, ScreenCapture, Screenshot
+
+
+PHASES = ("capture", "encode", "serialize", "http", "tool", "settle")
+
+
+@dataclass
+class IterationTiming:
+    """一次迭代各阶段耗时（毫秒）"""
+    iteration: int
+    capture: float = 0.0
+    encode: float = 0.0
+    serialize: float = 0.0
+    http: float = 0.0
+    tool: float = 0.0
+    settle: float = 0.0
+    total: float = 0.0
+
+
+class Timings:
+    """收集各阶段耗时；每次调用 LLM 开始一个新的迭代"""
+    
+    def __init__(self):
+        self.iterations: list[IterationTiming] = []
+        self.enabled = False
+        self._run_start = 0
+    
+    @property
+    def current(self) -> Optional[IterationTiming]:
+        return self.iterations[-1] if self.enabled and self.iterations else None
+    
+    def begin_run(self) -> None:
+        self._run_start = len(self.iterations)
+        self.enabled = True
+    
+    def end_run(self) -> None:
+        self.enabled = False
+        for item in self.iterations[self._run_start:]:
+            item.total = sum(getattr(item, phase) for phase in PHASES)
+    
+    def begin_iteration(self) -> None:
+        if self.enabled:
+            self.iterations.append(IterationTiming(iteration=len(self.iterations) - self._run_start + 1))
+    
+    def add(self, phase: str, seconds: float) -> None:
+        current = self.current
+        if current is not None:
+            setattr(current, phase, getattr(current, phase) + seconds * 1000)
+
+
+class TimedScreenCapture(ScreenCapture):
+    """记录截屏、编码与等待稳定耗时的 ScreenCapture"""
+    
+    def __init__(self, timings: Timings, **kwargs):
+        super().__init__(**kwargs)
+        self.timings = timings
+        self._settling = False
+    
+    def _grab_frame(self) -> Frame:
+        start = time.perf_counter()
+        frame = super()._grab_frame()
+        # 等待稳定期间的采样计入 settle
+        if not self._settling:
+            self.timings.add("capture", time.perf_counter() - start)
+        return frame
+    
+    def wait_for_settle(self, *args, **kwargs):
+        self._settling = True
+        start = time.perf_counter()
+        try:
+            return super().wait_for_settle(*args, **kwargs)
+        finally:
+            self._settling = False
+            self.timings.add("settle", time.perf_counter() - start)
+    
+    def _encode(self, image, **fields) -> Screenshot:
+        start = time.perf_counter()
+        try:
+            return super()._encode(image, **fields)
+        finally:
+            self.timings.add("encode", time.perf_counter() - start)
+
+
+class BenchAgent(ReActAgent):
+    """记录请求序列化、HTTP 与工具执行耗时的 ReActAgent"""
+    
+    def __init__(self, *args, timings: Timings, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = timings
+        self._tool_seconds = 0.0  # 当前 LLM 调用期间（流式）执行工具的耗时
+    
+    def _encode_payload(self) -> bytes:
+        start = time.perf_counter()
+        try:
+            return super()._encode_payload()
+        finally:
+            self.timings.add("serialize", time.perf_counter() - start)
+    
+    def _timed_llm(self, call: Callable[[], dict]) -> dict:
+        self.timings.begin_iteration()
+        self._tool_seconds = 0.0
+        before = self.timings.current.serialize if self.timings.current else 0.0
+        start = time.perf_counter()
+        try:
+            return call()
+        finally:
+            elapsed = time.perf_counter() - start
+            current = self.timings.current
+            if current is not None:
+                serialize = (current.serialize - before) / 1000
+                self.timings.add("http", elapsed - serialize - self._tool_seconds)
+    
+    def _call_llm(self) -> dict:
+        return self._timed_llm(super()._call_llm)
+    
+    def _stream_llm(self, on_tool_call) -> dict:
+        return self._timed_llm(lambda: super(BenchAgent, self)._stream_llm(on_tool_call))
+    
+    def _execute_tool(self, name: str, arguments: dict) -> ToolResult:
+        current = self.timings.current
+        screen_before = (current.capture + current.encode + current.settle) if current else 0.0
+        start = time.perf_counter()
+        try:
+            return super()._execute_tool(name, arguments)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._tool_seconds += elapsed
+            if current is not None:
+                screen = (current.capture + current.encode + current.settle - screen_before) / 1000
+                self.timings.add("tool", elapsed - screen)
+
+
+def build_script(steps: int) -> list[dict]:
+    """模拟服务的脚本：轮流点击、输入、滚动、截图，最后返回文本回复"""
+    actions = [
+        lambda i: {"name": "click", "arguments": {"x": 100 + i * 37 % 800, "y": 100 + i * 53 % 800}},
+        lambda i: {"name": "type_text", "arguments": {"text": f"benchmark {i}"}},
+        lambda i: {"name": "scroll", "arguments": {"x": 500, "y": 500, "direction": "down", "amount": 3}},
+        lambda i: {"name": "screenshot", "arguments": {}},
+    ]
+    script = [{"tool_calls": [actions[i % len(actions)](i)]} for i in range(steps)]
+    script.append({"content": "基准任务已完成"})
+    return script
+
+
+def run_once(args: argparse.Namespace, server: MockLLMServer, session: DisplaySession, timings: Timings) -> float:
+    """运行一次完整任务，返回总耗时（秒）"""
+    config = AgentConfig(
+        api_url=server.url,
+        api_key="mock",
+        model="mock",
+        max_iterations=args.steps + 1,
+        stream=args.stream
+    )
+    agent = BenchAgent(config, timings=timings, display=session)
+    for tool in get_all_tools():
+        agent.register_tool(tool)
+    try:
+        initial = screenshot(display=session)
+        timings.begin_run()
+        start = time.perf_counter()
+        agent.run("执行基准测试操作序列", image_base64=initial.image_base64, image_mime=initial.image_mime)
+        elapsed = time.perf_counter() - start
+    finally:
+        timings.end_run()
+        agent.close()
+    return elapsed
+
+
+def summarize(iterations: list[IterationTiming]) -> dict:
+    """各阶段的平均值、p50、p95（毫秒）"""
+    summary = {}
+    for phase in PHASES + ("total",):
+        values = sorted(getattr(item, phase) for item in iterations)
+        if not values:
+            continue
+        summary[phase] = {
+            "mean": statistics.fmean(values),
+            "p50": values[len(values) // 2],
+            "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+        }
+    return summary
+
+
+def print_report(iterations: list[IterationTiming], runs: list[float], summary: dict) -> None:
+    header = f"{'iter':>5}" + "".join(f"{phase:>11}" for phase in PHASES + ("total",))
+    print(header)
+    print("-" * len(header))
+    for item in iterations:
+        print(f"{item.iteration:>5}" + "".join(f"{getattr(item, phase):>11.1f}" for phase in PHASES + ("total",)))
+    print("-" * len(header))
+    for stat in ("mean", "p50", "p95"):
+        print(f"{stat:>5}" + "".join(f"{summary[phase][stat]:>11.1f}" for phase in PHASES + ("total",)))
+    print(f"\n单位: 毫秒；{len(runs)} 次运行，每次平均 {statistics.fmean(runs):.2f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="ReAct 循环端到端基准测试")
+    parser.add_argument("--steps", type=int, default=8, help="每次运行的工具调用轮数，默认 8")
+    parser.add_argument("--repeat", type=int, default=3, help="运行次数，默认 3")
+    parser.add_argument("--latency", type=float, default=0.0, help="模拟服务每个请求的延迟（秒）")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="模拟服务流式 chunk 间隔（秒）")
+    parser.add_argument("--stream", action="store_true", help="使用流式输出")
+    parser.add_argument("--display", default="xvfb",
+                        help="xvfb（默认，启动一个 Xvfb 屏幕）、current（当前屏幕）或 X display 名称，例如 :1")
+    parser.add_argument("--screen", default="1280x800", help="Xvfb 分辨率，默认 1280x800")
+    parser.add_argument("--json", metavar="PATH", help="将逐迭代数据与汇总写入 JSON 文件")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    timings = Timings()
+    
+    xvfb = None
+    if args.display == "xvfb":
+        width, height = (int(value) for value in args.screen.lower().split("x"))
+        xvfb = XvfbDisplay((width, height)).start()
+        display_name = xvfb.name
+    elif args.display == "current":
+        display_name = None
+    else:
+        display_name = args.display
+    
+    # 归档写入临时目录（仍计入编码与入队开销），不在仓库的截图目录中留下文件
+    archive_dir = tempfile.TemporaryDirectory(prefix="bench-screenshots-")
+    save_dir = Path(archive_dir.name) if SAVE_SCREENSHOTS else None
+    if display_name is None:
+        session = DisplaySession(screen=TimedScreenCapture(timings, save_dir=save_dir))
+    else:
+        backend = create_capture_backend("xshm", display_name)
+        session = DisplaySession(
+            display_name,
+            capture_backend=backend,
+            screen=TimedScreenCapture(timings, capture_backend=backend, save_dir=save_dir)
+        )
+    
+    runs = []
+    try:
+        with MockLLMServer(build_script(args.steps), latency=args.latency, chunk_delay=args.chunk_delay) as server:
+            for _ in range(args.repeat):
+                runs.append(run_once(args, server, session, timings))
+    finally:
+        session.close()
+        if xvfb is not None:
+            xvfb.stop()
+        # 等后台线程写完再删除目录
+        if session.screen.archive is not None:
+            session.screen.archive.flush()
+        archive_dir.cleanup()
+    
+    summary = summarize(timings.iterations)
+    print_report(timings.iterations, runs, summary)
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "args": vars(args),
+            "runs": runs,
+            "iterations": [asdict(item) for item in timings.iterations],
+            "summary": summary,
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
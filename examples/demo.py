@@ -56,7 +56,11 @@ def main(api_url: str, api_key: str, model: str):
     task = "请用python计算一下1+1=？并告诉我当前页面是什么？"
     print(f"\n[Demo] 任务: {task}")
     
-    result = agent.run(task, image_base64=initial_screenshot.image_base64)
+    result = agent.run(
+        task,
+        image_base64=initial_screenshot.image_base64,
+        image_mime=initial_screenshot.image_mime
+    )
     
     print("\n" + "=" * 60)
     print("任务完成")
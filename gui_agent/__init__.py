@@ -1,25 +1,72 @@
 """
 GUI Agent - 基于视觉的 GUI 自动化框架
+
+Agent、工具与 runner 在首次访问时才导入：import gui_agent 不加载 requests / httpx / PIL / numpy，
+也不需要可用的显示器。
 """
 
-from .agent import Tool, ToolResult, AgentConfig, ReActAgent
-from .tools import get_all_tools, screenshot, click, type_text, scroll
+import importlib
+from typing import TYPE_CHECKING
+
 from .config import SCREENSHOT_DIR, DEFAULT_API_TIMEOUT, DEFAULT_MAX_ITERATIONS
 
+if TYPE_CHECKING:
+    from .agent import Tool, ToolResult, AgentConfig, ReActAgent, AsyncReActAgent, ResponseCache, TrajectoryStore
+    from .tools import DisplaySession, get_all_tools, screenshot, click, type_text, scroll, zoom, actions
+    from .runner import Task, TaskResult, TaskRunner, run_tasks
+
 __version__ = "0.1.0"
 
+# 导出名 -> 所在子包
+_LAZY_EXPORTS = {
+    **dict.fromkeys(
+        ["Tool", "ToolResult", "AgentConfig", "ReActAgent", "AsyncReActAgent", "ResponseCache", "TrajectoryStore"],
+        "agent"
+    ),
+    **dict.fromkeys(
+        ["DisplaySession", "get_all_tools", "screenshot", "click", "type_text", "scroll", "zoom", "actions"],
+        "tools"
+    ),
+    **dict.fromkeys(["Task", "TaskResult", "TaskRunner", "run_tasks"], "runner"),
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
 __all__ = [
     # Agent
     "Tool",
     "ToolResult", 
     "AgentConfig",
     "ReActAgent",
+    "AsyncReActAgent",
+    "ResponseCache",
+    "TrajectoryStore",
     # Tools
+    "DisplaySession",
     "get_all_tools",
     "screenshot",
     "click",
     "type_text",
     "scroll",
+    "zoom",
+    "actions",
+    # Runner
+    "Task",
+    "TaskResult",
+    "TaskRunner",
+    "run_tasks",
     # Config
     "SCREENSHOT_DIR",
     "DEFAULT_API_TIMEOUT",
@@ -1,6 +1,60 @@
-"""Agent 模块"""
+"""
+Agent 模块
+
+ReActAgent（requests）与 AsyncReActAgent（httpx）在首次访问时才导入
+"""
+
+import importlib
+from typing import TYPE_CHECKING
 
 from .base import Tool, ToolResult, AgentConfig
-from .react_agent import ReActAgent
 
-__all__ = ["Tool", "ToolResult", "AgentConfig", "ReActAgent"]
+if TYPE_CHECKING:
+    from .react_agent import ReActAgent
+    from .async_agent import AsyncReActAgent, create_async_client
+    from .context import ContextManager
+    from .image_store import ImageStore
+    from .response_cache import ResponseCache
+    from .trajectory import Trajectory, TrajectoryStep, TrajectoryStore
+
+# 导出名 -> 所在子模块
+_LAZY_EXPORTS = {
+    "ReActAgent": "react_agent",
+    "AsyncReActAgent": "async_agent",
+    "create_async_client": "async_agent",
+    "ContextManager": "context",
+    "ImageStore": "image_store",
+    "ResponseCache": "response_cache",
+    "Trajectory": "trajectory",
+    "TrajectoryStep": "trajectory",
+    "TrajectoryStore": "trajectory",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+__all__ = [
+    "Tool",
+    "ToolResult",
+    "AgentConfig",
+    "ReActAgent",
+    "AsyncReActAgent",
+    "create_async_client",
+    "ContextManager",
+    "ImageStore",
+    "ResponseCache",
+    "Trajectory",
+    "TrajectoryStep",
+    "TrajectoryStore",
+]
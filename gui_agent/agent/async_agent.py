@@ -0,0 +1,310 @@
+"""
+异步 ReAct Agent 实现 - 基于 httpx 连接池
+多个 Agent 可共享同一事件循环（以及同一 HTTP 客户端），无需每个 Agent 占用一个阻塞线程
+"""
+
+import asyncio
+import contextvars
+import importlib.util
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional, Union
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - 可选依赖
+    httpx = None
+
+from .base import ToolResult, AgentConfig
+from .image_store import ImageStore
+from .response_cache import ResponseCache
+from .react_agent import ReActAgent, _usage_attributes
+from .streaming import StreamAssembler
+from .trajectory import TrajectoryStore
+from .. import tracing
+
+if TYPE_CHECKING:
+    from ..tools.base import DisplaySession
+
+
+def create_async_client(config: AgentConfig) -> "httpx.AsyncClient":
+    """
+    按 AgentConfig 创建带连接池的异步 HTTP 客户端
+    
+    可将同一个客户端传给多个 AsyncReActAgent，共享连接池
+    """
+    if httpx is None:
+        raise ImportError("AsyncReActAgent 需要 httpx，请安装: pip install 'gui-agent[async]'")
+    
+    # 仅在安装了 h2 时启用 HTTP/2，否则回退到 HTTP/1.1 keep-alive
+    http2 = config.http2 and importlib.util.find_spec("h2") is not None
+    
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry
+        ),
+        timeout=config.timeout
+    )
+
+
+class AsyncReActAgent(ReActAgent):
+    """
+    异步 ReAct Agent
+    
+    与 ReActAgent 的工具与消息语义完全一致，区别在于:
+    - LLM 请求通过 httpx.AsyncClient 发送（连接池 + keep-alive，可用时走 HTTP/2）
+    - 工具在线程池中执行，不阻塞事件循环；不操作屏幕的工具作为独立任务并行执行
+    
+    用法:
+        async with AsyncReActAgent(config, system_prompt) as agent:
+            reply = await agent.arun("任务描述")
+    """
+    
+    def __init__(
+        self,
+        config: AgentConfig,
+        system_prompt: str = "",
+        client: Optional["httpx.AsyncClient"] = None,
+        image_store: Optional[ImageStore] = None,
+        display: Optional["DisplaySession"] = None,
+        trajectory_store: Optional[TrajectoryStore] = None,
+        response_cache: Optional[ResponseCache] = None
+    ):
+        super().__init__(
+            config,
+            system_prompt,
+            image_store=image_store,
+            display=display,
+            trajectory_store=trajectory_store,
+            response_cache=response_cache
+        )
+        # 外部传入的客户端由调用方负责关闭
+        self._owns_client = client is None
+        self._client = client if client is not None else create_async_client(config)
+    
+    def _create_session(self) -> None:
+        """异步 Agent 通过 httpx 客户端发送请求，不创建 requests 会话"""
+        return None
+    
+    async def _alookup_cache(self) -> tuple[Optional[str], Optional[dict]]:
+        """在线程中计算缓存键并读取缓存（磁盘读取不阻塞事件循环），未启用缓存返回 (None, None)"""
+        if self.response_cache is None:
+            return None, None
+        
+        def lookup() -> tuple[Optional[str], Optional[dict]]:
+            cache_key = self._cache_key()
+            return cache_key, self._cached_response(cache_key)
+        
+        return await asyncio.to_thread(lookup)
+    
+    async def _acache_response(self, cache_key: Optional[str], message: dict) -> None:
+        """在线程中写入缓存"""
+        if cache_key is not None:
+            await asyncio.to_thread(self._cache_response, cache_key, message)
+    
+    async def _acall_llm(self) -> dict:
+        """异步调用 LLM API"""
+        with tracing.span("llm.call", model=self.config.model, stream=False) as span:
+            cache_key, cached = await self._alookup_cache()
+            if cached is not None:
+                span.set(cached=True, tool_calls=len(cached.get("tool_calls") or []))
+                return cached
+            
+            # 序列化（含多 MB 的 base64 截图）在线程中进行，不阻塞同一事件循环上的其他 Agent
+            data = await asyncio.to_thread(self._encode_payload)
+            span.set(payload_bytes=len(data))
+            # llm.http 只覆盖 HTTP 往返，LLM 延迟指标由它统计（不含缓存查找与序列化）
+            with tracing.span("llm.http", model=self.config.model, stream=False):
+                response = await self._client.post(
+                    self.config.api_url,
+                    headers=self._build_headers(),
+                    content=data
+                )
+                result = response.json()
+            
+            message = self._parse_response(result)
+            span.set(
+                status=response.status_code,
+                tool_calls=len(message.get("tool_calls") or []),
+                **_usage_attributes(result.get("usage"))
+            )
+            await self._acache_response(cache_key, message)
+            return message
+    
+    async def _astream_llm(self, on_tool_call: Callable[[int, dict], Awaitable[None]]) -> dict:
+        """
+        流式异步调用 LLM API
+        
+        Args:
+            on_tool_call: 每个 tool call 的参数组装完整时立即 await 的回调，
+                参数为 tool call 在返回消息 tool_calls 中的位置与 tool call 本身；
+                回调应只启动工具任务而不等待其完成，llm.http 的耗时只覆盖请求与响应流
+            
+        Returns:
+            组装完整的 assistant message
+        """
+        with tracing.span("llm.call", model=self.config.model, stream=True) as span:
+            cache_key, cached = await self._alookup_cache()
+            if cached is not None:
+                span.set(cached=True, tool_calls=len(cached.get("tool_calls") or []))
+                for index, tool_call in enumerate(cached.get("tool_calls") or []):
+                    await on_tool_call(index, tool_call)
+                return cached
+            
+            assembler = StreamAssembler()
+            
+            # 序列化（含多 MB 的 base64 截图）在线程中进行，不阻塞同一事件循环上的其他 Agent
+            data = await asyncio.to_thread(self._encode_payload)
+            span.set(payload_bytes=len(data))
+            # llm.http 只覆盖请求与响应流，LLM 延迟指标由它统计（不含缓存查找与序列化）
+            with tracing.span("llm.http", model=self.config.model, stream=True):
+                async with self._client.stream(
+                    "POST",
+                    self.config.api_url,
+                    headers=self._build_headers(),
+                    content=data
+                ) as response:
+                    span.set(status=response.status_code)
+                    if response.status_code >= 400:
+                        await response.aread()
+                        self._parse_response(response.json())
+                        response.raise_for_status()
+                    
+                    async for line in response.aiter_lines():
+                        for index, tool_call in assembler.feed_line(line):
+                            await on_tool_call(index, tool_call)
+            
+            for index, tool_call in assembler.finish():
+                await on_tool_call(index, tool_call)
+            
+            self._record_usage(assembler.usage)
+            
+            message = assembler.message()
+            span.set(tool_calls=len(message.get("tool_calls") or []), **_usage_attributes(assembler.usage))
+            await self._acache_response(cache_key, message)
+            return message
+    
+    async def _aexecute_tool(self, name: str, arguments: dict) -> ToolResult:
+        """在线程池中执行工具（工具本身是同步阻塞的）"""
+        return await asyncio.to_thread(self._execute_tool, name, arguments)
+    
+    async def arun(
+        self,
+        user_input: str,
+        image_base64: Optional[str] = None,
+        image_mime: str = "image/png"
+    ) -> str:
+        """
+        异步运行 Agent
+        
+        Args:
+            user_input: 用户输入文本
+            image_base64: 可选的图片 base64 编码
+            image_mime: 图片 MIME 类型
+        
+        Returns:
+            Agent 最终回复
+        """
+        with tracing.span("agent.run", model=self.config.model, task=user_input) as span, self._archive_run() as run:
+            span.set(archive_run=run.run_id)
+            reply = await self._arun(user_input, image_base64, image_mime)
+            span.set(iterations=self.iterations, completed=self.completed, usage=dict(self.usage))
+            return reply
+    
+    async def _arun(self, user_input: str, image_base64: Optional[str], image_mime: str) -> str:
+        """arun 的主体（在 agent.run span 内执行）"""
+        # 新的运行从整帧开始，不沿用之前（可能来自其他 Agent）的局部截图基准
+        self._delta_base = None
+        # 附带的图片写入 ImageStore（可能溢出到磁盘），在线程中进行
+        await asyncio.to_thread(self._append_user_input, user_input, image_base64, image_mime)
+        self.iterations = 0
+        self.completed = False
+        
+        # 重复任务：先回放录制的轨迹（截屏与工具调用都是同步阻塞的，在线程中执行）
+        recorded = await asyncio.to_thread(self._begin_trajectory, user_input)
+        if recorded is not None:
+            reply = await asyncio.to_thread(self._replay, recorded)
+            if reply is not None:
+                return reply
+        
+        # ReAct 循环
+        for iteration in range(1, self.config.max_iterations + 1):
+            self.iterations = iteration
+            with tracing.span("agent.iteration", iteration=iteration, max_iterations=self.config.max_iterations):
+                # 流式模式下，tool call 在生成过程中即被启动，读取响应流不等待工具：
+                # 不操作屏幕的工具作为独立任务并行执行，屏幕工具作为依次等待前一个的任务按顺序执行；
+                # 非流式模式下屏幕工具按顺序逐个等待
+                # 结果按 tool call 在 message["tool_calls"] 中的位置对应（id 可能缺失或重复）
+                results: dict[int, Union[ToolResult, asyncio.Task]] = {}
+                # 工具任务在本次迭代的上下文中创建，tool.call span 与 llm.call 并列而不是其子 span
+                iteration_context = contextvars.copy_context()
+                screen_task: Optional[asyncio.Task] = None
+                
+                async def execute_after(previous: Optional[asyncio.Task], name: str, arguments: dict) -> ToolResult:
+                    if previous is not None:
+                        await previous
+                    return await self._aexecute_tool(name, arguments)
+                
+                async def dispatch(index: int, tool_call: dict) -> None:
+                    nonlocal screen_task
+                    _, tool_name, tool_args = self._parse_tool_call(tool_call)
+                    if self._runs_in_background(tool_name):
+                        results[index] = iteration_context.copy().run(
+                            asyncio.create_task, self._aexecute_tool(tool_name, tool_args)
+                        )
+                    elif self.config.stream:
+                        screen_task = iteration_context.copy().run(
+                            asyncio.create_task, execute_after(screen_task, tool_name, tool_args)
+                        )
+                        results[index] = screen_task
+                    else:
+                        results[index] = await self._aexecute_tool(tool_name, tool_args)
+                
+                # 调用 LLM
+                if self.config.stream:
+                    message = await self._astream_llm(dispatch)
+                else:
+                    message = await self._acall_llm()
+                
+                # 没有 tool_calls，返回最终回复
+                if not message.get("tool_calls"):
+                    self.completed = True
+                    # 录制中时会保存轨迹（写盘）
+                    return await asyncio.to_thread(self._append_final_reply, message)
+                
+                self._append_assistant_tool_calls(message)
+                tool_calls = message["tool_calls"]
+                
+                # 先启动可并行的调用，使其与后面的屏幕操作重叠执行
+                for index, tool_call in enumerate(tool_calls):
+                    if index not in results and self._runs_in_background(tool_call["function"]["name"]):
+                        await dispatch(index, tool_call)
+                
+                # 按顺序执行其余（操作屏幕的）调用
+                for index, tool_call in enumerate(tool_calls):
+                    if index not in results:
+                        await dispatch(index, tool_call)
+                
+                # 按原始顺序写入历史
+                for index, tool_call in enumerate(tool_calls):
+                    result = results[index]
+                    if isinstance(result, asyncio.Task):
+                        result = await result
+                    # 截图写入 ImageStore（可能溢出到磁盘），不阻塞同一事件循环上的其他 Agent
+                    await asyncio.to_thread(self._commit_tool_result, tool_call, result)
+                
+        # 达到最大迭代次数
+        return "[Agent] 达到最大迭代次数，停止执行"
+    
+    async def aclose(self) -> None:
+        """关闭 HTTP 客户端（仅关闭自己创建的客户端）"""
+        if self._owns_client:
+            await self._client.aclose()
+        self.close()
+    
+    async def __aenter__(self) -> "AsyncReActAgent":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
@@ -2,9 +2,23 @@
 Agent 基础类定义
 """
 
+import threading
 from dataclasses import dataclass
 from typing import Any, Callable, Optional
 
+from ..config import (
+    MAX_SCREENSHOTS_IN_HISTORY,
+    IMAGE_STORE_MEMORY_BYTES,
+    IMAGE_STORE_DISK_BYTES,
+    REPLAY_MAX_CHANGED_CELLS,
+    SCREENSHOT_ARCHIVE_SAMPLE_RATE,
+)
+
+
+# 默认屏幕与键鼠是进程内共享的资源，操作默认屏幕的工具在该锁内串行执行
+# （绑定了独立 DisplaySession 的 Agent 使用该会话自己的锁）
+SCREEN_LOCK = threading.Lock()
+
 
 @dataclass
 class Tool:
@@ -13,13 +27,23 @@ class Tool:
     description: str
     parameters: dict
     func: Callable[..., Any]
+    uses_screen: bool = True  # 是否操作共享的屏幕 / 键鼠；False 的工具可与其他调用并行执行
+    reset: Optional[Callable[[], None]] = None  # Agent.reset() 时调用，用于清空工具自身的状态
+    close: Optional[Callable[[], None]] = None  # Agent.close() 时调用，用于释放工具持有的资源
+    accepts_display: bool = False  # func 是否接受 display 参数（由 Agent 传入其绑定的 DisplaySession）
 
 
 @dataclass
 class ToolResult:
     """工具执行结果"""
     text: str
-    image_base64: Optional[str] = None  # PNG base64 编码
+    image_base64: Optional[str] = None  # 图片 base64 编码
+    image_mime: str = "image/png"  # 图片 MIME 类型
+    settle_ms: Optional[int] = None  # 操作后等待界面稳定的实际耗时（毫秒）
+    image_hash: Optional[str] = None  # 截图感知哈希，用于判断画面是否变化
+    image_region: Optional[tuple[int, int, int, int]] = None  # 局部截图在屏幕上的区域 (x1, y1, x2, y2)，0-1000 归一化坐标
+    image_caption: Optional[str] = None  # 上传图片时附带的说明，None 使用默认说明
+    image_size: Optional[tuple[int, int]] = None  # 图片尺寸 (宽, 高)，用于估算图片 token
     
 
 @dataclass
@@ -30,3 +54,30 @@ class AgentConfig:
     model: str
     max_iterations: int = 10
     timeout: int = 120
+    # HTTP 连接池（长连接复用，避免每轮迭代重新握手）
+    max_connections: int = 10
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0  # 空闲连接保活时间（秒），仅异步客户端生效
+    http2: bool = True  # 异步客户端在安装了 h2 时启用 HTTP/2
+    # 流式输出：边接收边执行已完整的 tool call
+    stream: bool = False
+    # 截图去重：画面与上一张已发送截图几乎相同时，用文字说明替代图片
+    dedup_screenshots: bool = True
+    dedup_max_changed_cells: int = 0  # 允许变化的感知哈希区块数
+    # 上下文预算：截图数量上限、估算 token 上限、请求字节上限（None 表示不限制）
+    max_screenshots: int = MAX_SCREENSHOTS_IN_HISTORY
+    max_context_tokens: Optional[int] = None
+    max_request_bytes: Optional[int] = None
+    context_policy: str = "summarize"  # 超出预算时：truncate 丢弃最早轮次 / summarize 丢弃并保留摘要
+    # 图片存储上限（历史中只保存图片引用）
+    image_memory_bytes: int = IMAGE_STORE_MEMORY_BYTES
+    image_disk_bytes: int = IMAGE_STORE_DISK_BYTES
+    # 并行工具调用：同一轮中不操作屏幕的工具在线程池中并行执行，屏幕工具仍按顺序串行
+    parallel_tool_calls: bool = True
+    max_tool_workers: int = 4
+    # 轨迹回放（Agent 设置了 trajectory_store 时生效）：False 只录制不回放
+    replay_trajectories: bool = True
+    replay_max_changed_cells: int = REPLAY_MAX_CHANGED_CELLS
+    # 截图归档（截图实例启用了本地保存时生效）：run 期间的截图是否归档、归档比例 (0-1]
+    archive_screenshots: bool = True
+    archive_sample_rate: float = SCREENSHOT_ARCHIVE_SAMPLE_RATE
@@ -0,0 +1,295 @@
+"""
+上下文管理 - 增量维护发送给 LLM 的消息视图
+
+完整历史（messages）只追加不修改；发送视图（view）在每次追加时增量更新:
+- 截图数量超过上限时，最早的截图消息降级为纯文本
+- 估算 token / 字节数超过预算时，先降级截图，再按轮次淘汰（或摘要）最早的对话
+"""
+
+import json
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+# 上下文淘汰策略
+POLICY_TRUNCATE = "truncate"  # 直接丢弃最早的轮次
+POLICY_SUMMARIZE = "summarize"  # 丢弃最早的轮次，并在视图中保留一条简要摘要
+
+# 未知尺寸的图片按该 token 数估算
+DEFAULT_IMAGE_TOKENS = 1500
+# 摘要最多保留的行数
+MAX_SUMMARY_LINES = 30
+
+
+def estimate_image_tokens(size: Optional[tuple[int, int]]) -> int:
+    """按像素数估算图片 token（约每 750 像素 1 token）"""
+    if size is None:
+        return DEFAULT_IMAGE_TOKENS
+    width, height = size
+    return max(1, width * height // 750)
+
+
+def estimate_text_tokens(text: str) -> int:
+    """按 UTF-8 字节数粗略估算文本 token（中文约 1 字 1 token，英文偏保守）"""
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def _has_image(message: dict) -> bool:
+    content = message.get("content")
+    return isinstance(content, list) and any(item.get("type") == "image_url" for item in content)
+
+
+def _strip_images(message: dict) -> Optional[dict]:
+    """移除消息中的图片，保留文本部分；没有文本时返回 None"""
+    text_parts = [item.get("text", "") for item in message["content"] if item.get("type") == "text"]
+    if not text_parts:
+        return None
+    return {
+        "role": message["role"],
+        "content": "[截图已省略] " + " ".join(text_parts)
+    }
+
+
+def _summarize(message: dict) -> Optional[str]:
+    """将单条消息压缩为一行摘要"""
+    role = message.get("role")
+    content = message.get("content")
+    if isinstance(content, list):
+        content = " ".join(item.get("text", "") for item in content if item.get("type") == "text")
+    content = (content or "").strip()
+    
+    if role == "assistant" and message.get("tool_calls"):
+        calls = ", ".join(
+            f"{call['function']['name']}({call['function'].get('arguments', '')})"
+            for call in message["tool_calls"]
+        )
+        return f"调用 {calls}"
+    if role == "tool":
+        return f"  → {content[:80]}"
+    if role == "assistant":
+        return f"回复: {content[:80]}"
+    if role == "user" and not _has_image(message):
+        return f"用户: {content[:80]}"
+    return None
+
+
+@dataclass
+class _Entry:
+    """历史中的一条消息及其在发送视图中的状态"""
+    message: dict
+    view: Optional[dict]  # 视图中的版本，None 表示已移出视图
+    tokens: int
+    size: int  # 视图版本序列化后的字节数（含图片数据）
+    image_size: Optional[tuple[int, int]] = None
+    image_bytes: int = 0  # 图片以引用形式存放时，还原为 data URL 后的字节数
+    image_tokens: int = 0  # tokens 中图片部分的估算值
+
+
+@dataclass
+class _Turn:
+    """一轮对话：assistant 消息及其后的 tool / 截图消息，淘汰时整体移除"""
+    entries: list[_Entry] = field(default_factory=list)
+
+
+class ContextManager:
+    """
+    增量上下文管理器
+    
+    每次 append 为 O(1) 均摊：截图通过队列按时间顺序降级，轮次通过队列从头淘汰，
+    token / 字节总量随增删实时维护，无需每次请求重新扫描历史。
+    """
+    
+    def __init__(
+        self,
+        max_screenshots: int = 5,
+        max_tokens: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        policy: str = POLICY_SUMMARIZE,
+        image_token_estimator: Callable[[Optional[tuple[int, int]]], int] = estimate_image_tokens
+    ):
+        """
+        Args:
+            max_screenshots: 视图中最多保留的截图数量
+            max_tokens: 视图估算 token 上限，None 表示不限制
+            max_bytes: 视图序列化字节上限，None 表示不限制
+            policy: 超出预算时的淘汰策略 truncate / summarize
+            image_token_estimator: 图片 token 估算函数，参数为图片尺寸（可能为 None）
+        """
+        if policy not in (POLICY_TRUNCATE, POLICY_SUMMARIZE):
+            raise ValueError(f"未知的上下文策略: {policy}")
+        
+        self.max_screenshots = max_screenshots
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.image_token_estimator = image_token_estimator
+        self.clear()
+    
+    def clear(self) -> None:
+        """清空历史与视图"""
+        self.messages: list[dict] = []
+        self._pinned: list[_Entry] = []  # 第一个 assistant 消息之前的消息（系统提示、任务）
+        self._turns: deque[_Turn] = deque()
+        self._images: deque[_Entry] = deque()  # 带图片的消息，按时间顺序（可能含已移出视图的条目）
+        self._image_count = 0  # 视图中仍带图片的消息数
+        self._summary_lines: deque[str] = deque(maxlen=MAX_SUMMARY_LINES)
+        self._summary: Optional[_Entry] = None
+        self._evicted_turns = 0
+        self.total_tokens = 0
+        self.total_bytes = 0
+        self.image_tokens = 0  # 视图中图片的估算 token 总数
+    
+    def _measure(self, entry: _Entry) -> None:
+        """计算条目视图版本的 token 与字节数"""
+        view = entry.view
+        if view is None:
+            entry.tokens, entry.size, entry.image_tokens = 0, 0, 0
+            return
+        
+        serialized = json.dumps(view, ensure_ascii=False)
+        entry.size = len(serialized.encode("utf-8"))
+        if _has_image(view):
+            entry.size += entry.image_bytes
+            text = " ".join(item.get("text", "") for item in view["content"] if item.get("type") == "text")
+            entry.image_tokens = self.image_token_estimator(entry.image_size)
+            entry.tokens = estimate_text_tokens(text) + entry.image_tokens
+        else:
+            text_view = {key: value for key, value in view.items() if key != "role"}
+            entry.tokens = estimate_text_tokens(json.dumps(text_view, ensure_ascii=False))
+            entry.image_tokens = 0
+    
+    def _add(self, entry: _Entry) -> None:
+        self.total_tokens += entry.tokens
+        self.total_bytes += entry.size
+        self.image_tokens += entry.image_tokens
+    
+    def _remove(self, entry: _Entry) -> None:
+        self.total_tokens -= entry.tokens
+        self.total_bytes -= entry.size
+        self.image_tokens -= entry.image_tokens
+    
+    def append(
+        self,
+        message: dict,
+        image_size: Optional[tuple[int, int]] = None,
+        image_bytes: int = 0
+    ) -> None:
+        """
+        追加一条消息并增量更新视图
+        
+        Args:
+            message: OpenAI 格式消息
+            image_size: 消息中图片的尺寸，用于估算图片 token
+            image_bytes: 图片以引用形式存放时，还原后 data URL 的字节数，用于字节预算
+        """
+        self.messages.append(message)
+        entry = _Entry(
+            message=message,
+            view=message,
+            tokens=0,
+            size=0,
+            image_size=image_size,
+            image_bytes=image_bytes
+        )
+        self._measure(entry)
+        self._add(entry)
+        
+        # 分组：assistant 消息开启新一轮；assistant 回复之后的用户输入也开启新一轮
+        role = message.get("role")
+        last_turn = self._turns[-1] if self._turns else None
+        ends_turn = (
+            last_turn is not None
+            and last_turn.entries[-1].message.get("role") == "assistant"
+            and not last_turn.entries[-1].message.get("tool_calls")
+        )
+        if role == "assistant" or (role == "user" and ends_turn):
+            self._turns.append(_Turn(entries=[entry]))
+        elif last_turn is None:
+            self._pinned.append(entry)
+        else:
+            last_turn.entries.append(entry)
+        
+        if _has_image(message):
+            self._images.append(entry)
+            self._image_count += 1
+        
+        self._enforce_budget()
+    
+    def _over_budget(self) -> bool:
+        if self.max_tokens is not None and self.total_tokens > self.max_tokens:
+            return True
+        if self.max_bytes is not None and self.total_bytes > self.max_bytes:
+            return True
+        return False
+    
+    def _drop_oldest_image(self) -> None:
+        """将视图中最早的截图消息降级为纯文本"""
+        entry = self._images.popleft()
+        while entry.view is None or not _has_image(entry.view):
+            entry = self._images.popleft()
+        
+        self._image_count -= 1
+        self._remove(entry)
+        entry.view = _strip_images(entry.view)
+        self._measure(entry)
+        self._add(entry)
+    
+    def _evict_oldest_turn(self) -> None:
+        """淘汰最早的一轮对话（按策略丢弃或写入摘要）"""
+        turn = self._turns.popleft()
+        for entry in turn.entries:
+            if entry.view is not None:
+                if _has_image(entry.view):
+                    self._image_count -= 1
+                self._remove(entry)
+                entry.view = None
+            if self.policy == POLICY_SUMMARIZE:
+                line = _summarize(entry.message)
+                if line:
+                    self._summary_lines.append(line)
+        self._evicted_turns += 1
+        
+        if self.policy == POLICY_SUMMARIZE:
+            if self._summary is not None:
+                self._remove(self._summary)
+            content = f"[早期对话摘要] 已省略 {self._evicted_turns} 轮对话，最近的操作记录：\n" + "\n".join(self._summary_lines)
+            self._summary = _Entry(message={}, view={"role": "user", "content": content}, tokens=0, size=0)
+            self._measure(self._summary)
+            self._add(self._summary)
+    
+    def _enforce_budget(self) -> None:
+        """执行截图数量与 token / 字节预算"""
+        while self._image_count > self.max_screenshots:
+            self._drop_oldest_image()
+        
+        # 超出预算：先降级截图（保留最新一张），再淘汰最早的轮次（保留最新一轮）
+        while self._over_budget() and self._image_count > 1:
+            self._drop_oldest_image()
+        while self._over_budget() and len(self._turns) > 1:
+            self._evict_oldest_turn()
+    
+    def images_since(self, message: dict) -> Optional[int]:
+        """
+        视图中从该图片消息（含）到最新一张之间仍带图片的消息数
+        
+        Returns:
+            图片消息数，该消息不在视图中或其图片已被降级时返回 None
+        """
+        count = 0
+        for entry in reversed(self._images):
+            if entry.view is None or not _has_image(entry.view):
+                continue
+            count += 1
+            if entry.message is message:
+                return count
+        return None
+    
+    def view(self) -> list[dict]:
+        """返回发送给 LLM 的消息列表（不修改完整历史）"""
+        messages = [entry.view for entry in self._pinned if entry.view is not None]
+        if self._summary is not None:
+            messages.append(self._summary.view)
+        for turn in self._turns:
+            messages.extend(entry.view for entry in turn.entries if entry.view is not None)
+        return messages
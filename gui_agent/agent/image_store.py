@@ -0,0 +1,196 @@
+"""
+图片存储 - 消息历史只保存图片引用，不保存 base64
+
+图片按内容哈希寻址（同一张图只存一份），内存中按 LRU 保留，超出内存上限的图片溢出到磁盘，
+磁盘也超出上限时删除最久未使用的图片。只有在序列化请求时才把引用还原为 data URL。
+"""
+
+import base64
+import hashlib
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+
+# 消息中图片引用的 URL 前缀
+IMAGE_REF_PREFIX = "image-store://"
+
+
+def is_image_ref(url: str) -> bool:
+    """URL 是否为图片存储引用"""
+    return url.startswith(IMAGE_REF_PREFIX)
+
+
+class ImageStore:
+    """
+    有界、内容寻址的图片存储（内存 + 磁盘溢出），线程安全
+    
+    可在多个 Agent 之间共享同一个实例。
+    """
+    
+    def __init__(
+        self,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+        spill_dir: Optional[Path] = None
+    ):
+        """
+        Args:
+            max_memory_bytes: 内存中图片字节上限
+            max_disk_bytes: 磁盘溢出字节上限，超出后删除最久未使用的图片
+            spill_dir: 溢出目录，None 表示首次溢出时创建临时目录（close 时删除）
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._spill_dir = spill_dir
+        self._owns_spill_dir = spill_dir is None
+        self._memory: OrderedDict[str, tuple[str, bytes]] = OrderedDict()  # id -> (mime, 图片字节)
+        self._disk: OrderedDict[str, tuple[str, int]] = OrderedDict()  # id -> (mime, 字节数)
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._finalizer: Optional[weakref.finalize] = None
+    
+    @property
+    def memory_bytes(self) -> int:
+        """内存中图片总字节数"""
+        return self._memory_bytes
+    
+    @property
+    def disk_bytes(self) -> int:
+        """磁盘上图片总字节数"""
+        return self._disk_bytes
+    
+    def put(self, image_base64: str, mime_type: str = "image/png") -> str:
+        """
+        存入一张图片
+        
+        Returns:
+            图片 id（内容哈希），相同内容返回相同 id
+        """
+        data = base64.b64decode(image_base64)
+        image_id = hashlib.sha256(data).hexdigest()[:32]
+        
+        with self._lock:
+            if image_id in self._memory:
+                self._memory.move_to_end(image_id)
+                return image_id
+            if image_id in self._disk:
+                self._disk.move_to_end(image_id)
+                return image_id
+            
+            self._memory[image_id] = (mime_type, data)
+            self._memory_bytes += len(data)
+            self._spill()
+        return image_id
+    
+    def get(self, image_id: str) -> Optional[tuple[str, bytes]]:
+        """
+        读取图片
+        
+        Returns:
+            (mime, 图片字节)，已被淘汰返回 None
+        """
+        with self._lock:
+            if image_id in self._memory:
+                self._memory.move_to_end(image_id)
+                return self._memory[image_id]
+            
+            if image_id not in self._disk:
+                return None
+            mime_type, size = self._disk.pop(image_id)
+            self._disk_bytes -= size
+            path = self._path(image_id)
+            try:
+                data = path.read_bytes()
+            except OSError:
+                return None
+            path.unlink(missing_ok=True)
+            
+            # 重新读取的图片回到内存
+            self._memory[image_id] = (mime_type, data)
+            self._memory_bytes += len(data)
+            self._spill()
+            return mime_type, data
+    
+    def ref(self, image_id: str) -> str:
+        """图片引用 URL"""
+        return f"{IMAGE_REF_PREFIX}{image_id}"
+    
+    def data_url(self, ref: str) -> Optional[str]:
+        """将引用还原为 data URL，图片已被淘汰返回 None"""
+        image = self.get(ref[len(IMAGE_REF_PREFIX):])
+        if image is None:
+            return None
+        mime_type, data = image
+        return f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+    
+    def materialize(self, messages: list[dict]) -> list[dict]:
+        """
+        返回将图片引用替换为 data URL 的消息列表（仅复制包含引用的消息，不修改原消息）
+        
+        已被淘汰的图片替换为文字说明
+        """
+        materialized = []
+        for message in messages:
+            content = message.get("content")
+            if not isinstance(content, list) or not any(
+                item.get("type") == "image_url" and is_image_ref(item["image_url"]["url"])
+                for item in content
+            ):
+                materialized.append(message)
+                continue
+            
+            new_content = []
+            for item in content:
+                if item.get("type") == "image_url" and is_image_ref(item["image_url"]["url"]):
+                    url = self.data_url(item["image_url"]["url"])
+                    if url is None:
+                        new_content.append({"type": "text", "text": "[截图已过期]"})
+                        continue
+                    item = {**item, "image_url": {**item["image_url"], "url": url}}
+                new_content.append(item)
+            materialized.append({**message, "content": new_content})
+        return materialized
+    
+    def _path(self, image_id: str) -> Path:
+        return self._spill_dir / f"{image_id}.bin"
+    
+    def _spill(self) -> None:
+        """内存超限时将最久未使用的图片写入磁盘（调用方持有锁）"""
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            image_id, (mime_type, data) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(data)
+            
+            if self._spill_dir is None:
+                self._spill_dir = Path(tempfile.mkdtemp(prefix="gui_agent_images_"))
+                self._finalizer = weakref.finalize(self, shutil.rmtree, self._spill_dir, True)
+            self._spill_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                self._path(image_id).write_bytes(data)
+            except OSError:
+                continue
+            self._disk[image_id] = (mime_type, len(data))
+            self._disk_bytes += len(data)
+        
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            image_id, (_, size) = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self._path(image_id).unlink(missing_ok=True)
+    
+    def close(self) -> None:
+        """清空存储，删除自动创建的溢出目录"""
+        with self._lock:
+            for image_id in self._disk:
+                self._path(image_id).unlink(missing_ok=True)
+            self._memory.clear()
+            self._disk.clear()
+            self._memory_bytes = 0
+            self._disk_bytes = 0
+            if self._owns_spill_dir and self._finalizer is not None:
+                self._finalizer()
+                self._spill_dir = None
@@ -3,11 +3,41 @@ ReAct Agent 实现 - 纯 HTTP 实现
 支持多轮对话、Tool Call、多模态（图片）
 """
 
+import contextvars
 import json
 import requests
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import TYPE_CHECKING, Callable, Optional, Union
 
-from .base import Tool, ToolResult, AgentConfig
+from .base import Tool, ToolResult, AgentConfig, SCREEN_LOCK
+from .context import ContextManager
+from .image_store import ImageStore
+from .response_cache import ResponseCache
+from .streaming import StreamAssembler
+from .trajectory import Trajectory, TrajectoryStep, TrajectoryStore
+from .. import archive, tracing
+
+if TYPE_CHECKING:
+    from ..tools.base import DisplaySession
+
+
+def _count_images(messages: list[dict]) -> int:
+    """消息中的图片数量"""
+    return sum(
+        1
+        for message in messages
+        if isinstance(message.get("content"), list)
+        for part in message["content"]
+        if part.get("type") == "image_url"
+    )
+
+
+def _usage_attributes(usage: Optional[dict]) -> dict:
+    """API 返回的 usage -> span 属性"""
+    if not usage:
+        return {}
+    return {key: usage.get(key) or 0 for key in ("prompt_tokens", "completion_tokens", "total_tokens")}
 
 
 class ReActAgent:
@@ -21,23 +51,103 @@ class ReActAgent:
     4. 重复直到 LLM 返回纯文本或达到最大迭代次数
     """
     
-    def __init__(self, config: AgentConfig, system_prompt: str = ""):
+    def __init__(
+        self,
+        config: AgentConfig,
+        system_prompt: str = "",
+        image_store: Optional[ImageStore] = None,
+        display: Optional["DisplaySession"] = None,
+        trajectory_store: Optional[TrajectoryStore] = None,
+        response_cache: Optional[ResponseCache] = None
+    ):
+        """
+        Args:
+            config: Agent 配置
+            system_prompt: 系统提示
+            image_store: 图片存储，可在多个 Agent 间共享；None 时按配置创建独立存储
+            display: GUI 工具操作的屏幕会话（由调用方负责关闭）；None 使用进程默认屏幕
+            trajectory_store: 轨迹存储；设置后录制成功任务的操作轨迹，并在重复任务时回放
+            response_cache: LLM 响应缓存，可在多个 Agent 间共享；请求相同时直接返回缓存的响应
+        """
         self.config = config
         self.system_prompt = system_prompt
+        self.display = display
+        self.trajectory_store = trajectory_store
+        self.response_cache = response_cache
+        # 本次 run 正在录制的轨迹，以及最近一次观察到的整屏感知哈希
+        self._recording: Optional[Trajectory] = None
+        self._observed_hash: Optional[str] = None
         self.tools: dict[str, Tool] = {}
-        self.messages: list[dict] = []
+        # 历史消息中的图片只保存引用，发送请求时才还原为 data URL
+        self._owns_image_store = image_store is None
+        self.image_store = image_store if image_store is not None else ImageStore(
+            max_memory_bytes=config.image_memory_bytes,
+            max_disk_bytes=config.image_disk_bytes
+        )
+        self.context = ContextManager(
+            max_screenshots=config.max_screenshots,
+            max_tokens=config.max_context_tokens,
+            max_bytes=config.max_request_bytes,
+            policy=config.context_policy
+        )
+        self._session: Optional[requests.Session] = self._create_session()
+        # 并行执行不操作屏幕的工具（首次需要时创建）
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # 流式生成过程中按顺序执行屏幕工具的单线程执行器，使读取响应流不被工具阻塞（首次需要时创建）
+        self._screen_executor: Optional[ThreadPoolExecutor] = None
+        # 最近一张已加入历史的截图的感知哈希（用于去重）
+        self._last_image_hash: Optional[str] = None
+        # 最近一张加入历史的整帧截图消息：之后的局部截图都以它为基准，None 表示本次运行尚未发送整帧
+        self._delta_base: Optional[dict] = None
+        # 累计 token 用量（按 API 返回的 usage 统计）
+        self.usage = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        # 最近一次 run 的迭代次数，以及是否以最终回复结束（而非达到最大迭代次数）
+        self.iterations = 0
+        self.completed = False
         
         # 初始化系统提示
         if system_prompt:
-            self.messages.append({
+            self.context.append({
                 "role": "system",
                 "content": system_prompt
             })
     
+    @property
+    def messages(self) -> list[dict]:
+        """完整对话历史"""
+        return self.context.messages
+    
+    def _create_session(self) -> Optional[requests.Session]:
+        """创建带连接池的 HTTP 会话，多轮迭代复用同一 TCP/TLS 连接"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.config.max_keepalive_connections,
+            pool_maxsize=self.config.max_connections
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    def close(self) -> None:
+        """关闭 HTTP 会话，释放连接池、图片存储与工具资源"""
+        if self._session is not None:
+            self._session.close()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._screen_executor is not None:
+            self._screen_executor.shutdown(wait=False)
+            self._screen_executor = None
+        if self._owns_image_store:
+            self.image_store.close()
+        for tool in self.tools.values():
+            if tool.close is not None:
+                tool.close()
+    
     def register_tool(self, tool: Tool) -> None:
         """注册工具"""
         self.tools[tool.name] = tool
-        print(f"[Agent] 注册工具: {tool.name}")
+        tracing.event("agent.register_tool", tool=tool.name)
     
     def _get_tools_schema(self) -> list[dict]:
         """获取 OpenAI 格式的 tools schema"""
@@ -53,66 +163,20 @@ class ReActAgent:
             for tool in self.tools.values()
         ]
     
-    def _trim_old_screenshots(self, max_screenshots: int = 5) -> list[dict]:
-        """
-        返回消息列表，只保留最近 N 张截图，更早的截图被移除
-        
-        Args:
-            max_screenshots: 最多保留的截图数量
-            
-        Returns:
-            处理后的消息列表（不修改原始 self.messages）
-        """
-        # 找出所有包含图片的消息索引
-        image_indices = []
-        for i, msg in enumerate(self.messages):
-            content = msg.get("content")
-            if isinstance(content, list):
-                for item in content:
-                    if item.get("type") == "image_url":
-                        image_indices.append(i)
-                        break
-        
-        # 如果图片数量不超过限制，直接返回原消息
-        if len(image_indices) <= max_screenshots:
-            return self.messages
-        
-        # 需要移除的图片消息索引（保留最近的 max_screenshots 张）
-        indices_to_remove = set(image_indices[:-max_screenshots])
-        
-        # 构建新消息列表，移除旧图片
-        trimmed_messages = []
-        for i, msg in enumerate(self.messages):
-            if i in indices_to_remove:
-                # 移除图片，但保留文本部分
-                content = msg.get("content")
-                if isinstance(content, list):
-                    text_parts = [item.get("text", "") for item in content if item.get("type") == "text"]
-                    if text_parts:
-                        trimmed_messages.append({
-                            "role": msg["role"],
-                            "content": "[截图已省略] " + " ".join(text_parts)
-                        })
-                # 如果没有文本部分，直接跳过该消息
-            else:
-                trimmed_messages.append(msg)
-        
-        return trimmed_messages
-    
-    def _call_llm(self) -> dict:
-        """调用 LLM API"""
-        headers = {
+    def _build_headers(self) -> dict:
+        """构建请求头"""
+        return {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.config.api_key}"
         }
-        
-        # 只保留最近 5 张截图
-        messages_to_send = self._trim_old_screenshots(max_screenshots=5)
-        
+    
+    def _build_payload(self) -> dict:
+        """构建请求体"""
+        # 上下文管理器增量维护的发送视图（截图数量与 token 预算已生效）
         payload = {
             "model": self.config.model,
-            "stream": False,
-            "messages": messages_to_send,
+            "stream": self.config.stream,
+            "messages": self.image_store.materialize(self.context.view()),
         }
         
         # 如果有工具，添加 tools 参数
@@ -120,148 +184,586 @@ class ReActAgent:
             payload["tools"] = self._get_tools_schema()
             payload["tool_choice"] = "auto"
         
-        response = requests.post(
-            self.config.api_url,
-            headers=headers,
-            json=payload,
-            timeout=self.config.timeout
-        )
-        
-        result = response.json()
+        # 流式模式下请求在最后一个 chunk 中返回 usage
+        if self.config.stream:
+            payload["stream_options"] = {"include_usage": True}
         
+        return payload
+    
+    def _encode_payload(self) -> bytes:
+        """序列化请求体（UTF-8 JSON，中文不转义为 \\uXXXX）"""
+        with tracing.span("llm.serialize") as span:
+            payload = self._build_payload()
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            span.set(
+                messages=len(payload["messages"]),
+                images=_count_images(payload["messages"]),
+                image_tokens=self.context.image_tokens,
+                payload_bytes=len(data)
+            )
+        return data
+    
+    def _record_usage(self, usage: Optional[dict]) -> None:
+        """累加一次调用的 token 用量"""
+        if not usage:
+            return
+        for key in self.usage:
+            self.usage[key] += usage.get(key) or 0
+    
+    def _parse_response(self, result: dict) -> dict:
+        """解析 API 响应，返回 assistant message"""
         if "error" in result:
             raise RuntimeError(f"API 错误: {result['error']}")
         
+        self._record_usage(result.get("usage"))
         return result["choices"][0]["message"]
     
+    def _cache_key(self) -> Optional[str]:
+        """当前请求的缓存键（图片保持为内容寻址的引用），未启用缓存返回 None"""
+        if self.response_cache is None:
+            return None
+        tools = self._get_tools_schema() if self.tools else None
+        return ResponseCache.key(self.config.model, tools, self.context.view())
+    
+    def _cached_response(self, cache_key: Optional[str]) -> Optional[dict]:
+        """读取缓存的 assistant message"""
+        if cache_key is None:
+            return None
+        return self.response_cache.get(cache_key)
+    
+    def _cache_response(self, cache_key: Optional[str], message: dict) -> None:
+        """缓存 assistant message"""
+        if cache_key is not None:
+            self.response_cache.put(cache_key, message)
+    
+    def _call_llm(self) -> dict:
+        """调用 LLM API"""
+        with tracing.span("llm.call", model=self.config.model, stream=False) as span:
+            cache_key = self._cache_key()
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                span.set(cached=True, tool_calls=len(cached.get("tool_calls") or []))
+                return cached
+            
+            data = self._encode_payload()
+            span.set(payload_bytes=len(data))
+            # llm.http 只覆盖 HTTP 往返，LLM 延迟指标由它统计（不含缓存查找与序列化）
+            with tracing.span("llm.http", model=self.config.model, stream=False):
+                response = self._session.post(
+                    self.config.api_url,
+                    headers=self._build_headers(),
+                    data=data,
+                    timeout=self.config.timeout
+                )
+                result = response.json()
+            
+            message = self._parse_response(result)
+            span.set(
+                status=response.status_code,
+                tool_calls=len(message.get("tool_calls") or []),
+                **_usage_attributes(result.get("usage"))
+            )
+            self._cache_response(cache_key, message)
+            return message
+    
+    def _stream_llm(self, on_tool_call: Callable[[int, dict], None]) -> dict:
+        """
+        流式调用 LLM API
+        
+        Args:
+            on_tool_call: 每个 tool call 的参数组装完整时立即回调（此时生成仍在继续），
+                参数为 tool call 在返回消息 tool_calls 中的位置与 tool call 本身；
+                回调应只提交工具而不等待其完成，llm.http 的耗时只覆盖请求与响应流
+            
+        Returns:
+            组装完整的 assistant message
+        """
+        with tracing.span("llm.call", model=self.config.model, stream=True) as span:
+            cache_key = self._cache_key()
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                span.set(cached=True, tool_calls=len(cached.get("tool_calls") or []))
+                for index, tool_call in enumerate(cached.get("tool_calls") or []):
+                    on_tool_call(index, tool_call)
+                return cached
+            
+            assembler = StreamAssembler()
+            
+            data = self._encode_payload()
+            span.set(payload_bytes=len(data))
+            # llm.http 只覆盖请求与响应流，LLM 延迟指标由它统计（不含缓存查找与序列化）
+            with tracing.span("llm.http", model=self.config.model, stream=True):
+                with self._session.post(
+                    self.config.api_url,
+                    headers=self._build_headers(),
+                    data=data,
+                    timeout=self.config.timeout,
+                    stream=True
+                ) as response:
+                    span.set(status=response.status_code)
+                    if response.status_code >= 400:
+                        self._parse_response(response.json())
+                        response.raise_for_status()
+                    
+                    for line in response.iter_lines(decode_unicode=True):
+                        for index, tool_call in assembler.feed_line(line):
+                            on_tool_call(index, tool_call)
+            
+            for index, tool_call in assembler.finish():
+                on_tool_call(index, tool_call)
+            
+            self._record_usage(assembler.usage)
+            
+            message = assembler.message()
+            span.set(tool_calls=len(message.get("tool_calls") or []), **_usage_attributes(assembler.usage))
+            self._cache_response(cache_key, message)
+            return message
+    
     def _execute_tool(self, name: str, arguments: dict) -> ToolResult:
-        """执行工具"""
+        """执行工具（操作屏幕的工具在屏幕锁内执行）"""
         if name not in self.tools:
             return ToolResult(text=f"错误: 未知工具 '{name}'")
         
         tool = self.tools[name]
-        try:
-            result = tool.func(**arguments)
-            if isinstance(result, ToolResult):
-                return result
-            else:
-                return ToolResult(text=str(result))
-        except Exception as e:
-            return ToolResult(text=f"工具执行错误: {e}")
+        with tracing.span("tool.call", tool=name, arguments=arguments) as span:
+            if tool.accepts_display and self.display is not None:
+                arguments = {**arguments, "display": self.display}
+            try:
+                if tool.uses_screen:
+                    with self.display.lock if self.display is not None else SCREEN_LOCK:
+                        if tool.accepts_display:
+                            self._sync_delta_reference()
+                        result = tool.func(**arguments)
+                else:
+                    result = tool.func(**arguments)
+                if not isinstance(result, ToolResult):
+                    result = ToolResult(text=str(result))
+            except Exception as e:
+                span.error = f"{type(e).__name__}: {e}"
+                result = ToolResult(text=f"工具执行错误: {e}")
+            span.set(
+                result_chars=len(result.text),
+                image_length=len(result.image_base64) if result.image_base64 else 0,
+                settle_ms=result.settle_ms
+            )
+            return result
     
-    def run(self, user_input: str, image_base64: Optional[str] = None) -> str:
+    def _sync_delta_reference(self) -> None:
         """
-        运行 Agent
-        
-        Args:
-            user_input: 用户输入文本
-            image_base64: 可选的图片 base64 编码
-            
-        Returns:
-            Agent 最终回复
+        局部截图只有在基准整帧仍在发送视图中时才有意义：本次运行尚未发送整帧、基准已被淘汰、
+        或再追加一张图片就会把基准挤出截图上限时，丢弃屏幕的基准帧，让下一张截图发送整帧
         """
-        # 构建用户消息
+        # 延迟导入，避免 agent 与 tools 模块之间的循环导入
+        from ..tools.base import get_default_display
+        
+        screen = (self.display or get_default_display()).screen
+        if not screen.delta:
+            return
+        if self._delta_base is not None:
+            images = self.context.images_since(self._delta_base)
+            if images is not None and images < self.context.max_screenshots:
+                return
+        screen.reset_delta()
+        self._delta_base = None
+    
+    def _discard_screenshot(self, result: ToolResult) -> None:
+        """截图因去重未发送：局部截图的基准退回到模型最近看到的帧"""
+        # 延迟导入，避免 agent 与 tools 模块之间的循环导入
+        from ..tools.base import get_default_display
+        
+        (self.display or get_default_display()).screen.discard_shot(result.image_hash)
+    
+    def _runs_in_background(self, name: str) -> bool:
+        """该工具调用是否可与同一轮的其他调用并行执行"""
+        tool = self.tools.get(name)
+        return self.config.parallel_tool_calls and tool is not None and not tool.uses_screen
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.max_tool_workers,
+                thread_name_prefix="tool"
+            )
+        return self._executor
+    
+    def _get_screen_executor(self) -> ThreadPoolExecutor:
+        if self._screen_executor is None:
+            self._screen_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="screen-tool")
+        return self._screen_executor
+    
+    def _append_user_input(
+        self,
+        user_input: str,
+        image_base64: Optional[str] = None,
+        image_mime: str = "image/png"
+    ) -> None:
+        """将用户输入（可附带图片）加入历史"""
         if image_base64:
+            image_id = self.image_store.put(image_base64, image_mime)
             user_content = [
                 {"type": "text", "text": user_input},
                 {
                     "type": "image_url",
                     "image_url": {
-                        "url": f"data:image/png;base64,{image_base64}"
+                        "url": self.image_store.ref(image_id)
                     }
                 }
             ]
         else:
             user_content = user_input
         
-        self.messages.append({
+        self.context.append({
             "role": "user",
             "content": user_content
+        }, image_bytes=len(image_base64) if image_base64 else 0)
+        if image_base64:
+            self._last_image_hash = None
+        
+        tracing.event(
+            "agent.user_input",
+            text=user_input,
+            image_length=len(image_base64) if image_base64 else 0
+        )
+    
+    def _append_assistant_tool_calls(self, message: dict) -> None:
+        """将带 tool_calls 的 assistant 消息加入历史"""
+        self.context.append({
+            "role": "assistant",
+            "content": message.get("content"),
+            "tool_calls": message["tool_calls"]
         })
+    
+    def _parse_tool_call(self, tool_call: dict) -> tuple[str, str, dict]:
+        """解析 tool call，返回 (tool_id, tool_name, tool_args)"""
+        tool_id = tool_call.get("id", "")
+        tool_name = tool_call["function"]["name"]
+        tool_args_str = tool_call["function"].get("arguments", "{}")
         
-        print(f"\n[User] {user_input}")
-        if image_base64:
-            print(f"[User] (附带图片，长度: {len(image_base64)})")
+        try:
+            tool_args = json.loads(tool_args_str)
+        except json.JSONDecodeError:
+            tool_args = {}
         
-        # ReAct 循环
-        for iteration in range(1, self.config.max_iterations + 1):
-            print(f"\n--- 迭代 {iteration}/{self.config.max_iterations} ---")
+        return tool_id, tool_name, tool_args
+    
+    def _is_duplicate_screenshot(self, result: ToolResult) -> bool:
+        """截图是否与上一张已加入历史的截图几乎相同"""
+        if not self.config.dedup_screenshots:
+            return False
+        if result.image_hash is None or self._last_image_hash is None:
+            return False
+        # 延迟导入，imaging 依赖 numpy / PIL，不处理截图时无需加载
+        from ..imaging import hash_distance
+        
+        distance = hash_distance(result.image_hash, self._last_image_hash)
+        return distance <= self.config.dedup_max_changed_cells
+    
+    def _append_tool_result(self, tool_id: str, result: ToolResult) -> None:
+        """将工具结果加入历史，截图作为 user message 发送"""
+        # 画面没有变化时不重复上传截图
+        duplicate = bool(result.image_base64) and self._is_duplicate_screenshot(result)
+        tracing.event(
+            "tool.result",
+            tool_call_id=tool_id,
+            text=result.text,
+            image_length=len(result.image_base64) if result.image_base64 else 0,
+            duplicate=duplicate
+        )
+        if duplicate:
+            self._discard_screenshot(result)
+            self.context.append({
+                "role": "tool",
+                "tool_call_id": tool_id,
+                "content": result.text + " 屏幕无变化（与上一张截图相同），未重复上传截图。"
+            })
+            return
+        
+        # 将工具结果加入历史（纯文本）
+        tool_response_text = result.text
+        if result.image_base64 and result.image_caption:
+            tool_response_text += " 图片已生成，用户将上传图片。"
+        elif result.image_base64 and result.image_region:
+            tool_response_text += " 截图已生成（仅变化区域），用户将上传截图。"
+        elif result.image_base64:
+            tool_response_text += " 截图已生成，用户将上传截图。"
+        
+        self.context.append({
+            "role": "tool",
+            "tool_call_id": tool_id,
+            "content": tool_response_text
+        })
+        
+        # 如果有图片，作为 user message 发送
+        if result.image_base64:
+            if result.image_caption:
+                caption = result.image_caption
+            elif result.image_region:
+                x1, y1, x2, y2 = result.image_region
+                caption = (
+                    f"这是刚才操作后屏幕发生变化区域的局部截图，该区域在屏幕上的坐标为 "
+                    f"({x1}, {y1}) 到 ({x2}, {y2})（0-1000 归一化坐标），其余区域与上一张截图相同。"
+                    f"请结合之前的截图继续操作："
+                )
+            else:
+                caption = "这是刚才操作后的屏幕截图，请根据截图继续操作："
+            image_id = self.image_store.put(result.image_base64, result.image_mime)
+            image_message = {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": caption},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": self.image_store.ref(image_id)
+                        }
+                    }
+                ]
+            }
+            self.context.append(image_message, image_size=result.image_size, image_bytes=len(result.image_base64))
+            if result.image_region is None and result.image_caption is None:
+                self._delta_base = image_message
+            if result.image_hash is not None:
+                self._last_image_hash = result.image_hash
+    
+    def _append_final_reply(self, message: dict) -> str:
+        """将最终回复加入历史并返回"""
+        final_reply = message.get("content", "")
+        self.context.append({
+            "role": "assistant",
+            "content": final_reply
+        })
+        tracing.event("agent.reply", text=final_reply)
+        
+        # 任务成功完成，保存本次轨迹
+        if self._recording is not None:
+            self._recording.final_reply = final_reply
+            self.trajectory_store.put(self.system_prompt, self._recording)
+            self._recording = None
+        return final_reply
+    
+    def _screen_hash(self) -> Optional[str]:
+        """当前屏幕的感知哈希；没有注册操作屏幕的工具（不需要校验画面）或无法截屏时返回 None"""
+        if not any(tool.uses_screen for tool in self.tools.values()):
+            return None
+        # 延迟导入，避免 agent 与 tools 模块之间的循环导入
+        from ..tools.base import get_default_display
+        
+        display = self.display or get_default_display()
+        try:
+            with display.lock:
+                return display.screen.current_hash()
+        except Exception:
+            return None
+    
+    def _screen_matches(self, expected_hash: Optional[str]) -> bool:
+        """当前观察到的画面是否与录制时一致（录制时未知的画面不校验）"""
+        if expected_hash is None:
+            return True
+        if self._observed_hash is None:
+            return False
+        from ..imaging import hash_distance
+        
+        distance = hash_distance(expected_hash, self._observed_hash)
+        return distance <= self.config.replay_max_changed_cells
+    
+    def _commit_tool_result(self, tool_call: dict, result: ToolResult) -> None:
+        """将工具结果写入历史（图片可能溢出到磁盘），并追加到正在录制的轨迹"""
+        self._append_tool_result(tool_call.get("id", ""), result)
+        self._record_step(tool_call, result)
+    
+    def _record_step(self, tool_call: dict, result: ToolResult) -> None:
+        """更新观察到的画面，录制中时将该次调用追加到轨迹"""
+        pre_hash = self._observed_hash
+        if result.image_hash is not None:
+            self._observed_hash = result.image_hash
+        if self._recording is None:
+            return
+        
+        try:
+            arguments = json.loads(tool_call["function"].get("arguments") or "{}")
+        except json.JSONDecodeError:
+            arguments = {}
+        self._recording.steps.append(TrajectoryStep(
+            tool=tool_call["function"]["name"],
+            arguments=arguments,
+            pre_hash=pre_hash,
+            post_hash=self._observed_hash
+        ))
+    
+    def _begin_trajectory(self, task: str) -> Optional[Trajectory]:
+        """
+        开始录制本次任务的轨迹
+        
+        Returns:
+            可回放的已录制轨迹；未设置轨迹存储、关闭了回放或没有录制过时返回 None
+        """
+        self._recording = None
+        if self.trajectory_store is None:
+            return None
+        
+        self._observed_hash = self._screen_hash()
+        self._recording = Trajectory(task=task)
+        if not self.config.replay_trajectories:
+            return None
+        return self.trajectory_store.get(self.system_prompt, task)
+    
+    def _replay(self, trajectory: Trajectory) -> Optional[str]:
+        """
+        按录制的轨迹直接执行工具调用（不调用 LLM），每步执行前校验画面
+        
+        已执行的步骤与普通工具调用一样写入历史，偏离时模型可以从当前状态接着完成任务。
+        
+        Returns:
+            全部步骤与录制时一致时返回录制的最终回复；偏离时返回 None
+        """
+        with tracing.span("agent.replay", steps=len(trajectory.steps)) as span:
+            for index, step in enumerate(trajectory.steps, start=1):
+                if not self._screen_matches(step.pre_hash):
+                    tracing.event("replay.diverged", step=index)
+                    span.set(replayed=index - 1, diverged=True)
+                    return None
+                
+                tool_call = {
+                    "id": f"replay_{index}",
+                    "type": "function",
+                    "function": {
+                        "name": step.tool,
+                        "arguments": json.dumps(step.arguments, ensure_ascii=False)
+                    }
+                }
+                self._append_assistant_tool_calls({"content": None, "tool_calls": [tool_call]})
+                result = self._execute_tool(step.tool, step.arguments)
+                self._commit_tool_result(tool_call, result)
             
-            # 调用 LLM
-            message = self._call_llm()
+            span.set(replayed=len(trajectory.steps))
+            if trajectory.steps and not self._screen_matches(trajectory.steps[-1].post_hash):
+                tracing.event("replay.diverged", step=None)
+                span.set(diverged=True)
+                return None
             
-            # 检查是否有 tool_calls
-            if message.get("tool_calls"):
-                # 将 assistant 消息加入历史
-                self.messages.append({
-                    "role": "assistant",
-                    "content": message.get("content"),
-                    "tool_calls": message["tool_calls"]
-                })
+            span.set(diverged=False)
+            self.completed = True
+            return self._append_final_reply({"content": trajectory.final_reply})
+    
+    def _archive_run(self):
+        """本次运行的截图归档设置（run 期间截图归入同一个清单）"""
+        return archive.archive_run(
+            enabled=self.config.archive_screenshots,
+            sample_rate=self.config.archive_sample_rate
+        )
+    
+    def run(
+        self,
+        user_input: str,
+        image_base64: Optional[str] = None,
+        image_mime: str = "image/png"
+    ) -> str:
+        """
+        运行 Agent
+        
+        Args:
+            user_input: 用户输入文本
+            image_base64: 可选的图片 base64 编码
+            image_mime: 图片 MIME 类型
+        
+        Returns:
+            Agent 最终回复
+        """
+        with tracing.span("agent.run", model=self.config.model, task=user_input) as span, self._archive_run() as run:
+            span.set(archive_run=run.run_id)
+            reply = self._run(user_input, image_base64, image_mime)
+            span.set(iterations=self.iterations, completed=self.completed, usage=dict(self.usage))
+            return reply
+    
+    def _run(self, user_input: str, image_base64: Optional[str], image_mime: str) -> str:
+        """run 的主体（在 agent.run span 内执行）"""
+        # 新的运行从整帧开始，不沿用之前（可能来自其他 Agent）的局部截图基准
+        self._delta_base = None
+        self._append_user_input(user_input, image_base64, image_mime)
+        self.iterations = 0
+        self.completed = False
+        
+        # 重复任务：先回放录制的轨迹，完全一致时无需调用 LLM
+        recorded = self._begin_trajectory(user_input)
+        if recorded is not None:
+            reply = self._replay(recorded)
+            if reply is not None:
+                return reply
+        
+        # ReAct 循环
+        for iteration in range(1, self.config.max_iterations + 1):
+            self.iterations = iteration
+            with tracing.span("agent.iteration", iteration=iteration, max_iterations=self.config.max_iterations):
+                # 流式模式下，tool call 在生成过程中即被提交执行，读取响应流不等待工具：
+                # 不操作屏幕的工具提交到线程池并行执行，屏幕工具按顺序提交到单线程执行器；
+                # 非流式模式下屏幕工具按顺序在当前线程执行
+                # 结果按 tool call 在 message["tool_calls"] 中的位置对应（id 可能缺失或重复）
+                results: dict[int, Union[ToolResult, Future]] = {}
+                # 工具在本次迭代的上下文中执行，tool.call span 与 llm.call 并列而不是其子 span
+                iteration_context = contextvars.copy_context()
+                
+                def dispatch(index: int, tool_call: dict) -> None:
+                    _, tool_name, tool_args = self._parse_tool_call(tool_call)
+                    if self._runs_in_background(tool_name):
+                        executor = self._get_executor()
+                    elif self.config.stream:
+                        executor = self._get_screen_executor()
+                    else:
+                        results[index] = self._execute_tool(tool_name, tool_args)
+                        return
+                    results[index] = executor.submit(
+                        iteration_context.copy().run, self._execute_tool, tool_name, tool_args
+                    )
+                
+                # 调用 LLM
+                if self.config.stream:
+                    message = self._stream_llm(dispatch)
+                else:
+                    message = self._call_llm()
                 
-                # 处理每个 tool call
-                for tool_call in message["tool_calls"]:
-                    tool_id = tool_call["id"]
-                    tool_name = tool_call["function"]["name"]
-                    tool_args_str = tool_call["function"].get("arguments", "{}")
-                    
-                    try:
-                        tool_args = json.loads(tool_args_str)
-                    except json.JSONDecodeError:
-                        tool_args = {}
-                    
-                    print(f"[Tool Call] {tool_name}({tool_args})")
-                    
-                    # 执行工具
-                    result = self._execute_tool(tool_name, tool_args)
-                    print(f"[Tool Result] {result.text[:100]}..." if len(result.text) > 100 else f"[Tool Result] {result.text}")
-                    
-                    # 将工具结果加入历史（纯文本）
-                    tool_response_text = result.text
-                    if result.image_base64:
-                        tool_response_text += " 截图已生成，用户将上传截图。"
-                        print(f"[Tool Result] (图片将作为 user message 发送，长度: {len(result.image_base64)})")
-                    
-                    self.messages.append({
-                        "role": "tool",
-                        "tool_call_id": tool_id,
-                        "content": tool_response_text
-                    })
-                    
-                    # 如果有图片，作为 user message 发送
-                    if result.image_base64:
-                        self.messages.append({
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": "这是刚才操作后的屏幕截图，请根据截图继续操作："},
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/png;base64,{result.image_base64}"
-                                    }
-                                }
-                            ]
-                        })
-                        print("[User] (上传截图)")
-            else:
                 # 没有 tool_calls，返回最终回复
-                final_reply = message.get("content", "")
-                self.messages.append({
-                    "role": "assistant",
-                    "content": final_reply
-                })
-                print(f"\n[Assistant] {final_reply}")
-                return final_reply
+                if not message.get("tool_calls"):
+                    self.completed = True
+                    return self._append_final_reply(message)
+                
+                self._append_assistant_tool_calls(message)
+                tool_calls = message["tool_calls"]
+                
+                # 先提交可并行的调用，使其与后面的屏幕操作重叠执行
+                for index, tool_call in enumerate(tool_calls):
+                    if index not in results and self._runs_in_background(tool_call["function"]["name"]):
+                        dispatch(index, tool_call)
+                
+                # 按顺序执行其余（操作屏幕的）调用
+                for index, tool_call in enumerate(tool_calls):
+                    if index not in results:
+                        dispatch(index, tool_call)
+                
+                # 按原始顺序写入历史
+                for index, tool_call in enumerate(tool_calls):
+                    result = results[index]
+                    if isinstance(result, Future):
+                        result = result.result()
+                    self._commit_tool_result(tool_call, result)
         
         # 达到最大迭代次数
         return "[Agent] 达到最大迭代次数，停止执行"
     
     def reset(self) -> None:
         """重置对话历史"""
-        self.messages = []
+        self.context.clear()
+        if self._owns_image_store:
+            self.image_store.close()
+        self._last_image_hash = None
+        self._observed_hash = None
+        self._recording = None
+        self._delta_base = None
+        for tool in self.tools.values():
+            if tool.reset is not None:
+                tool.reset()
         if self.system_prompt:
-            self.messages.append({
+            self.context.append({
                 "role": "system",
                 "content": self.system_prompt
             })
-        print("[Agent] 对话历史已重置")
+        tracing.event("agent.reset")
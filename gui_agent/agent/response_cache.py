@@ -0,0 +1,160 @@
+"""
+LLM 响应缓存 - 相同请求直接返回缓存的 assistant message
+
+缓存键是模型、工具 schema 与发送消息的哈希。历史中的图片是按内容哈希寻址的引用，
+计算键时不需要展开图片本体：画面与历史完全相同的重复运行得到相同的键。
+缓存保存在磁盘目录中，每条响应一个 JSON 文件，总大小超出上限时按 LRU 淘汰。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from ..config import RESPONSE_CACHE_MAX_BYTES
+
+
+class ResponseCache:
+    """
+    磁盘上的 LRU 响应缓存，线程安全
+    
+    可在多个 Agent 之间共享同一个实例；多个进程也可以共享同一目录（写入为原子替换，
+    本进程未见过的键会回退到读取磁盘文件）。
+    """
+    
+    def __init__(self, directory: os.PathLike, max_bytes: int = RESPONSE_CACHE_MAX_BYTES):
+        """
+        Args:
+            directory: 缓存目录，不存在时创建
+            max_bytes: 缓存文件总字节上限，超出后删除最久未使用的响应
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, int] = OrderedDict()  # 键 -> 文件字节数，按最近使用排序
+        self._bytes = 0
+        self._lock = threading.Lock()
+        
+        # 按访问时间（命中时更新 mtime）恢复已有缓存的 LRU 顺序
+        paths = []
+        for path in self.directory.glob("*.json"):
+            try:
+                paths.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        for _, path in sorted(paths):
+            self._add(path.stem, path)
+        with self._lock:
+            self._evict()
+    
+    @staticmethod
+    def key(model: str, tools: Optional[list[dict]], messages: list[dict]) -> str:
+        """
+        计算请求的缓存键
+        
+        Args:
+            model: 模型名称
+            tools: 工具 schema，None 表示不带工具
+            messages: 发送的消息（图片为存储引用，不展开）
+        """
+        # 值为 None 的字段与缺省等价（例如 assistant 的 content: null）
+        normalized = [
+            {name: value for name, value in message.items() if value is not None}
+            for message in messages
+        ]
+        data = json.dumps(
+            {"model": model, "tools": tools, "messages": normalized},
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":")
+        )
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+    
+    @property
+    def size_bytes(self) -> int:
+        """缓存文件总字节数"""
+        return self._bytes
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+    
+    def _add(self, key: str, path: Path) -> None:
+        """将磁盘上已有的缓存文件登记为最近使用"""
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._bytes += size
+    
+    def _discard(self, key: str) -> None:
+        """删除一条缓存（调用方持有锁）"""
+        self._bytes -= self._entries.pop(key, 0)
+        self._path(key).unlink(missing_ok=True)
+    
+    def _evict(self) -> None:
+        """超出上限时删除最久未使用的响应（调用方持有锁）"""
+        while self._bytes > self.max_bytes and self._entries:
+            self._discard(next(iter(self._entries)))
+    
+    def get(self, key: str) -> Optional[dict]:
+        """
+        读取缓存的 assistant message
+        
+        Returns:
+            缓存的 message，未命中返回 None
+        """
+        path = self._path(key)
+        with self._lock:
+            known = key in self._entries
+        if not known and not path.exists():
+            self.misses += 1
+            return None
+        
+        try:
+            message = json.loads(path.read_text(encoding="utf-8"))["message"]
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self._discard(key)
+            self.misses += 1
+            return None
+        
+        # 更新访问时间，重启后仍能恢复 LRU 顺序
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._add(key, path)
+        self.hits += 1
+        return message
+    
+    def put(self, key: str, message: dict) -> None:
+        """保存 assistant message"""
+        data = json.dumps({"message": message}, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            self._bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._bytes += len(data)
+            self._evict()
+    
+    def clear(self) -> None:
+        """删除所有缓存"""
+        with self._lock:
+            for key in list(self._entries):
+                self._discard(key)
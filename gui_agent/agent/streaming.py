@@ -0,0 +1,143 @@
+"""
+流式响应解析 - SSE chunk 增量组装
+在流式输出过程中识别已完整的 tool call，以便提前执行
+"""
+
+import json
+from typing import Optional
+
+
+SSE_DONE = "[DONE]"
+
+
+def parse_sse_line(line: str) -> Optional[str]:
+    """
+    解析一行 SSE 数据
+    
+    Returns:
+        "data:" 之后的内容；空行、注释行、非 data 字段返回 None
+    """
+    if not line:
+        return None
+    line = line.strip()
+    if not line.startswith("data:"):
+        return None
+    return line[len("data:"):].strip()
+
+
+def _is_complete_json(arguments: str) -> bool:
+    """参数字符串是否已经是完整的 JSON 对象"""
+    if not arguments.rstrip().endswith("}"):
+        return False
+    try:
+        return isinstance(json.loads(arguments), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+class StreamAssembler:
+    """
+    流式 assistant message 组装器
+    
+    逐个喂入 chunk，返回其中刚刚组装完整的 tool calls 及其在 message()["tool_calls"] 中的位置
+    （tool call id 可能缺失或重复，调用方应按位置对应结果）。判定完整的条件:
+    1. arguments 已是完整的 JSON 对象；或
+    2. 出现了下一个 index 的 tool call，且之前的 tool call 没有参数（有参数但尚不完整时，
+       可能是交错发送的多个 tool call，等待参数完整或流结束）；或
+    3. 流结束（finish）
+    
+    每个 tool call 只会被返回一次，最终 message() 仍包含全部内容用于写入历史。
+    """
+    
+    def __init__(self):
+        self._content_parts: list[str] = []
+        self.usage: Optional[dict] = None  # 最后一个 chunk 中的 token 用量（请求了 include_usage 时）
+        self._tool_calls: dict[int, dict] = {}  # 流中的 index -> tool call，按首次出现的顺序
+        self._completed: set[int] = set()
+    
+    def feed_line(self, line: str) -> list[tuple[int, dict]]:
+        """喂入一行 SSE 文本"""
+        data = parse_sse_line(line)
+        if data is None or data == SSE_DONE:
+            return []
+        return self.feed_chunk(json.loads(data))
+    
+    def feed_chunk(self, chunk: dict) -> list[tuple[int, dict]]:
+        """喂入一个已解析的 chunk，返回刚刚完整的 (位置, tool call)"""
+        if "error" in chunk:
+            raise RuntimeError(f"API 错误: {chunk['error']}")
+        
+        if chunk.get("usage"):
+            self.usage = chunk["usage"]
+        
+        ready = []
+        for choice in chunk.get("choices", []):
+            delta = choice.get("delta") or {}
+            
+            if delta.get("content"):
+                self._content_parts.append(delta["content"])
+            
+            for tool_delta in delta.get("tool_calls") or []:
+                index = self._index_of(tool_delta)
+                
+                # 新的 index 出现，之前没有参数的 tool call 已完整
+                ready.extend(
+                    self._complete(i) for i in sorted(self._tool_calls)
+                    if i < index and not self._tool_calls[i]["function"]["arguments"]
+                )
+                
+                tool_call = self._tool_calls.setdefault(index, {
+                    "id": "",
+                    "type": "function",
+                    "function": {"name": "", "arguments": ""}
+                })
+                if tool_delta.get("id"):
+                    tool_call["id"] = tool_delta["id"]
+                function = tool_delta.get("function") or {}
+                if function.get("name"):
+                    tool_call["function"]["name"] += function["name"]
+                if function.get("arguments"):
+                    tool_call["function"]["arguments"] += function["arguments"]
+                
+                if _is_complete_json(tool_call["function"]["arguments"]):
+                    ready.append(self._complete(index))
+        
+        return [item for item in ready if item is not None]
+    
+    def _index_of(self, tool_delta: dict) -> int:
+        """tool call delta 所属的 index；未提供 index 时，带新 id 或函数名的 delta 开始新的 tool call，其余续接最后一个"""
+        if "index" in tool_delta:
+            return tool_delta["index"]
+        if self._tool_calls:
+            last = next(reversed(self._tool_calls))
+            tool_call = self._tool_calls[last]
+            function = tool_delta.get("function") or {}
+            new_id = tool_delta.get("id") and tool_delta["id"] != tool_call["id"]
+            new_name = function.get("name") and tool_call["function"]["name"]
+            if not new_id and not new_name:
+                return last
+        return max(self._tool_calls, default=-1) + 1
+    
+    def finish(self) -> list[tuple[int, dict]]:
+        """流结束，返回尚未返回过的 (位置, tool call)"""
+        ready = [self._complete(i) for i in sorted(self._tool_calls)]
+        return [item for item in ready if item is not None]
+    
+    def _complete(self, index: int) -> Optional[tuple[int, dict]]:
+        """标记 tool call 完整，返回 (位置, tool call)；已返回过的返回 None"""
+        if index in self._completed:
+            return None
+        self._completed.add(index)
+        return list(self._tool_calls).index(index), self._tool_calls[index]
+    
+    def message(self) -> dict:
+        """组装完整的 assistant message"""
+        content = "".join(self._content_parts)
+        if not self._tool_calls:
+            return {"role": "assistant", "content": content}
+        
+        return {
+            "role": "assistant",
+            "content": content or None,
+            "tool_calls": list(self._tool_calls.values())
+        }
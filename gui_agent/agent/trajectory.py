@@ -0,0 +1,94 @@
+"""
+操作轨迹 - 录制成功的工具调用序列，重复任务时直接回放
+
+每一步记录工具调用及执行前后整屏的感知哈希。回放时逐步执行录制的调用，
+执行前的画面与录制时不一致（偏离）即停止回放，由模型从当前状态接着完成任务；
+全部步骤一致时直接返回录制的最终回复，整个任务不调用 LLM。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+
+@dataclass
+class TrajectoryStep:
+    """轨迹中的一步"""
+    tool: str
+    arguments: dict[str, Any]
+    pre_hash: Optional[str] = None  # 执行前整屏感知哈希（None 表示未知，回放时不校验）
+    post_hash: Optional[str] = None  # 执行后整屏感知哈希
+
+
+@dataclass
+class Trajectory:
+    """一次成功完成任务的操作轨迹"""
+    task: str
+    steps: list[TrajectoryStep] = field(default_factory=list)
+    final_reply: str = ""
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Trajectory":
+        return cls(
+            task=data["task"],
+            steps=[TrajectoryStep(**step) for step in data.get("steps", [])],
+            final_reply=data.get("final_reply", "")
+        )
+
+
+class TrajectoryStore:
+    """
+    按 (系统提示, 任务) 保存轨迹的目录，每条轨迹一个 JSON 文件
+    
+    同一任务再次成功完成时覆盖旧轨迹（例如回放中途偏离、由模型补全之后）。
+    写入先写临时文件再替换，可在多个 Agent / 进程之间共享同一目录。
+    """
+    
+    def __init__(self, directory: os.PathLike):
+        """
+        Args:
+            directory: 轨迹目录，不存在时创建
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+    
+    @staticmethod
+    def key(system_prompt: str, task: str) -> str:
+        """轨迹键：系统提示与任务文本的哈希"""
+        data = json.dumps([system_prompt, task], ensure_ascii=False).encode("utf-8")
+        return hashlib.sha256(data).hexdigest()
+    
+    def _path(self, system_prompt: str, task: str) -> Path:
+        return self.directory / f"{self.key(system_prompt, task)}.json"
+    
+    def get(self, system_prompt: str, task: str) -> Optional[Trajectory]:
+        """读取轨迹，不存在或文件损坏时返回 None"""
+        try:
+            data = json.loads(self._path(system_prompt, task).read_text(encoding="utf-8"))
+            return Trajectory.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+    
+    def put(self, system_prompt: str, trajectory: Trajectory) -> None:
+        """保存轨迹（覆盖同一任务的旧轨迹）"""
+        path = self._path(system_prompt, trajectory.task)
+        data = json.dumps(trajectory.to_dict(), ensure_ascii=False, indent=2)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    
+    def delete(self, system_prompt: str, task: str) -> None:
+        """删除轨迹"""
+        self._path(system_prompt, task).unlink(missing_ok=True)
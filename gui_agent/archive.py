@@ -0,0 +1,346 @@
+"""
+截图归档 - 按内容哈希去重保存截图，按运行分组，按总大小与保存时长淘汰
+
+目录结构:
+    objects/ab/abcdef....png    截图本体，文件名为内容 SHA-256 的前 32 位，相同画面只存一份
+    runs/<run_id>.jsonl         每次运行的清单，每张截图一行（时间、对象路径、尺寸、区域等）
+
+写盘在后台线程中进行，不占用 Agent 的关键路径；磁盘跟不上时（队列已满）丢弃新截图，
+记录 archive.dropped 事件。每次写盘记录一个 archive.write span，写盘失败时只丢弃这一张，
+错误记录在 span 中（启用指标后分别计入 gui_agent_archive_dropped_total 与 gui_agent_archive_errors_total）。
+对象总大小超出上限时删除最久未引用的对象，超出保存时长的对象与清单一并删除；
+清单数超出上限时删除最旧的清单（清单中可能引用已被淘汰的对象）。旧版本直接保存在目录下的 screenshot_*.png 同样计入总大小并参与淘汰。
+
+是否归档与采样比例按运行设置，Agent 在 run 期间根据 AgentConfig 自动设置：
+    with archive_run(sample_rate=0.25):
+        ...  # 期间的截图每 4 张归档 1 张
+不在任何运行中的截图归入本进程的默认运行。
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import itertools
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from . import tracing
+from .config import (
+    SCREENSHOT_DIR,
+    SCREENSHOT_ARCHIVE_MAX_BYTES,
+    SCREENSHOT_ARCHIVE_MAX_AGE,
+    SCREENSHOT_ARCHIVE_MAX_MANIFESTS,
+    SCREENSHOT_ARCHIVE_SAMPLE_RATE,
+)
+
+
+# 清单的清理间隔（秒）：按保存时长删除旧清单需要遍历 runs 目录，不在每次写入时进行
+_MANIFEST_PRUNE_INTERVAL = 3600
+
+
+def _new_run_id() -> str:
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.urandom(4).hex()}"
+
+
+class ArchiveRun:
+    """一次运行的归档设置与采样状态，线程安全"""
+    
+    def __init__(
+        self,
+        run_id: Optional[str] = None,
+        enabled: bool = True,
+        sample_rate: float = 1.0,
+        trace_id: Optional[str] = None
+    ):
+        """
+        Args:
+            run_id: 清单文件名，None 表示按时间生成
+            enabled: 是否归档
+            sample_rate: 归档比例 (0-1]，按间隔均匀采样，第一张总是归档
+            trace_id: 所属 trace，写入清单以便与追踪记录对应
+        """
+        self.run_id = run_id or _new_run_id()
+        self.enabled = enabled
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.trace_id = trace_id
+        self._credit = 1.0 - self.sample_rate
+        self._lock = threading.Lock()
+    
+    def sample(self) -> bool:
+        """本张截图是否归档"""
+        if not self.enabled or self.sample_rate <= 0:
+            return False
+        with self._lock:
+            self._credit += self.sample_rate
+            if self._credit < 1.0:
+                return False
+            self._credit -= 1.0
+            return True
+
+
+_current_run: contextvars.ContextVar[Optional[ArchiveRun]] = contextvars.ContextVar("gui_agent_archive_run", default=None)
+_default_run: Optional[ArchiveRun] = None
+_default_run_lock = threading.Lock()
+
+
+def current_run() -> ArchiveRun:
+    """当前上下文中的运行，不在运行中时为本进程的默认运行"""
+    global _default_run
+    run = _current_run.get()
+    if run is not None:
+        return run
+    with _default_run_lock:
+        if _default_run is None:
+            _default_run = ArchiveRun(sample_rate=SCREENSHOT_ARCHIVE_SAMPLE_RATE)
+        return _default_run
+
+
+@contextlib.contextmanager
+def archive_run(
+    run_id: Optional[str] = None,
+    enabled: bool = True,
+    sample_rate: float = SCREENSHOT_ARCHIVE_SAMPLE_RATE
+) -> Iterator[ArchiveRun]:
+    """
+    块内（同一线程 / asyncio 任务，以及复制了上下文的线程）的截图归入同一个运行
+    
+    Args:
+        run_id: 清单文件名，None 表示按时间生成
+        enabled: 是否归档
+        sample_rate: 归档比例 (0-1]
+    """
+    span = tracing.current_span()
+    run = ArchiveRun(run_id, enabled, sample_rate, trace_id=span.trace_id if span is not None else None)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+class ScreenshotArchive:
+    """
+    磁盘上的截图归档（后台线程写盘）
+    
+    同一目录应共享一个实例（见 get_screenshot_archive），否则各实例分别统计总大小。
+    多个进程可以共享同一目录：对象以原子替换写入，清单按行追加。
+    """
+    
+    def __init__(
+        self,
+        directory: os.PathLike,
+        max_bytes: int = SCREENSHOT_ARCHIVE_MAX_BYTES,
+        max_age: Optional[float] = SCREENSHOT_ARCHIVE_MAX_AGE,
+        max_manifests: Optional[int] = SCREENSHOT_ARCHIVE_MAX_MANIFESTS,
+        max_pending: int = 32
+    ):
+        """
+        Args:
+            directory: 归档目录，不存在时在首次写入时创建
+            max_bytes: 对象总字节上限，超出后删除最久未引用的截图
+            max_age: 截图与清单的最长保存时间（秒），None 表示不按时长淘汰
+            max_manifests: 保留的运行清单数上限，超出时删除最旧的清单，None 表示不限
+            max_pending: 等待写盘的截图数上限，超出时丢弃新截图
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_manifests = max_manifests
+        self.saved = 0  # 写入的新对象数
+        self.deduplicated = 0  # 与已有对象内容相同、只记录清单的截图数
+        self.dropped = 0  # 队列已满被丢弃的截图数
+        self.errors = 0  # 写盘失败的截图数
+        self._objects: OrderedDict[str, tuple[float, int]] = OrderedDict()  # 相对归档目录的路径 -> (最近引用时间, 字节数)
+        self._bytes = 0
+        self._manifests = 0  # runs 目录中的清单数（创建清单时累加，清理时重新统计）
+        self._next_prune = 0.0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="screenshot-archive", daemon=True)
+        self._thread.start()
+    
+    @property
+    def objects_dir(self) -> Path:
+        return self.directory / "objects"
+    
+    @property
+    def runs_dir(self) -> Path:
+        return self.directory / "runs"
+    
+    @property
+    def size_bytes(self) -> int:
+        """归档对象总字节数"""
+        return self._bytes
+    
+    def manifest_path(self, run_id: str) -> Path:
+        """运行的清单文件"""
+        return self.runs_dir / f"{run_id}.jsonl"
+    
+    def submit(self, data: bytes, extension: str, **fields) -> bool:
+        """
+        提交一张编码后的截图（按当前运行的设置决定是否归档）
+        
+        Args:
+            data: 编码后的图片字节
+            extension: 文件扩展名，例如 png
+            **fields: 写入清单的附加字段，例如 width、height
+        
+        Returns:
+            是否已入队
+        """
+        run = current_run()
+        if not run.sample():
+            return False
+        try:
+            self._queue.put_nowait((run, time.time(), data, extension, fields))
+        except queue.Full:
+            self.dropped += 1
+            tracing.event("archive.dropped", run_id=run.run_id, pending=self._queue.qsize())
+            return False
+        return True
+    
+    def flush(self) -> None:
+        """等待已提交的截图全部写完"""
+        self._queue.join()
+    
+    def _run(self) -> None:
+        with tracing.span("archive.load", directory=str(self.directory)) as span:
+            try:
+                self._load()
+            except OSError as e:
+                # 记录在 span 中，之后仍继续写入
+                span.error = f"{type(e).__name__}: {e}"
+                self.errors += 1
+            span.set(objects=len(self._objects), archive_bytes=self._bytes)
+        
+        while True:
+            run, timestamp, data, extension, fields = self._queue.get()
+            try:
+                with tracing.span("archive.write", run_id=run.run_id, bytes=len(data)) as span:
+                    span.set(deduplicated=self._write(run, timestamp, data, extension, fields), archive_bytes=self._bytes)
+            except OSError:
+                # 磁盘已满、目录不可写等：只丢弃这一张，错误已记录在 archive.write span 中
+                self.errors += 1
+            finally:
+                self._queue.task_done()
+    
+    def _load(self) -> None:
+        """按修改时间（引用时更新）恢复已有对象（含旧版本的 screenshot_*.png）的淘汰顺序"""
+        entries = []
+        for path in itertools.chain(self.objects_dir.glob("*/*"), self.directory.glob("screenshot_*.*")):
+            if path.suffix == ".tmp":
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.relative_to(self.directory).as_posix(), stat.st_size))
+        for mtime, name, size in sorted(entries):
+            self._objects[name] = (mtime, size)
+            self._bytes += size
+        self._manifests = sum(1 for _ in self.runs_dir.glob("*.jsonl"))
+        self._evict(time.time())
+    
+    def _write(self, run: ArchiveRun, timestamp: float, data: bytes, extension: str, fields: dict) -> bool:
+        """写入对象与清单，返回是否与已有对象内容相同"""
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        name = f"objects/{digest[:2]}/{digest}.{extension}"
+        path = self.directory / name
+        
+        try:
+            # 已有相同内容：只更新引用时间
+            os.utime(path, (timestamp, timestamp))
+            self.deduplicated += 1
+            deduplicated = True
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            self.saved += 1
+            deduplicated = False
+        self._bytes -= self._objects.pop(name, (0.0, 0))[1]
+        self._objects[name] = (timestamp, len(data))
+        self._bytes += len(data)
+        
+        record = {
+            "time": datetime.fromtimestamp(timestamp).isoformat(timespec="milliseconds"),
+            "object": name,
+            "bytes": len(data),
+            "trace_id": run.trace_id,
+            **fields,
+        }
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.manifest_path(run.run_id)
+        if not manifest_path.exists():
+            self._manifests += 1
+        with open(manifest_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        
+        self._evict(timestamp)
+        return deduplicated
+    
+    def _evict(self, now: float) -> None:
+        """删除超出总大小或保存时长的对象；定期删除过期清单，清单数超出上限时删除最旧的清单"""
+        expires = now - self.max_age if self.max_age is not None else None
+        while self._objects:
+            name, (referenced, size) = next(iter(self._objects.items()))
+            if self._bytes <= self.max_bytes and (expires is None or referenced >= expires):
+                break
+            del self._objects[name]
+            self._bytes -= size
+            (self.directory / name).unlink(missing_ok=True)
+        
+        prune_expired = expires is not None and now >= self._next_prune
+        too_many = self.max_manifests is not None and self._manifests > self.max_manifests
+        if prune_expired or too_many:
+            if prune_expired:
+                self._next_prune = now + _MANIFEST_PRUNE_INTERVAL
+            self._prune_manifests(expires)
+    
+    def _prune_manifests(self, expires: Optional[float]) -> None:
+        """删除修改时间早于 expires 的清单，再按修改时间从旧到新删除超出数量上限的清单"""
+        manifests = []
+        for path in self.runs_dir.glob("*.jsonl"):
+            try:
+                manifests.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        manifests.sort()
+        
+        excess = len(manifests) - self.max_manifests if self.max_manifests is not None else 0
+        remaining = len(manifests)
+        for index, (mtime, path) in enumerate(manifests):
+            if index >= excess and (expires is None or mtime >= expires):
+                continue
+            try:
+                path.unlink()
+                remaining -= 1
+            except OSError:
+                continue
+        self._manifests = remaining
+
+
+_archives: dict[Path, ScreenshotArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_screenshot_archive(directory: os.PathLike = SCREENSHOT_DIR) -> ScreenshotArchive:
+    """目录对应的共享归档实例（首次使用时创建）"""
+    key = Path(directory).resolve()
+    with _archives_lock:
+        if key not in _archives:
+            _archives[key] = ScreenshotArchive(key)
+        return _archives[key]
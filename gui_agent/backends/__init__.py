@@ -0,0 +1,31 @@
+"""后端模块 - 输入注入、截屏"""
+
+from .capture import (
+    Frame,
+    CaptureBackend,
+    PyAutoGUICaptureBackend,
+    XShmCaptureBackend,
+    create_capture_backend,
+    get_capture_backend,
+)
+from .input import (
+    InputBackend,
+    PyAutoGUIInputBackend,
+    XTestInputBackend,
+    create_input_backend,
+    get_input_backend,
+)
+
+__all__ = [
+    "Frame",
+    "CaptureBackend",
+    "PyAutoGUICaptureBackend",
+    "XShmCaptureBackend",
+    "create_capture_backend",
+    "get_capture_backend",
+    "InputBackend",
+    "PyAutoGUIInputBackend",
+    "XTestInputBackend",
+    "create_input_backend",
+    "get_input_backend",
+]
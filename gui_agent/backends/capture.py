@@ -0,0 +1,367 @@
+"""
+截屏后端 - 获取屏幕像素
+
+- XShmCaptureBackend：Linux/X11 下通过 MIT-SHM 共享内存截屏（ctypes 调用 libX11 / libXext），
+  X server 直接把像素写入复用的共享内存缓冲区，以 NumPy 数组视图暴露，不做任何拷贝
+- PyAutoGUICaptureBackend：跨平台回退实现
+
+截屏结果为 Frame，只在需要编码时才转换为 PIL 图片；稳定检测等高频采样直接在数组上计算。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import sys
+import threading
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from ..config import CAPTURE_BACKEND
+
+
+class Frame:
+    """
+    一帧屏幕像素
+    
+    array 可能是后端复用缓冲区的视图，只在下一次截屏之前有效；需要保留时调用 to_image()。
+    """
+    
+    def __init__(self, array: Optional[np.ndarray] = None, channel_order: str = "RGB", image: Optional[Image.Image] = None):
+        """
+        Args:
+            array: 像素数组 (高, 宽, 通道)，uint8
+            channel_order: 通道顺序 RGB / BGRX
+            image: 已有的 PIL 图片（回退后端直接提供），array 为 None 时按需从图片生成
+        """
+        self._array = array
+        self.channel_order = channel_order
+        self._image = image
+    
+    @classmethod
+    def from_image(cls, image: Image.Image) -> "Frame":
+        return cls(image=image.convert("RGB") if image.mode != "RGB" else image)
+    
+    @property
+    def array(self) -> np.ndarray:
+        if self._array is None:
+            self._array = np.asarray(self._image)
+        return self._array
+    
+    @property
+    def width(self) -> int:
+        return self._image.width if self._image is not None else self._array.shape[1]
+    
+    @property
+    def height(self) -> int:
+        return self._image.height if self._image is not None else self._array.shape[0]
+    
+    def to_image(self) -> Image.Image:
+        """转换为 RGB PIL 图片（拷贝像素，之后与后端缓冲区无关）"""
+        if self._image is None:
+            if self.channel_order == "BGRX":
+                pixels = np.ascontiguousarray(self._array)
+                self._image = Image.frombuffer("RGB", (self.width, self.height), pixels, "raw", "BGRX", 0, 1)
+            else:
+                self._image = Image.fromarray(np.array(self._array[:, :, :3]), "RGB")
+        return self._image
+    
+    def gray_thumbnail(self, width: int) -> np.ndarray:
+        """
+        区块平均的低分辨率灰度缩略图（以绿色通道近似亮度），用于高频的变化检测
+        
+        Returns:
+            (高, 宽) uint8 数组，宽度约为 width
+        """
+        array = self.array
+        height_px, width_px = array.shape[:2]
+        step = max(1, width_px // width)
+        rows, cols = height_px // step, width_px // step
+        green = array[:rows * step, :cols * step, 1]
+        blocks = green.reshape(rows, step, cols, step).sum(axis=(1, 3), dtype=np.uint32)
+        return (blocks // (step * step)).astype(np.uint8)
+
+
+class CaptureBackend:
+    """截屏后端接口"""
+    
+    name = "base"
+    
+    def size(self) -> tuple[int, int]:
+        """屏幕像素尺寸 (宽, 高)"""
+        raise NotImplementedError
+    
+    def grab(self) -> Frame:
+        """截取整个屏幕"""
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        """释放后端资源"""
+
+
+class PyAutoGUICaptureBackend(CaptureBackend):
+    """基于 pyautogui.screenshot 的截屏后端（跨平台回退）"""
+    
+    name = "pyautogui"
+    
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+    
+    def size(self) -> tuple[int, int]:
+        width, height = self._pyautogui.size()
+        return width, height
+    
+    def grab(self) -> Frame:
+        return Frame.from_image(self._pyautogui.screenshot())
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class _XImage(ctypes.Structure):
+    # 只声明用到的前半部分字段
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+
+class _XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+    ]
+
+
+_ZPIXMAP = 2
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+_ALL_PLANES = ctypes.c_ulong(-1).value
+
+_x_errors: list[int] = []
+_x_error_handler = None
+_x_libraries = None
+_x_libraries_lock = threading.Lock()
+
+
+def _load_x_libraries():
+    """加载 libX11 / libXext / libc 并声明函数签名（只加载一次）"""
+    global _x_libraries, _x_error_handler
+    with _x_libraries_lock:
+        if _x_libraries is not None:
+            return _x_libraries
+        
+        x11_path, xext_path = ctypes.util.find_library("X11"), ctypes.util.find_library("Xext")
+        if not x11_path or not xext_path:
+            raise RuntimeError("未找到 libX11 / libXext")
+        x11 = ctypes.CDLL(x11_path)
+        xext = ctypes.CDLL(xext_path)
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        
+        display_p, image_p, shminfo_p = ctypes.c_void_p, ctypes.POINTER(_XImage), ctypes.POINTER(_XShmSegmentInfo)
+        signatures = [
+            (x11.XOpenDisplay, [ctypes.c_char_p], display_p),
+            (x11.XCloseDisplay, [display_p], ctypes.c_int),
+            (x11.XDefaultScreen, [display_p], ctypes.c_int),
+            (x11.XRootWindow, [display_p, ctypes.c_int], ctypes.c_ulong),
+            (x11.XDefaultVisual, [display_p, ctypes.c_int], ctypes.c_void_p),
+            (x11.XDefaultDepth, [display_p, ctypes.c_int], ctypes.c_int),
+            (x11.XDisplayWidth, [display_p, ctypes.c_int], ctypes.c_int),
+            (x11.XDisplayHeight, [display_p, ctypes.c_int], ctypes.c_int),
+            (x11.XSync, [display_p, ctypes.c_int], ctypes.c_int),
+            (x11.XDestroyImage, [image_p], ctypes.c_int),
+            (xext.XShmQueryExtension, [display_p], ctypes.c_int),
+            (xext.XShmCreateImage, [display_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                    ctypes.c_char_p, shminfo_p, ctypes.c_uint, ctypes.c_uint], image_p),
+            (xext.XShmAttach, [display_p, shminfo_p], ctypes.c_int),
+            (xext.XShmDetach, [display_p, shminfo_p], ctypes.c_int),
+            (xext.XShmGetImage, [display_p, ctypes.c_ulong, image_p, ctypes.c_int, ctypes.c_int, ctypes.c_ulong], ctypes.c_int),
+            (libc.shmget, [ctypes.c_int, ctypes.c_size_t, ctypes.c_int], ctypes.c_int),
+            (libc.shmat, [ctypes.c_int, ctypes.c_void_p, ctypes.c_int], ctypes.c_void_p),
+            (libc.shmdt, [ctypes.c_void_p], ctypes.c_int),
+            (libc.shmctl, [ctypes.c_int, ctypes.c_int, ctypes.c_void_p], ctypes.c_int),
+        ]
+        for func, argtypes, restype in signatures:
+            func.argtypes = argtypes
+            func.restype = restype
+        
+        # Xlib 默认的错误处理会直接退出进程，改为记录错误码
+        handler_type = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(_XErrorEvent))
+        
+        def on_error(display, event):
+            _x_errors.append(event.contents.error_code)
+            return 0
+        
+        _x_error_handler = handler_type(on_error)
+        x11.XSetErrorHandler.argtypes = [handler_type]
+        x11.XSetErrorHandler(_x_error_handler)
+        
+        _x_libraries = (x11, xext, libc)
+        return _x_libraries
+
+
+class XShmCaptureBackend(CaptureBackend):
+    """
+    基于 MIT-SHM 的截屏后端（Linux/X11）
+    
+    共享内存段与 XImage 只创建一次；每次 grab 由 X server 直接写入同一块内存，
+    返回的 Frame 是该内存的 NumPy 视图（BGRX），下一次 grab 会覆盖其内容。
+    """
+    
+    name = "xshm"
+    
+    def __init__(self, display_name: Optional[str] = None):
+        """
+        Args:
+            display_name: X display，例如 ":1"；None 使用 DISPLAY 环境变量
+        """
+        self._x11, self._xext, self._libc = _load_x_libraries()
+        self._lock = threading.Lock()
+        self._shminfo = _XShmSegmentInfo()
+        self._image = None
+        
+        name = display_name.encode() if display_name else None
+        self._display = self._x11.XOpenDisplay(name)
+        if not self._display:
+            raise RuntimeError(f"无法连接 X display: {display_name or os.environ.get('DISPLAY')}")
+        
+        try:
+            self._setup()
+        except Exception:
+            self.close()
+            raise
+    
+    def _setup(self) -> None:
+        x11, xext, libc = self._x11, self._xext, self._libc
+        if not xext.XShmQueryExtension(self._display):
+            raise RuntimeError("X server 不支持 MIT-SHM 扩展")
+        
+        screen = x11.XDefaultScreen(self._display)
+        self._root = x11.XRootWindow(self._display, screen)
+        self._width = x11.XDisplayWidth(self._display, screen)
+        self._height = x11.XDisplayHeight(self._display, screen)
+        
+        self._image = xext.XShmCreateImage(
+            self._display,
+            x11.XDefaultVisual(self._display, screen),
+            x11.XDefaultDepth(self._display, screen),
+            _ZPIXMAP,
+            None,
+            ctypes.byref(self._shminfo),
+            self._width,
+            self._height
+        )
+        if not self._image:
+            raise RuntimeError("XShmCreateImage 失败")
+        image = self._image.contents
+        if image.bits_per_pixel != 32:
+            raise RuntimeError(f"不支持的像素格式: {image.bits_per_pixel} bpp")
+        
+        size = image.bytes_per_line * image.height
+        self._shminfo.shmid = libc.shmget(_IPC_PRIVATE, size, _IPC_CREAT | 0o600)
+        if self._shminfo.shmid < 0:
+            raise OSError(ctypes.get_errno(), "shmget 失败")
+        address = libc.shmat(self._shminfo.shmid, None, 0)
+        if address in (None, ctypes.c_void_p(-1).value):
+            libc.shmctl(self._shminfo.shmid, _IPC_RMID, None)
+            raise OSError(ctypes.get_errno(), "shmat 失败")
+        self._shminfo.shmaddr = address
+        self._shminfo.readOnly = 0
+        image.data = address
+        
+        del _x_errors[:]
+        attached = xext.XShmAttach(self._display, ctypes.byref(self._shminfo))
+        x11.XSync(self._display, 0)
+        # 两端都已映射后立即标记删除，进程退出时由内核回收
+        libc.shmctl(self._shminfo.shmid, _IPC_RMID, None)
+        if not attached or _x_errors:
+            self._shminfo.shmid = -1
+            raise RuntimeError("XShmAttach 失败（X server 可能不在本机）")
+        
+        buffer = (ctypes.c_ubyte * size).from_address(address)
+        pixels = np.ctypeslib.as_array(buffer).reshape(image.height, image.bytes_per_line // 4, 4)
+        self._array = pixels[:, :self._width]
+    
+    def size(self) -> tuple[int, int]:
+        return self._width, self._height
+    
+    def grab(self) -> Frame:
+        with self._lock:
+            if not self._xext.XShmGetImage(self._display, self._root, self._image, 0, 0, _ALL_PLANES):
+                raise RuntimeError("XShmGetImage 失败")
+            return Frame(self._array, channel_order="BGRX")
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._display is None:
+                return
+            if self._shminfo.shmaddr:
+                if self._shminfo.shmid >= 0:
+                    self._xext.XShmDetach(self._display, ctypes.byref(self._shminfo))
+                    self._x11.XSync(self._display, 0)
+                self._libc.shmdt(self._shminfo.shmaddr)
+                self._shminfo.shmaddr = None
+            if self._image:
+                # XShm 图片的析构只释放结构体本身，不释放共享内存
+                self._x11.XDestroyImage(self._image)
+                self._image = None
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
+
+
+def create_capture_backend(name: str = CAPTURE_BACKEND, display_name: Optional[str] = None) -> CaptureBackend:
+    """
+    创建截屏后端
+    
+    Args:
+        name: auto / xshm / pyautogui；auto 在 Linux/X11 且支持 MIT-SHM 时使用 xshm，否则回退 pyautogui
+        display_name: X display，仅 xshm 使用
+    """
+    if name == "pyautogui":
+        return PyAutoGUICaptureBackend()
+    if name == "xshm":
+        return XShmCaptureBackend(display_name)
+    if name != "auto":
+        raise ValueError(f"未知的截屏后端: {name}")
+    
+    if sys.platform.startswith("linux") and (display_name or os.environ.get("DISPLAY")):
+        try:
+            return XShmCaptureBackend(display_name)
+        except Exception:
+            pass
+    return PyAutoGUICaptureBackend()
+
+
+_default_backend: Optional[CaptureBackend] = None
+_default_backend_lock = threading.Lock()
+
+
+def get_capture_backend() -> CaptureBackend:
+    """获取全局默认截屏后端（首次调用时按 CAPTURE_BACKEND 创建）"""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = create_capture_backend()
+        return _default_backend
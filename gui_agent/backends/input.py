@@ -0,0 +1,311 @@
+"""
+输入后端 - 鼠标 / 键盘事件注入
+
+- XTestInputBackend：Linux/X11 下通过 XTest 扩展直接注入事件（需要 python-xlib），
+  没有 pyautogui 每次调用后的 PAUSE，ASCII 文本可直接逐键输入而无需经过剪贴板
+- PyAutoGUIInputBackend：跨平台回退实现
+
+坐标均为屏幕像素坐标；按键名沿用 pyautogui 的命名（enter、tab、ctrl、shift、alt 等）。
+"""
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from ..config import INPUT_BACKEND
+
+
+class InputBackend:
+    """输入后端接口"""
+    
+    name = "base"
+    
+    def size(self) -> tuple[int, int]:
+        """屏幕尺寸 (宽, 高)，像素"""
+        raise NotImplementedError
+    
+    def move(self, x: int, y: int) -> None:
+        """移动鼠标"""
+        raise NotImplementedError
+    
+    def click(self, x: int, y: int, button: str = "left", count: int = 1) -> None:
+        """
+        在指定位置点击
+        
+        Args:
+            button: left / right / middle
+            count: 连续点击次数（2 为双击）
+        """
+        raise NotImplementedError
+    
+    def scroll(self, amount: int) -> None:
+        """在鼠标当前位置滚动，正数向上，负数向下（滚轮单位）"""
+        raise NotImplementedError
+    
+    def press(self, *keys: str) -> None:
+        """
+        按下按键；多个按键时作为组合键（依次按下、逆序松开）
+        
+        Raises:
+            ValueError: 未知按键
+        """
+        raise NotImplementedError
+    
+    def can_type(self, text: str) -> bool:
+        """text 能否通过逐键输入（不经过剪贴板）"""
+        return False
+    
+    def type_text(self, text: str) -> None:
+        """逐键输入文本（需 can_type 为 True）"""
+        raise NotImplementedError
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """批量注入：块内的事件合并后一次性提交"""
+        yield
+    
+    def close(self) -> None:
+        """释放后端资源"""
+
+
+class PyAutoGUIInputBackend(InputBackend):
+    """基于 pyautogui 的输入后端（跨平台回退）"""
+    
+    name = "pyautogui"
+    
+    def __init__(self):
+        import pyautogui
+        self._pyautogui = pyautogui
+    
+    def size(self) -> tuple[int, int]:
+        width, height = self._pyautogui.size()
+        return width, height
+    
+    def move(self, x: int, y: int) -> None:
+        self._pyautogui.moveTo(x, y)
+    
+    def click(self, x: int, y: int, button: str = "left", count: int = 1) -> None:
+        if button == "left" and count == 2:
+            self._pyautogui.doubleClick(x, y)
+        elif button == "right" and count == 1:
+            self._pyautogui.rightClick(x, y)
+        elif button == "left" and count == 1:
+            self._pyautogui.click(x, y)
+        else:
+            self._pyautogui.click(x, y, clicks=count, button=button)
+    
+    def scroll(self, amount: int) -> None:
+        self._pyautogui.scroll(amount)
+    
+    def press(self, *keys: str) -> None:
+        unknown = [key for key in keys if key not in self._pyautogui.KEYBOARD_KEYS]
+        if unknown:
+            raise ValueError(f"未知按键: {', '.join(unknown)}")
+        if len(keys) == 1:
+            self._pyautogui.press(keys[0])
+        else:
+            self._pyautogui.hotkey(*keys)
+
+
+# pyautogui 按键名 -> X keysym 名称（单个字符与 f1-f24 另行处理）
+_X_KEY_NAMES = {
+    "enter": "Return", "return": "Return", "\n": "Return",
+    "tab": "Tab", "\t": "Tab",
+    "esc": "Escape", "escape": "Escape",
+    "backspace": "BackSpace", "delete": "Delete", "del": "Delete", "insert": "Insert",
+    "space": "space", " ": "space",
+    "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+    "home": "Home", "end": "End",
+    "pageup": "Prior", "pgup": "Prior", "pagedown": "Next", "pgdn": "Next",
+    "ctrl": "Control_L", "ctrlleft": "Control_L", "ctrlright": "Control_R",
+    "shift": "Shift_L", "shiftleft": "Shift_L", "shiftright": "Shift_R",
+    "alt": "Alt_L", "altleft": "Alt_L", "altright": "Alt_R", "option": "Alt_L",
+    "win": "Super_L", "winleft": "Super_L", "winright": "Super_R",
+    "command": "Super_L", "cmd": "Super_L", "super": "Super_L",
+    "capslock": "Caps_Lock", "numlock": "Num_Lock", "scrolllock": "Scroll_Lock",
+    "printscreen": "Print", "prtsc": "Print", "pause": "Pause", "menu": "Menu", "apps": "Menu",
+}
+
+# X 鼠标按键编号
+_X_BUTTONS = {"left": 1, "middle": 2, "right": 3}
+_X_SCROLL_UP = 4
+_X_SCROLL_DOWN = 5
+
+
+class XTestInputBackend(InputBackend):
+    """
+    基于 XTest 扩展的输入后端（Linux/X11）
+    
+    事件写入 Xlib 的发送缓冲区，每个操作（或 batch 块）结束时 sync 一次，
+    单次操作只有一次与 X server 的往返。
+    """
+    
+    name = "xtest"
+    
+    def __init__(self, display_name: Optional[str] = None):
+        """
+        Args:
+            display_name: X display，例如 ":1"；None 使用 DISPLAY 环境变量
+        """
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._display = display.Display(display_name)
+        if not self._display.has_extension("XTEST"):
+            self._display.close()
+            raise RuntimeError("X server 不支持 XTEST 扩展")
+        self._screen = self._display.screen()
+        self._shift = self._display.keysym_to_keycode(XK.string_to_keysym("Shift_L"))
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+    
+    def size(self) -> tuple[int, int]:
+        return self._screen.width_in_pixels, self._screen.height_in_pixels
+    
+    def _fake(self, event_type: int, detail: int = 0, **kwargs) -> None:
+        self._xtest.fake_input(self._display, event_type, detail, **kwargs)
+    
+    def _commit(self) -> None:
+        """不在 batch 块内时立即提交事件"""
+        if self._batch_depth == 0:
+            self._display.sync()
+    
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                self._commit()
+    
+    def move(self, x: int, y: int) -> None:
+        with self._lock:
+            self._fake(self._X.MotionNotify, x=x, y=y)
+            self._commit()
+    
+    def click(self, x: int, y: int, button: str = "left", count: int = 1) -> None:
+        if button not in _X_BUTTONS:
+            raise ValueError(f"未知鼠标按键: {button}")
+        with self._lock:
+            self._fake(self._X.MotionNotify, x=x, y=y)
+            for _ in range(count):
+                self._fake(self._X.ButtonPress, _X_BUTTONS[button])
+                self._fake(self._X.ButtonRelease, _X_BUTTONS[button])
+            self._commit()
+    
+    def scroll(self, amount: int) -> None:
+        button = _X_SCROLL_UP if amount > 0 else _X_SCROLL_DOWN
+        with self._lock:
+            for _ in range(abs(amount)):
+                self._fake(self._X.ButtonPress, button)
+                self._fake(self._X.ButtonRelease, button)
+            self._commit()
+    
+    def _keysym(self, key: str) -> int:
+        """按键名 / 单个字符 -> keysym，未知返回 0"""
+        if key in _X_KEY_NAMES:
+            return self._XK.string_to_keysym(_X_KEY_NAMES[key])
+        if len(key) == 1:
+            # Latin-1 可打印字符的 keysym 与字符编码相同
+            return ord(key) if 0x20 <= ord(key) <= 0xFF else 0
+        if key.startswith("f") and key[1:].isdigit():
+            return self._XK.string_to_keysym(key.upper())
+        return self._XK.string_to_keysym(key)
+    
+    def _keycode(self, key: str) -> tuple[int, bool]:
+        """
+        按键名 -> (keycode, 是否需要 Shift)
+        
+        Raises:
+            ValueError: 未知按键或当前键盘布局中没有该按键
+        """
+        keysym = self._keysym(key)
+        keycode = self._display.keysym_to_keycode(keysym) if keysym else 0
+        if not keycode:
+            raise ValueError(f"未知按键: {key}")
+        # 键位上的第一个 keysym 不是目标字符（如大写字母、!@# 等）时需要按住 Shift
+        needs_shift = len(key) == 1 and self._display.keycode_to_keysym(keycode, 0) != keysym
+        return keycode, needs_shift
+    
+    def press(self, *keys: str) -> None:
+        keycodes = [self._keycode(key) for key in keys]
+        with self._lock:
+            pressed = []
+            for keycode, needs_shift in keycodes:
+                if needs_shift and self._shift not in pressed:
+                    self._fake(self._X.KeyPress, self._shift)
+                    pressed.append(self._shift)
+                self._fake(self._X.KeyPress, keycode)
+                pressed.append(keycode)
+            for keycode in reversed(pressed):
+                self._fake(self._X.KeyRelease, keycode)
+            self._commit()
+    
+    def can_type(self, text: str) -> bool:
+        """ASCII 可打印字符且在当前键盘布局中都有对应按键（没有的字符交给剪贴板输入）"""
+        if not all(char in "\n\t" or 0x20 <= ord(char) < 0x7F for char in text):
+            return False
+        try:
+            for char in set(text):
+                self._keycode(char)
+        except ValueError:
+            return False
+        return True
+    
+    def type_text(self, text: str) -> None:
+        keycodes = [self._keycode(char) for char in text]
+        with self._lock:
+            for keycode, needs_shift in keycodes:
+                if needs_shift:
+                    self._fake(self._X.KeyPress, self._shift)
+                self._fake(self._X.KeyPress, keycode)
+                self._fake(self._X.KeyRelease, keycode)
+                if needs_shift:
+                    self._fake(self._X.KeyRelease, self._shift)
+            self._commit()
+    
+    def close(self) -> None:
+        self._display.close()
+
+
+def create_input_backend(name: str = INPUT_BACKEND, display_name: Optional[str] = None) -> InputBackend:
+    """
+    创建输入后端
+    
+    Args:
+        name: auto / xtest / pyautogui；auto 在 Linux/X11 且安装了 python-xlib 时使用 xtest，否则回退 pyautogui
+        display_name: X display，仅 xtest 使用
+    """
+    if name == "pyautogui":
+        return PyAutoGUIInputBackend()
+    if name == "xtest":
+        return XTestInputBackend(display_name)
+    if name != "auto":
+        raise ValueError(f"未知的输入后端: {name}")
+    
+    if sys.platform.startswith("linux") and (display_name or os.environ.get("DISPLAY")):
+        try:
+            return XTestInputBackend(display_name)
+        except Exception:
+            pass
+    return PyAutoGUIInputBackend()
+
+
+_default_backend: Optional[InputBackend] = None
+_default_backend_lock = threading.Lock()
+
+
+def get_input_backend() -> InputBackend:
+    """获取全局默认输入后端（首次调用时按 INPUT_BACKEND 创建）"""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = create_input_backend()
+        return _default_backend
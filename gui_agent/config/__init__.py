@@ -5,8 +5,51 @@ from .settings import (
     SCREENSHOT_DIR,
     DEFAULT_API_TIMEOUT,
     DEFAULT_MAX_ITERATIONS,
+    SCREENSHOT_FORMAT,
+    SCREENSHOT_QUALITY,
+    SCREENSHOT_COMPRESS_LEVEL,
+    SAVE_SCREENSHOTS,
+    SCREENSHOT_ARCHIVE_MAX_BYTES,
+    SCREENSHOT_ARCHIVE_MAX_AGE,
+    SCREENSHOT_ARCHIVE_MAX_MANIFESTS,
+    SCREENSHOT_ARCHIVE_SAMPLE_RATE,
     DEFAULT_SCREENSHOT_DELAY_MS,
+    SETTLE_ENABLED,
+    SETTLE_MIN_MS,
+    SETTLE_MAX_MS,
+    SETTLE_INTERVAL_MS,
+    SETTLE_STABLE_FRAMES,
+    SETTLE_DIFF_THRESHOLD,
+    SCREENSHOT_DELTA_ENABLED,
+    DELTA_MAX_AREA_RATIO,
+    DELTA_FULL_FRAME_INTERVAL,
+    DELTA_BLOCK_SIZE,
+    DELTA_MARGIN,
+    SCREENSHOT_OVERVIEW_SCALE,
+    ZOOM_MAX_SIZE,
     MAX_SCREENSHOTS_IN_HISTORY,
+    IMAGE_STORE_MEMORY_BYTES,
+    IMAGE_STORE_DISK_BYTES,
+    RESPONSE_CACHE_MAX_BYTES,
+    REPLAY_MAX_CHANGED_CELLS,
+    SANDBOX_POOL_SIZE,
+    SANDBOX_MAX_RUNS_PER_WORKER,
+    SANDBOX_PRELOAD_MODULES,
+    SANDBOX_SESSION_MEMORY_LIMIT,
+    SANDBOX_SESSION_IDLE_TIMEOUT,
+    SANDBOX_MAX_OUTPUT_BYTES,
+    INPUT_BACKEND,
+    TYPE_TEXT_DIRECT,
+    CAPTURE_BACKEND,
+    RUNNER_CONCURRENCY,
+    RUNNER_SCREEN_SIZE,
+    RUNNER_XVFB_START_TIMEOUT,
+    TRACE_CONSOLE,
+    TRACE_CONSOLE_MAX_CHARS,
+    TRACE_FILE,
+    TRACE_FILE_MAX_CHARS,
+    METRICS_HOST,
+    METRICS_PORT,
 )
 
 __all__ = [
@@ -14,6 +57,49 @@ __all__ = [
     "SCREENSHOT_DIR",
     "DEFAULT_API_TIMEOUT",
     "DEFAULT_MAX_ITERATIONS",
+    "SCREENSHOT_FORMAT",
+    "SCREENSHOT_QUALITY",
+    "SCREENSHOT_COMPRESS_LEVEL",
+    "SAVE_SCREENSHOTS",
+    "SCREENSHOT_ARCHIVE_MAX_BYTES",
+    "SCREENSHOT_ARCHIVE_MAX_AGE",
+    "SCREENSHOT_ARCHIVE_MAX_MANIFESTS",
+    "SCREENSHOT_ARCHIVE_SAMPLE_RATE",
     "DEFAULT_SCREENSHOT_DELAY_MS",
+    "SETTLE_ENABLED",
+    "SETTLE_MIN_MS",
+    "SETTLE_MAX_MS",
+    "SETTLE_INTERVAL_MS",
+    "SETTLE_STABLE_FRAMES",
+    "SETTLE_DIFF_THRESHOLD",
+    "SCREENSHOT_DELTA_ENABLED",
+    "DELTA_MAX_AREA_RATIO",
+    "DELTA_FULL_FRAME_INTERVAL",
+    "DELTA_BLOCK_SIZE",
+    "DELTA_MARGIN",
+    "SCREENSHOT_OVERVIEW_SCALE",
+    "ZOOM_MAX_SIZE",
     "MAX_SCREENSHOTS_IN_HISTORY",
+    "IMAGE_STORE_MEMORY_BYTES",
+    "IMAGE_STORE_DISK_BYTES",
+    "RESPONSE_CACHE_MAX_BYTES",
+    "REPLAY_MAX_CHANGED_CELLS",
+    "SANDBOX_POOL_SIZE",
+    "SANDBOX_MAX_RUNS_PER_WORKER",
+    "SANDBOX_PRELOAD_MODULES",
+    "SANDBOX_SESSION_MEMORY_LIMIT",
+    "SANDBOX_SESSION_IDLE_TIMEOUT",
+    "SANDBOX_MAX_OUTPUT_BYTES",
+    "INPUT_BACKEND",
+    "TYPE_TEXT_DIRECT",
+    "CAPTURE_BACKEND",
+    "RUNNER_CONCURRENCY",
+    "RUNNER_SCREEN_SIZE",
+    "RUNNER_XVFB_START_TIMEOUT",
+    "TRACE_CONSOLE",
+    "TRACE_CONSOLE_MAX_CHARS",
+    "TRACE_FILE",
+    "TRACE_FILE_MAX_CHARS",
+    "METRICS_HOST",
+    "METRICS_PORT",
 ]
@@ -1,6 +1,8 @@
 """全局配置"""
 
+import os
 from pathlib import Path
+from typing import Optional
 
 # 项目根目录
 PROJECT_ROOT = Path(__file__).parent.parent.parent
@@ -12,8 +14,88 @@ SCREENSHOT_DIR = PROJECT_ROOT / "screenshots"
 DEFAULT_API_TIMEOUT = 120
 DEFAULT_MAX_ITERATIONS = 20
 
-# 截图延迟（毫秒）
+# 截图编码：格式 PNG / JPEG / WEBP，quality 用于 JPEG/WEBP，compress_level 用于 PNG（0-9）
+SCREENSHOT_FORMAT = "PNG"
+SCREENSHOT_QUALITY = 80
+SCREENSHOT_COMPRESS_LEVEL = 6
+
+# 是否在本地保存截图副本（后台线程写入 SCREENSHOT_DIR 下的截图归档，见 gui_agent.archive）
+SAVE_SCREENSHOTS = True
+# 截图归档：按内容哈希去重，对象总大小与保存时长超出上限时淘汰最久未引用的截图
+SCREENSHOT_ARCHIVE_MAX_BYTES = 1024 * 1024 * 1024
+SCREENSHOT_ARCHIVE_MAX_AGE: Optional[float] = 7 * 24 * 3600  # 秒，None 表示不按时长淘汰
+SCREENSHOT_ARCHIVE_MAX_MANIFESTS: Optional[int] = 10000  # 保留的运行清单数上限，超出时删除最旧的清单，None 表示不限
+SCREENSHOT_ARCHIVE_SAMPLE_RATE = 1.0  # 默认归档比例 (0-1]，Agent 可通过 AgentConfig.archive_sample_rate 覆盖
+
+# 截图延迟（毫秒），关闭自适应等待时使用
 DEFAULT_SCREENSHOT_DELAY_MS = 500
 
+# 自适应等待：操作后采样低分辨率帧，连续帧不再变化即认为界面已稳定
+SETTLE_ENABLED = True
+SETTLE_MIN_MS = 50  # 最短等待，给界面开始响应的时间
+SETTLE_MAX_MS = 2000  # 最长等待，超时直接截图
+SETTLE_INTERVAL_MS = 50  # 采样间隔
+SETTLE_STABLE_FRAMES = 2  # 连续多少帧不变视为稳定
+SETTLE_DIFF_THRESHOLD = 0.002  # 变化像素占比不超过该值视为不变
+
+# 局部截图：操作只改变了一小块区域时，只发送变化区域的裁剪图
+SCREENSHOT_DELTA_ENABLED = False
+DELTA_MAX_AREA_RATIO = 0.3  # 变化区域超过整屏该比例时发送整帧
+DELTA_FULL_FRAME_INTERVAL = 4  # 连续发送多少张局部截图后强制发送一次整帧
+DELTA_BLOCK_SIZE = 16  # 差异比较的区块边长（像素）
+DELTA_MARGIN = 32  # 变化区域向外扩展的像素，给模型保留上下文
+
+# 多分辨率观察：默认发送按该比例缩小的概览图，需要细节时由 zoom 工具返回高清局部
+SCREENSHOT_OVERVIEW_SCALE = 1.0  # 1.0 表示不缩小
+ZOOM_MAX_SIZE = 1280  # zoom 返回图片的最长边（像素）
+
 # 最大保留截图数量（用于 Token 优化）
 MAX_SCREENSHOTS_IN_HISTORY = 5
+
+# 图片存储：历史消息只保存图片引用，图片本体按 LRU 保存在内存，超限溢出到磁盘
+IMAGE_STORE_MEMORY_BYTES = 64 * 1024 * 1024
+IMAGE_STORE_DISK_BYTES = 512 * 1024 * 1024
+
+# LLM 响应缓存：缓存目录中文件总大小上限，超出后按 LRU 淘汰
+RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# 轨迹回放：回放前画面与录制时的感知哈希相差不超过该区块数才视为一致（容忍时钟等小范围变化）
+REPLAY_MAX_CHANGED_CELLS = 16
+
+# Python 沙箱常驻 worker 池：0 表示每次执行都启动新进程
+# 池中的 worker 被多次执行复用，隔离弱于每次启动新进程：每次执行使用全新的全局命名空间，并恢复
+# sys.path、环境变量与工作目录，但已导入的模块（sys.modules，包括对它们的修改）在执行之间共享；
+# 执行后仍有用户代码启动的线程在运行、或 builtins 被修改时回收该 worker。需要完全隔离时设为 0
+SANDBOX_POOL_SIZE = 2
+SANDBOX_MAX_RUNS_PER_WORKER = 50  # 每个 worker 执行多少次后回收重建
+SANDBOX_PRELOAD_MODULES: list[str] = []  # worker 启动时预加载的模块，例如 ["numpy", "pandas"]
+
+# Python 沙箱有状态会话：进程内存上限（字节）与空闲超时（秒），None 表示不限制
+SANDBOX_SESSION_MEMORY_LIMIT = 2 * 1024 * 1024 * 1024
+SANDBOX_SESSION_IDLE_TIMEOUT = 600
+
+# Python 沙箱输出上限：stdout / stderr 各自只保留开头和结尾共这么多字节，中间以标记省略
+SANDBOX_MAX_OUTPUT_BYTES = 16 * 1024
+
+# 输入后端：auto（Linux/X11 且安装了 python-xlib 时用 XTest 直接注入事件，否则 pyautogui）/ xtest / pyautogui
+INPUT_BACKEND = "auto"
+# 输入后端支持时，ASCII 文本直接逐键输入，不经过剪贴板
+TYPE_TEXT_DIRECT = True
+
+# 截屏后端：auto（Linux/X11 支持 MIT-SHM 时用共享内存截屏，否则 pyautogui）/ xshm / pyautogui
+CAPTURE_BACKEND = "auto"
+
+# 批量任务运行器：每个并发任务使用一个 Xvfb 虚拟屏幕
+RUNNER_CONCURRENCY = 2
+RUNNER_SCREEN_SIZE = (1280, 800)  # 虚拟屏幕分辨率 (宽, 高)
+RUNNER_XVFB_START_TIMEOUT = 10  # 等待 Xvfb 就绪的超时（秒）
+
+# 追踪：Agent 的迭代、LLM 调用、工具调用、截屏与编码记录为 span（见 gui_agent.tracing）
+TRACE_CONSOLE = True  # 在控制台输出可读的执行日志
+TRACE_CONSOLE_MAX_CHARS = 100  # 控制台中工具结果等文本的最大显示长度
+TRACE_FILE = os.environ.get("GUI_AGENT_TRACE_FILE")  # 将 span 以 JSONL 追加写入该文件，未设置时不写
+TRACE_FILE_MAX_CHARS = 2000  # JSONL 中单个文本属性（工具参数、工具结果等）的最大长度，超出部分截断并附上原文的 SHA-256
+
+# 运行指标：gui_agent.metrics.start_metrics_server() 默认监听的地址与端口（Prometheus 文本格式，/metrics）
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464
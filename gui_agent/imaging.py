@@ -0,0 +1,90 @@
+"""
+图像工具 - 截图感知哈希、变化区域检测
+
+感知哈希用于判断两帧屏幕是否"看起来相同"：将截图缩为固定宽度的灰度缩略图，
+按字节记录每个区块的平均亮度。GUI 画面在无变化时逐像素一致，因此区块亮度也完全一致；
+抗锯齿等细微噪声会被区块平均稀释，而哪怕新增一个字符也会让对应区块明显变暗/变亮。
+"""
+
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+
+# 缩略图宽度（区块列数），1920 宽屏幕下每个区块约 15x15 像素
+HASH_WIDTH = 128
+# 区块亮度变化超过该值才计为变化
+HASH_CELL_TOLERANCE = 6
+
+
+def perceptual_hash(image: Image.Image) -> str:
+    """
+    计算截图的感知哈希
+    
+    Returns:
+        "宽x高:" 前缀 + 缩略图灰度字节的十六进制
+    """
+    height = max(1, image.height * HASH_WIDTH // image.width)
+    thumbnail = image.resize((HASH_WIDTH, height), Image.BOX).convert("L")
+    return f"{HASH_WIDTH}x{height}:{thumbnail.tobytes().hex()}"
+
+
+def hash_distance(a: str, b: str) -> int:
+    """
+    两个感知哈希之间发生变化的区块数
+    
+    尺寸不同的哈希视为完全不同，返回区块总数
+    """
+    size_a, _, cells_a = a.partition(":")
+    size_b, _, cells_b = b.partition(":")
+    bytes_a = bytes.fromhex(cells_a)
+    if size_a != size_b:
+        return len(bytes_a)
+    
+    bytes_b = bytes.fromhex(cells_b)
+    return sum(1 for x, y in zip(bytes_a, bytes_b) if abs(x - y) > HASH_CELL_TOLERANCE)
+
+
+def changed_region(
+    previous: np.ndarray,
+    current: np.ndarray,
+    block_size: int = 16,
+    tolerance: int = 8
+) -> Optional[tuple[int, int, int, int]]:
+    """
+    按区块比较两帧灰度图，返回发生变化区域的像素包围盒
+    
+    Args:
+        previous: 上一帧灰度数组 (H, W)，uint8
+        current: 当前帧灰度数组 (H, W)，uint8
+        block_size: 区块边长（像素）
+        tolerance: 像素灰度差超过该值才计为变化
+        
+    Returns:
+        (left, top, right, bottom)，按区块对齐；尺寸不同返回整帧；无变化返回 None
+    """
+    height, width = current.shape
+    if previous.shape != current.shape:
+        return 0, 0, width, height
+    
+    changed = np.abs(current.astype(np.int16) - previous.astype(np.int16)) > tolerance
+    
+    # 补齐到区块整数倍后按区块聚合
+    rows = -(-height // block_size)
+    cols = -(-width // block_size)
+    padded = np.zeros((rows * block_size, cols * block_size), dtype=bool)
+    padded[:height, :width] = changed
+    blocks = padded.reshape(rows, block_size, cols, block_size).any(axis=(1, 3))
+    
+    changed_rows = np.flatnonzero(blocks.any(axis=1))
+    if changed_rows.size == 0:
+        return None
+    changed_cols = np.flatnonzero(blocks.any(axis=0))
+    
+    return (
+        int(changed_cols[0]) * block_size,
+        int(changed_rows[0]) * block_size,
+        min(width, (int(changed_cols[-1]) + 1) * block_size),
+        min(height, (int(changed_rows[-1]) + 1) * block_size),
+    )
@@ -0,0 +1,414 @@
+"""
+运行指标 - 进程内的 Prometheus 风格指标注册表与 HTTP 导出端点
+
+指标由追踪 span 驱动：MetricsExporter 作为 tracing 的导出器，将 Agent、LLM 调用、工具、
+截屏与沙箱的 span 转换为计数器、直方图与进行中数量，不需要在各模块中另外埋点。
+默认不启用，调用 start_metrics_server()（或 CLI --metrics-port）后开始收集并提供 /metrics。
+
+用法:
+    from gui_agent import metrics
+    server = metrics.start_metrics_server(port=9464)
+    ...  # 运行 Agent，Prometheus 抓取 http://127.0.0.1:9464/metrics
+    server.stop()
+
+主要指标（Prometheus 中以 rate() 计算速率）:
+    gui_agent_iterations_total                 迭代次数
+    gui_agent_agents_running                   正在运行的 Agent 数
+    gui_agent_llm_request_duration_seconds     LLM 的 HTTP 请求延迟（按 model / stream，不含缓存查找与序列化）
+    gui_agent_llm_cache_hits_total             命中响应缓存、未发送请求的 LLM 调用次数
+    gui_agent_llm_request_bytes                请求体大小
+    gui_agent_llm_images_sent_total            发送的图片数
+    gui_agent_llm_image_tokens_sent_total      发送的图片估算 token 数
+    gui_agent_llm_tokens_total                 API 返回的 token 用量（按 type）
+    gui_agent_tool_duration_seconds            工具执行耗时（按 tool）
+    gui_agent_capture_duration_seconds         截屏耗时（按 backend）
+    gui_agent_encode_duration_seconds          截图编码耗时（按 format）
+    gui_agent_settle_duration_seconds          等待界面稳定耗时
+    gui_agent_sandbox_queue_depth              等待空闲沙箱 worker 的调用数
+    gui_agent_sandbox_spawn_failures_total     启动沙箱 worker 失败的次数
+    gui_agent_archive_writes_total             写入截图归档的截图数（按 deduplicated）
+    gui_agent_archive_dropped_total            写盘跟不上被丢弃的截图数
+    gui_agent_archive_errors_total             写盘失败的次数
+    gui_agent_archive_bytes                    截图归档的总字节数
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Optional
+
+from . import tracing
+from .config import METRICS_HOST, METRICS_PORT
+
+# 延迟直方图的桶上限（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# 字节数直方图的桶上限
+BYTES_BUCKETS = tuple(1024 * 4 ** k for k in range(9))  # 1KB ~ 64MB
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """带标签的指标基类，每组标签值一个序列"""
+    
+    kind = ""
+    
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._series: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+    
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+    
+    def render(self) -> str:
+        with self._lock:
+            samples = self._samples()
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + samples)
+
+
+class Counter(_Metric):
+    """只增的计数器"""
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        super().__init__(name, help, labels)
+        # 无标签的指标从 0 开始输出
+        if not self.label_names:
+            self._series[()] = 0
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+    
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._series.get(self._key(labels), 0)
+    
+    def _samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in self._series.items()
+        ]
+
+
+class Gauge(Counter):
+    """可增可减的当前值"""
+    
+    kind = "gauge"
+    
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+    
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """累积分桶直方图"""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][index] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+    
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return series["count"] if series else 0
+    
+    def _samples(self) -> list[str]:
+        samples = []
+        for key, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["counts"]):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                samples.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key)
+            samples.append(f"{self.name}_sum{labels} {_format_value(series['sum'])}")
+            samples.append(f"{self.name}_count{labels} {series['count']}")
+        return samples
+
+
+class MetricsRegistry:
+    """指标注册表，按注册顺序输出 Prometheus 文本格式"""
+    
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"指标 {metric.name} 已注册为 {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+    
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+    
+    def gauge(self, name: str, help: str, labels: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labels))
+    
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Iterable[str] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+    
+    def render(self) -> str:
+        """Prometheus 文本格式（0.0.4）"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+def _label(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else str(value)
+
+
+class MetricsExporter(tracing.SpanExporter):
+    """将追踪 span 转换为指标"""
+    
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.iterations = registry.counter("gui_agent_iterations_total", "ReAct 迭代次数")
+        self.runs = registry.counter("gui_agent_runs_total", "结束的 Agent 运行次数", ["completed"])
+        self.running = registry.gauge("gui_agent_agents_running", "正在运行的 Agent 数")
+        self.llm_duration = registry.histogram(
+            "gui_agent_llm_request_duration_seconds", "LLM 的 HTTP 请求延迟（流式为整个响应流）",
+            ["model", "stream"]
+        )
+        self.llm_cache_hits = registry.counter(
+            "gui_agent_llm_cache_hits_total", "命中响应缓存的 LLM 调用次数", ["model"]
+        )
+        self.llm_errors = registry.counter("gui_agent_llm_errors_total", "失败的 LLM 调用次数", ["model"])
+        self.llm_bytes = registry.histogram(
+            "gui_agent_llm_request_bytes", "LLM 请求体字节数", buckets=BYTES_BUCKETS
+        )
+        self.llm_images = registry.counter("gui_agent_llm_images_sent_total", "LLM 请求中发送的图片数")
+        self.llm_image_tokens = registry.counter(
+            "gui_agent_llm_image_tokens_sent_total", "LLM 请求中发送的图片估算 token 数"
+        )
+        self.llm_tokens = registry.counter("gui_agent_llm_tokens_total", "API 返回的 token 用量", ["model", "type"])
+        self.tool_duration = registry.histogram("gui_agent_tool_duration_seconds", "工具执行耗时", ["tool"])
+        self.tool_errors = registry.counter("gui_agent_tool_errors_total", "抛出异常的工具调用次数", ["tool"])
+        self.capture_duration = registry.histogram("gui_agent_capture_duration_seconds", "截屏耗时", ["backend"])
+        self.encode_duration = registry.histogram("gui_agent_encode_duration_seconds", "截图编码耗时", ["format"])
+        self.encode_bytes = registry.histogram(
+            "gui_agent_encode_bytes", "截图编码后字节数", ["format"], buckets=BYTES_BUCKETS
+        )
+        self.settle_duration = registry.histogram("gui_agent_settle_duration_seconds", "等待界面稳定耗时")
+        self.sandbox_queue = registry.gauge("gui_agent_sandbox_queue_depth", "等待空闲沙箱 worker 的调用数")
+        self.sandbox_wait = registry.histogram("gui_agent_sandbox_wait_seconds", "等待空闲沙箱 worker 的耗时")
+        self.sandbox_spawn_failures = registry.counter(
+            "gui_agent_sandbox_spawn_failures_total", "启动沙箱 worker 失败的次数"
+        )
+        self.archive_writes = registry.counter(
+            "gui_agent_archive_writes_total", "写入截图归档的截图数", ["deduplicated"]
+        )
+        self.archive_dropped = registry.counter("gui_agent_archive_dropped_total", "写盘跟不上被丢弃的截图数")
+        self.archive_errors = registry.counter("gui_agent_archive_errors_total", "截图归档写盘失败的次数")
+        self.archive_bytes = registry.gauge("gui_agent_archive_bytes", "截图归档的总字节数")
+        # 已计入进行中数量的 span（启用前已开始的 span 结束时不减）
+        self._in_progress: set[str] = set()
+        self._lock = threading.Lock()
+    
+    def on_start(self, span: tracing.Span) -> None:
+        gauge = {"agent.run": self.running, "sandbox.wait": self.sandbox_queue}.get(span.name)
+        if gauge is not None:
+            with self._lock:
+                self._in_progress.add(span.span_id)
+            gauge.inc()
+    
+    def _finish(self, span: tracing.Span, gauge: Gauge) -> None:
+        with self._lock:
+            if span.span_id not in self._in_progress:
+                return
+            self._in_progress.discard(span.span_id)
+        gauge.dec()
+    
+    def export(self, span: tracing.Span) -> None:
+        attributes = span.attributes
+        seconds = span.duration_ms / 1000
+        name = span.name
+        if name == "agent.iteration":
+            self.iterations.inc()
+        elif name == "agent.run":
+            self._finish(span, self.running)
+            self.runs.inc(completed=_label(attributes.get("completed", False)))
+        elif name == "llm.call":
+            model = _label(attributes.get("model"))
+            if span.error is not None:
+                self.llm_errors.inc(model=model)
+                return
+            if attributes.get("cached"):
+                self.llm_cache_hits.inc(model=model)
+            for kind in ("prompt", "completion"):
+                tokens = attributes.get(f"{kind}_tokens")
+                if tokens:
+                    self.llm_tokens.inc(tokens, model=model, type=kind)
+        elif name == "llm.http":
+            # 失败的请求计入 llm.call 的错误数
+            if span.error is None:
+                self.llm_duration.observe(
+                    seconds, model=_label(attributes.get("model")), stream=_label(attributes.get("stream"))
+                )
+        elif name == "llm.serialize":
+            self.llm_bytes.observe(attributes.get("payload_bytes", 0))
+            self.llm_images.inc(attributes.get("images", 0))
+            self.llm_image_tokens.inc(attributes.get("image_tokens", 0))
+        elif name == "tool.call":
+            tool = _label(attributes.get("tool"))
+            self.tool_duration.observe(seconds, tool=tool)
+            if span.error is not None:
+                self.tool_errors.inc(tool=tool)
+        elif name == "screen.capture":
+            self.capture_duration.observe(seconds, backend=_label(attributes.get("backend")))
+        elif name == "screen.encode":
+            image_format = _label(attributes.get("format"))
+            self.encode_duration.observe(seconds, format=image_format)
+            self.encode_bytes.observe(attributes.get("bytes", 0), format=image_format)
+        elif name == "screen.settle":
+            self.settle_duration.observe(seconds)
+        elif name == "sandbox.wait":
+            self._finish(span, self.sandbox_queue)
+            self.sandbox_wait.observe(seconds)
+        elif name == "sandbox.spawn_failed":
+            self.sandbox_spawn_failures.inc()
+        elif name in ("archive.load", "archive.write"):
+            if span.error is not None:
+                self.archive_errors.inc()
+            else:
+                if name == "archive.write":
+                    self.archive_writes.inc(deduplicated=_label(attributes.get("deduplicated", False)))
+                self.archive_bytes.set(attributes.get("archive_bytes", 0))
+        elif name == "archive.dropped":
+            self.archive_dropped.inc()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format: str, *args) -> None:
+        pass
+    
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        data = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MetricsServer:
+    """在后台线程中提供 /metrics 的 HTTP 服务"""
+    
+    def __init__(self, registry: MetricsRegistry, host: str = METRICS_HOST, port: int = METRICS_PORT):
+        """
+        Args:
+            registry: 输出的指标注册表
+            host: 监听地址，默认只监听本机
+            port: 监听端口，0 表示自动选择
+        """
+        self.registry = registry
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.registry = registry
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+    
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+    
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+# 全局注册表，start_metrics_server / enable 后由 span 驱动
+registry = MetricsRegistry()
+_exporter: Optional[MetricsExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def enable() -> MetricsExporter:
+    """开始从全局 tracer 收集指标（重复调用无副作用）"""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = MetricsExporter(registry)
+            tracing.tracer.add_exporter(_exporter)
+        return _exporter
+
+
+def disable() -> None:
+    """停止收集指标（已收集的值保留）"""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is not None:
+            tracing.tracer.remove_exporter(_exporter)
+            _exporter = None
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = METRICS_HOST) -> MetricsServer:
+    """开始收集指标，并在后台线程中提供 http://host:port/metrics"""
+    enable()
+    return MetricsServer(registry, host=host, port=port)
@@ -0,0 +1,14 @@
+"""批量任务运行器模块"""
+
+from .displays import DisplayPool, XvfbDisplay
+from .runner import Task, TaskResult, TaskRunner, run_tasks, summarize
+
+__all__ = [
+    "Task",
+    "TaskResult",
+    "TaskRunner",
+    "run_tasks",
+    "summarize",
+    "DisplayPool",
+    "XvfbDisplay",
+]
@@ -0,0 +1,7 @@
+"""python -m gui_agent.runner"""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+批量任务运行器命令行入口
+
+任务文件每行一个任务：JSON 对象（字段同 Task，prompt 必填）或纯文本（整行作为 prompt），
+空行与 # 开头的行忽略。
+
+示例:
+    gui-agent-run tasks.jsonl --model gemini-3-flash-preview -j 4 --output results.jsonl
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+from .. import metrics, tracing
+from ..agent.base import AgentConfig
+from ..agent.response_cache import ResponseCache
+from ..agent.trajectory import TrajectoryStore
+from ..config import (
+    DEFAULT_API_TIMEOUT,
+    DEFAULT_MAX_ITERATIONS,
+    RUNNER_CONCURRENCY,
+    RUNNER_SCREEN_SIZE,
+    SCREENSHOT_ARCHIVE_SAMPLE_RATE,
+)
+from .runner import Task, TaskResult, TaskRunner, summarize
+
+
+def load_tasks(path: str) -> list[Task]:
+    """读取任务文件"""
+    tasks = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            tasks.append(Task.from_dict(json.loads(line)))
+        else:
+            tasks.append(Task(prompt=line))
+    return tasks
+
+
+def _parse_screen_size(value: str) -> tuple[int, int]:
+    try:
+        width, height = value.lower().split("x")
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"分辨率格式应为 宽x高，例如 1280x800: {value}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="gui-agent-run",
+        description="在多个 Xvfb 虚拟屏幕上并发运行 GUI Agent 任务"
+    )
+    parser.add_argument("tasks", help="任务文件（每行一个 JSON 对象或一条纯文本任务）")
+    parser.add_argument("--api-url", default=os.environ.get("GUI_AGENT_API_URL"),
+                        help="Chat Completions 接口地址（默认读取 GUI_AGENT_API_URL）")
+    parser.add_argument("--api-key", default=os.environ.get("GUI_AGENT_API_KEY"),
+                        help="API Key（默认读取 GUI_AGENT_API_KEY）")
+    parser.add_argument("--model", default=os.environ.get("GUI_AGENT_MODEL"),
+                        help="模型名称（默认读取 GUI_AGENT_MODEL）")
+    parser.add_argument("-j", "--concurrency", type=int, default=RUNNER_CONCURRENCY,
+                        help=f"同时运行的任务数，默认 {RUNNER_CONCURRENCY}")
+    parser.add_argument("--max-iterations", type=int, default=DEFAULT_MAX_ITERATIONS,
+                        help=f"每个任务的最大迭代次数，默认 {DEFAULT_MAX_ITERATIONS}")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_API_TIMEOUT,
+                        help=f"单次 API 请求超时（秒），默认 {DEFAULT_API_TIMEOUT}")
+    parser.add_argument("--system-prompt", help="系统提示文件")
+    parser.add_argument("--screen", type=_parse_screen_size,
+                        default=RUNNER_SCREEN_SIZE, metavar="WxH",
+                        help="虚拟屏幕分辨率，默认 %dx%d" % RUNNER_SCREEN_SIZE)
+    parser.add_argument("--no-reuse-displays", action="store_true",
+                        help="每个任务使用全新启动的屏幕（默认复用）")
+    parser.add_argument("--sandbox", action="store_true", help="同时注册 Python 沙箱工具")
+    parser.add_argument("--stream", action="store_true", help="使用流式输出")
+    parser.add_argument("--trajectories", metavar="DIR",
+                        help="轨迹目录：录制成功任务的操作轨迹，重复任务直接回放")
+    parser.add_argument("--no-replay", action="store_true", help="只录制轨迹，不回放")
+    parser.add_argument("--response-cache", metavar="DIR",
+                        help="LLM 响应缓存目录：请求与之前完全相同时直接返回缓存的响应")
+    parser.add_argument("--no-archive", action="store_true", help="不归档截图")
+    parser.add_argument("--archive-sample-rate", type=float, default=SCREENSHOT_ARCHIVE_SAMPLE_RATE, metavar="RATE",
+                        help=f"截图归档比例 (0-1]，默认 {SCREENSHOT_ARCHIVE_SAMPLE_RATE}")
+    parser.add_argument("--output", help="将每个任务的结果写入该 JSONL 文件")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="将迭代、LLM 调用、工具调用、截屏与编码的 span 写入该 JSONL 文件")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="运行期间在 http://127.0.0.1:PORT/metrics 提供 Prometheus 指标")
+    parser.add_argument("--verbose", action="store_true", help="输出 Agent 的执行日志")
+    return parser
+
+
+def _format_result(result: TaskResult) -> str:
+    status = "成功" if result.success else "失败"
+    line = (
+        f"[{status}] {result.task_id} ({result.display}) "
+        f"{result.latency:.1f}s, {result.iterations} 轮, {result.total_tokens} tokens"
+    )
+    if result.error:
+        line += f" - {result.error}"
+    return line
+
+
+def _format_summary(summary: dict) -> str:
+    if not summary["tasks"]:
+        return "没有任务"
+    return "\n".join([
+        f"任务: {summary['tasks']}，成功: {summary['succeeded']} ({summary['success_rate']:.0%})",
+        (
+            f"耗时: 平均 {summary['latency_mean']:.1f}s，p50 {summary['latency_p50']:.1f}s，"
+            f"p95 {summary['latency_p95']:.1f}s，最长 {summary['latency_max']:.1f}s"
+        ),
+        f"平均迭代: {summary['iterations_mean']:.1f} 轮",
+        (
+            f"Token: 共 {summary['total_tokens']}"
+            f"（prompt {summary['prompt_tokens']}，completion {summary['completion_tokens']}）"
+        ),
+    ])
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    missing = [name for name in ("api_url", "api_key", "model") if not getattr(args, name)]
+    if missing:
+        options = ", ".join("--" + name.replace("_", "-") for name in missing)
+        print(f"缺少参数: {options}", file=sys.stderr)
+        return 2
+    
+    tasks = load_tasks(args.tasks)
+    system_prompt = Path(args.system_prompt).read_text(encoding="utf-8") if args.system_prompt else ""
+    config = AgentConfig(
+        api_url=args.api_url,
+        api_key=args.api_key,
+        model=args.model,
+        max_iterations=args.max_iterations,
+        timeout=args.timeout,
+        stream=args.stream,
+        replay_trajectories=not args.no_replay,
+        archive_screenshots=not args.no_archive,
+        archive_sample_rate=args.archive_sample_rate
+    )
+    trajectory_store = TrajectoryStore(args.trajectories) if args.trajectories else None
+    response_cache = ResponseCache(args.response_cache) if args.response_cache else None
+    
+    with contextlib.ExitStack() as stack:
+        output = stack.enter_context(open(args.output, "w", encoding="utf-8")) if args.output else None
+        
+        def on_result(result: TaskResult) -> None:
+            print(_format_result(result), file=sys.stderr)
+            if output is not None:
+                output.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
+                output.flush()
+        
+        if args.metrics_port is not None:
+            metrics_server = metrics.start_metrics_server(port=args.metrics_port)
+            stack.callback(metrics_server.stop)
+            print(f"指标: {metrics_server.url}", file=sys.stderr)
+        
+        # Agent 的控制台日志在并发运行时互相交错，默认不显示；结束后恢复原有导出器
+        stack.callback(tracing.tracer.set_exporters, tracing.tracer.exporters)
+        if not args.verbose:
+            for exporter in tracing.tracer.exporters:
+                if isinstance(exporter, tracing.ConsoleExporter):
+                    tracing.tracer.remove_exporter(exporter)
+        if args.trace:
+            trace_exporter = tracing.JsonlExporter(args.trace)
+            stack.callback(trace_exporter.close)
+            tracing.tracer.add_exporter(trace_exporter)
+        
+        runner = stack.enter_context(TaskRunner(
+            config,
+            system_prompt=system_prompt,
+            concurrency=args.concurrency,
+            reuse_displays=not args.no_reuse_displays,
+            screen_size=args.screen,
+            sandbox=args.sandbox,
+            trajectory_store=trajectory_store,
+            response_cache=response_cache
+        ))
+        results = runner.run(tasks, on_result=on_result)
+    
+    print(_format_summary(summarize(results)), file=sys.stderr)
+    return 0 if all(result.success for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Xvfb 虚拟屏幕与屏幕池
+
+每个并发任务独占一个 Xvfb display，Agent 通过绑定到该 display 的 DisplaySession
+截屏与注入输入，多个任务在同一台机器上互不干扰。
+"""
+
+import os
+import queue
+import select
+import subprocess
+import threading
+import time
+from typing import Optional
+
+from ..config import RUNNER_SCREEN_SIZE, RUNNER_XVFB_START_TIMEOUT
+from ..tools.base import DisplaySession
+
+
+class XvfbDisplay:
+    """
+    一个 Xvfb 虚拟屏幕进程
+    
+    display 编号由 Xvfb 通过 -displayfd 自行选择空闲编号并回报，多个进程同时启动也不会冲突。
+    """
+    
+    def __init__(self, screen_size: tuple[int, int] = RUNNER_SCREEN_SIZE, depth: int = 24):
+        """
+        Args:
+            screen_size: 分辨率 (宽, 高)
+            depth: 色深；XShm 截屏要求 24 位（每像素 32 bit）
+        """
+        self.screen_size = screen_size
+        self.depth = depth
+        self.process: Optional[subprocess.Popen] = None
+        self.number: Optional[int] = None
+        self._session: Optional[DisplaySession] = None
+    
+    @property
+    def name(self) -> str:
+        """X display 名称，例如 :99"""
+        return f":{self.number}"
+    
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+    
+    def start(self, timeout: float = RUNNER_XVFB_START_TIMEOUT) -> "XvfbDisplay":
+        """
+        启动 Xvfb 并等待就绪
+        
+        Raises:
+            RuntimeError: Xvfb 启动失败或超时
+        """
+        width, height = self.screen_size
+        read_fd, write_fd = os.pipe()
+        try:
+            self.process = subprocess.Popen(
+                [
+                    "Xvfb",
+                    "-displayfd", str(write_fd),
+                    "-screen", "0", f"{width}x{height}x{self.depth}",
+                    "-nolisten", "tcp",
+                    "-ac",
+                ],
+                pass_fds=(write_fd,),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+        except FileNotFoundError:
+            os.close(read_fd)
+            os.close(write_fd)
+            raise RuntimeError("未找到 Xvfb，请先安装（例如 apt install xvfb）")
+        os.close(write_fd)
+        
+        # Xvfb 就绪后向 displayfd 写入 display 编号和换行
+        output = b""
+        deadline = time.monotonic() + timeout
+        try:
+            while not output.endswith(b"\n"):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RuntimeError(f"Xvfb 启动超时（{timeout} 秒）")
+                ready, _, _ = select.select([read_fd], [], [], remaining)
+                if not ready:
+                    continue
+                chunk = os.read(read_fd, 64)
+                if not chunk:
+                    raise RuntimeError(f"Xvfb 启动失败（退出码 {self.process.wait()}）")
+                output += chunk
+        except BaseException:
+            self.stop()
+            raise
+        finally:
+            os.close(read_fd)
+        
+        self.number = int(output.strip())
+        return self
+    
+    @property
+    def session(self) -> DisplaySession:
+        """绑定到该屏幕的 DisplaySession（首次访问时创建）"""
+        if self._session is None:
+            self._session = DisplaySession(self.name)
+        return self._session
+    
+    def stop(self) -> None:
+        """关闭会话并结束 Xvfb 进程"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+class DisplayPool:
+    """
+    Xvfb 屏幕池：最多同时存在 size 个屏幕，按需启动
+    
+    归还时可选择复用（下一个任务直接使用，省去启动 Xvfb 的开销）或销毁
+    （下一个任务拿到全新的屏幕，不受上一个任务遗留的窗口影响）。
+    """
+    
+    def __init__(self, size: int, screen_size: tuple[int, int] = RUNNER_SCREEN_SIZE):
+        """
+        Args:
+            size: 屏幕数量上限
+            screen_size: 每个屏幕的分辨率 (宽, 高)
+        """
+        self.screen_size = screen_size
+        # 空闲队列中的 None 表示一个尚未启动屏幕的名额
+        self._idle: queue.Queue = queue.Queue()
+        for _ in range(size):
+            self._idle.put(None)
+        self._displays: set[XvfbDisplay] = set()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> XvfbDisplay:
+        """取得一个屏幕，没有空闲屏幕时阻塞等待"""
+        display = self._idle.get()
+        if display is not None:
+            return display
+        
+        try:
+            display = XvfbDisplay(self.screen_size).start()
+        except BaseException:
+            self._idle.put(None)
+            raise
+        with self._lock:
+            self._displays.add(display)
+        return display
+    
+    def release(self, display: XvfbDisplay, reuse: bool = True) -> None:
+        """
+        归还屏幕
+        
+        Args:
+            reuse: True 保留屏幕给下一个任务；False（或 Xvfb 已退出）时销毁
+        """
+        if reuse and display.alive:
+            self._idle.put(display)
+            return
+        
+        display.stop()
+        with self._lock:
+            self._displays.discard(display)
+        self._idle.put(None)
+    
+    def close(self) -> None:
+        """结束所有屏幕"""
+        with self._lock:
+            displays = list(self._displays)
+            self._displays.clear()
+        for display in displays:
+            display.stop()
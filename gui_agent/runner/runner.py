@@ -0,0 +1,303 @@
+"""
+批量任务运行器
+
+从任务队列中取任务，每个任务在独占的 Xvfb 屏幕上由一个 ReActAgent 执行，
+多个任务并发运行，并记录每个任务的耗时、迭代次数、token 用量与是否成功。
+"""
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Callable, Iterable, Optional
+
+from .. import tracing
+from ..agent.base import AgentConfig, Tool
+from ..agent.react_agent import ReActAgent
+from ..agent.response_cache import ResponseCache
+from ..agent.trajectory import TrajectoryStore
+from ..config import RUNNER_CONCURRENCY, RUNNER_SCREEN_SIZE
+from ..tools import get_all_tools, get_sandbox_tools, screenshot
+from .displays import DisplayPool
+
+
+@dataclass
+class Task:
+    """一个待执行的任务"""
+    prompt: str
+    id: Optional[str] = None
+    system_prompt: Optional[str] = None  # None 使用运行器的系统提示
+    max_iterations: Optional[int] = None  # None 使用 AgentConfig 中的值
+    setup: Optional[str] = None  # 任务开始前在该屏幕上启动的 shell 命令（例如打开被测应用），任务结束后结束
+    setup_wait: float = 0.0  # 启动 setup 后等待的秒数（之后再等待界面稳定）
+    expect: Optional[str] = None  # 最终回复需包含该文本才算成功
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "Task":
+        """从 dict 创建任务（忽略未知字段）"""
+        known = {name: data[name] for name in cls.__dataclass_fields__ if name in data}
+        return cls(**known)
+
+
+@dataclass
+class TaskResult:
+    """任务执行结果"""
+    task_id: str
+    success: bool
+    reply: str = ""
+    error: Optional[str] = None
+    latency: float = 0.0  # 秒
+    iterations: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    display: Optional[str] = None
+    
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class TaskRunner:
+    """
+    多屏幕并发任务运行器
+    
+    用法:
+        with TaskRunner(config, system_prompt=PROMPT, concurrency=4) as runner:
+            results = runner.run([Task("打开设置"), Task("搜索天气")])
+    """
+    
+    def __init__(
+        self,
+        config: AgentConfig,
+        system_prompt: str = "",
+        concurrency: int = RUNNER_CONCURRENCY,
+        reuse_displays: bool = True,
+        screen_size: tuple[int, int] = RUNNER_SCREEN_SIZE,
+        tools: Optional[Callable[[], list[Tool]]] = None,
+        sandbox: bool = False,
+        display_pool: Optional[DisplayPool] = None,
+        trajectory_store: Optional[TrajectoryStore] = None,
+        response_cache: Optional[ResponseCache] = None
+    ):
+        """
+        Args:
+            config: Agent 配置（各任务共用，任务可覆盖 max_iterations）
+            system_prompt: 默认系统提示
+            concurrency: 同时运行的任务数（也是屏幕数量）
+            reuse_displays: 任务结束后是否复用屏幕；False 时每个任务使用全新启动的屏幕
+            screen_size: 虚拟屏幕分辨率 (宽, 高)
+            tools: 返回每个 Agent 注册的工具列表的函数，None 使用全部 GUI 工具
+            sandbox: 是否同时注册 Python 沙箱工具（每个 Agent 一个有状态会话）
+            display_pool: 自定义屏幕池（需提供 acquire / release / close），None 时创建 Xvfb 屏幕池
+            trajectory_store: 轨迹存储，各 Agent 共享；设置后录制成功任务的轨迹并回放重复任务
+            response_cache: LLM 响应缓存，各 Agent 共享
+        """
+        self.config = config
+        self.system_prompt = system_prompt
+        self.concurrency = concurrency
+        self.reuse_displays = reuse_displays
+        self._tools = tools or get_all_tools
+        self._sandbox = sandbox
+        self.trajectory_store = trajectory_store
+        self.response_cache = response_cache
+        self._owns_pool = display_pool is None
+        self._pool = display_pool if display_pool is not None else DisplayPool(concurrency, screen_size)
+        self._next_id = 0
+        self._id_lock = threading.Lock()
+    
+    def _task_id(self, task: Task) -> str:
+        if task.id is not None:
+            return str(task.id)
+        with self._id_lock:
+            self._next_id += 1
+            return f"task-{self._next_id}"
+    
+    def _create_agent(self, task: Task, display) -> ReActAgent:
+        """创建绑定到指定屏幕的 Agent 并注册工具"""
+        config = self.config
+        if task.max_iterations is not None:
+            config = replace(config, max_iterations=task.max_iterations)
+        system_prompt = task.system_prompt if task.system_prompt is not None else self.system_prompt
+        
+        agent = ReActAgent(
+            config,
+            system_prompt,
+            display=display.session,
+            trajectory_store=self.trajectory_store,
+            response_cache=self.response_cache
+        )
+        for tool in self._tools():
+            agent.register_tool(tool)
+        if self._sandbox:
+            for tool in get_sandbox_tools(stateful=True):
+                agent.register_tool(tool)
+        return agent
+    
+    def _start_setup(self, task: Task, display) -> subprocess.Popen:
+        """在任务的屏幕上启动 setup 命令，并等待界面稳定"""
+        process = subprocess.Popen(
+            task.setup,
+            shell=True,
+            env={**os.environ, "DISPLAY": display.name},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        if task.setup_wait > 0:
+            time.sleep(task.setup_wait)
+        display.session.screen.wait_for_settle()
+        return process
+    
+    @staticmethod
+    def _stop_setup(process: subprocess.Popen) -> None:
+        """结束 setup 命令及其启动的所有子进程"""
+        if process.poll() is not None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=5)
+        except (ProcessLookupError, subprocess.TimeoutExpired):
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            process.wait()
+    
+    def run_task(self, task: Task, task_id: Optional[str] = None) -> TaskResult:
+        """在一个空闲屏幕上执行单个任务（阻塞）"""
+        result = TaskResult(task_id=task_id or self._task_id(task), success=False)
+        with tracing.span("runner.task", task_id=result.task_id) as span:
+            self._run_task(task, result)
+            span.set(
+                display=result.display,
+                success=result.success,
+                error=result.error,
+                iterations=result.iterations,
+                total_tokens=result.total_tokens
+            )
+        return result
+    
+    def _run_task(self, task: Task, result: TaskResult) -> None:
+        """run_task 的主体，结果写入 result"""
+        try:
+            display = self._pool.acquire()
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            return
+        result.display = display.name
+        reusable = True
+        setup_process = None
+        agent = None
+        start = time.perf_counter()
+        try:
+            if task.setup:
+                setup_process = self._start_setup(task, display)
+            agent = self._create_agent(task, display)
+            initial = screenshot(display=display.session)
+            result.reply = agent.run(
+                task.prompt,
+                image_base64=initial.image_base64,
+                image_mime=initial.image_mime
+            )
+            result.success = agent.completed and (task.expect is None or task.expect in result.reply)
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            # 出错的屏幕状态未知，不再复用
+            reusable = False
+        finally:
+            result.latency = time.perf_counter() - start
+            if agent is not None:
+                result.iterations = agent.iterations
+                result.prompt_tokens = agent.usage["prompt_tokens"]
+                result.completion_tokens = agent.usage["completion_tokens"]
+                result.total_tokens = agent.usage["total_tokens"]
+                agent.close()
+            if setup_process is not None:
+                self._stop_setup(setup_process)
+            self._pool.release(display, reuse=self.reuse_displays and reusable)
+    
+    def run(
+        self,
+        tasks: Iterable[Task],
+        on_result: Optional[Callable[[TaskResult], Any]] = None
+    ) -> list[TaskResult]:
+        """
+        并发执行一组任务
+        
+        Args:
+            tasks: 任务列表
+            on_result: 每个任务完成时的回调（在完成顺序上调用）
+        
+        Returns:
+            与 tasks 顺序一致的结果列表
+        """
+        tasks = list(tasks)
+        results: list[Optional[TaskResult]] = [None] * len(tasks)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="runner") as executor:
+            futures = {executor.submit(self.run_task, task, self._task_id(task)): index for index, task in enumerate(tasks)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if on_result is not None:
+                    on_result(result)
+        return results
+    
+    def close(self) -> None:
+        """结束运行器创建的屏幕"""
+        if self._owns_pool:
+            self._pool.close()
+    
+    def __enter__(self) -> "TaskRunner":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def run_tasks(
+    tasks: Iterable[Task],
+    config: AgentConfig,
+    **kwargs
+) -> list[TaskResult]:
+    """
+    并发执行一组任务（创建并关闭一个 TaskRunner）
+    
+    Args:
+        tasks: 任务列表
+        config: Agent 配置
+        **kwargs: 传给 TaskRunner 的其他参数
+    """
+    with TaskRunner(config, **kwargs) as runner:
+        return runner.run(tasks)
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """最近秩百分位数"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(results: list[TaskResult]) -> dict:
+    """汇总一组结果：成功率、耗时分布、平均迭代次数与 token 总量"""
+    if not results:
+        return {"tasks": 0, "succeeded": 0, "success_rate": 0.0}
+    
+    latencies = [result.latency for result in results]
+    succeeded = sum(1 for result in results if result.success)
+    return {
+        "tasks": len(results),
+        "succeeded": succeeded,
+        "success_rate": succeeded / len(results),
+        "latency_mean": sum(latencies) / len(latencies),
+        "latency_p50": _percentile(latencies, 50),
+        "latency_p95": _percentile(latencies, 95),
+        "latency_max": max(latencies),
+        "iterations_mean": sum(result.iterations for result in results) / len(results),
+        "prompt_tokens": sum(result.prompt_tokens for result in results),
+        "completion_tokens": sum(result.completion_tokens for result in results),
+        "total_tokens": sum(result.total_tokens for result in results),
+    }
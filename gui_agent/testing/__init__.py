@@ -0,0 +1,7 @@
+"""测试与基准测试辅助模块"""
+
+from .mock_server import MockLLMServer
+
+__all__ = [
+    "MockLLMServer",
+]
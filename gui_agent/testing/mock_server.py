@@ -0,0 +1,277 @@
+"""
+本地 OpenAI 兼容的模拟 LLM 服务
+
+实现 /v1/chat/completions（普通响应与 SSE 流式响应），按脚本返回 tool calls 或文本回复，
+可配置响应延迟与流式分块间隔，用于在不调用付费 API 的情况下运行与压测 ReActAgent。
+
+脚本是 assistant 回合的列表，每个回合为以下之一：
+    {"tool_calls": [{"name": "click", "arguments": {"x": 500, "y": 500}}]}
+    {"content": "任务已完成"}
+    {"error": {"message": "..."}, "status": 500}
+tool call 可以用 "id" 指定 tool call id，默认由回合序号与位置生成。
+
+第 n 个回合（从 0 开始）用于响应历史中已有 n 条 assistant 消息的请求，服务本身无状态，
+多个 Agent 可以同时使用同一个服务。脚本用完后返回 default_reply。
+
+命令行:
+    python -m gui_agent.testing.mock_server --port 8000 --script script.json --latency 0.5
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+
+
+def _estimate_tokens(text: str) -> int:
+    """粗略估算 token 数（约 4 字节一个 token）"""
+    return max(1, len(text.encode("utf-8")) // 4)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """请求处理：HTTP/1.1 长连接，流式响应使用分块传输编码"""
+    
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体分开写出，关闭 Nagle 避免与客户端延迟 ACK 叠加出约 40ms 的停顿
+    disable_nagle_algorithm = True
+    
+    def log_message(self, format: str, *args) -> None:
+        pass
+    
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+    
+    def do_POST(self) -> None:
+        mock: MockLLMServer = self.server.mock
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"未知路径: {self.path}"}})
+            return
+        
+        payload = json.loads(body)
+        mock._record(payload)
+        turn = mock._next_turn(payload)
+        
+        if mock.latency > 0:
+            time.sleep(mock.latency)
+        
+        if "error" in turn:
+            self._send_json(turn.get("status", 500), {"error": turn["error"]})
+            return
+        
+        message = mock._build_message(turn, payload)
+        usage = {
+            "prompt_tokens": _estimate_tokens(body.decode("utf-8")),
+            "completion_tokens": _estimate_tokens(json.dumps(message, ensure_ascii=False)),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        
+        if not payload.get("stream"):
+            self._send_json(200, {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "model": payload.get("model", ""),
+                "choices": [{"index": 0, "message": message, "finish_reason": _finish_reason(message)}],
+                "usage": usage,
+            })
+            return
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunks = mock._stream_chunks(message)
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            chunks.append({"choices": [], "usage": usage})
+        for index, chunk in enumerate(chunks):
+            if index and mock.chunk_delay > 0:
+                time.sleep(mock.chunk_delay)
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+
+def _finish_reason(message: dict) -> str:
+    return "tool_calls" if message.get("tool_calls") else "stop"
+
+
+class MockLLMServer:
+    """
+    模拟 LLM 服务（在后台线程中运行）
+    
+    用法:
+        with MockLLMServer(script, latency=0.3) as server:
+            config = AgentConfig(api_url=server.url, api_key="mock", model="mock")
+    """
+    
+    def __init__(
+        self,
+        script: Optional[list[dict]] = None,
+        responder: Optional[Callable[[dict], dict]] = None,
+        latency: float = 0.0,
+        chunk_delay: float = 0.0,
+        chunk_size: int = 16,
+        default_reply: str = "任务已完成",
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        """
+        Args:
+            script: assistant 回合列表（格式见模块说明）
+            responder: 根据请求体返回回合的函数，设置后替代 script
+            latency: 每个请求在返回第一个字节前等待的秒数
+            chunk_delay: 流式响应相邻两个 chunk 之间的间隔（秒）
+            chunk_size: 流式响应中文本与参数每个 chunk 的字符数
+            default_reply: 脚本用完后的文本回复
+            host: 监听地址
+            port: 监听端口，0 表示自动选择
+        """
+        self.script = script or []
+        self.responder = responder
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.chunk_size = chunk_size
+        self.default_reply = default_reply
+        self.requests: list[dict] = []  # 收到的请求体
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+    
+    @property
+    def url(self) -> str:
+        """Chat Completions 接口地址（AgentConfig.api_url）"""
+        return f"{self.base_url}/chat/completions"
+    
+    def _record(self, payload: dict) -> None:
+        with self._lock:
+            self.requests.append(payload)
+    
+    def _next_turn(self, payload: dict) -> dict:
+        """按历史中 assistant 消息的数量选择回合"""
+        if self.responder is not None:
+            return self.responder(payload)
+        index = sum(1 for message in payload.get("messages", []) if message.get("role") == "assistant")
+        if index < len(self.script):
+            return self.script[index]
+        return {"content": self.default_reply}
+    
+    @staticmethod
+    def _build_message(turn: dict, payload: dict) -> dict:
+        """回合 -> OpenAI 格式的 assistant message（tool call id 由回合序号确定，重复运行保持一致）"""
+        turn_index = sum(1 for message in payload.get("messages", []) if message.get("role") == "assistant")
+        message: dict[str, Any] = {"role": "assistant", "content": turn.get("content")}
+        if turn.get("tool_calls"):
+            message["tool_calls"] = [
+                {
+                    "id": call.get("id", f"call_{turn_index}_{index}"),
+                    "type": "function",
+                    "function": {
+                        "name": call["name"],
+                        "arguments": json.dumps(call.get("arguments", {}), ensure_ascii=False),
+                    },
+                }
+                for index, call in enumerate(turn["tool_calls"])
+            ]
+        return message
+    
+    def _split(self, text: str) -> list[str]:
+        size = max(1, self.chunk_size)
+        return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+    
+    def _stream_chunks(self, message: dict) -> list[dict]:
+        """将 assistant message 拆分为流式 chunk"""
+        def chunk(delta: dict, finish_reason: Optional[str] = None) -> dict:
+            return {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+        
+        chunks = [chunk({"role": "assistant"})]
+        if message.get("content"):
+            chunks.extend(chunk({"content": part}) for part in self._split(message["content"]))
+        for index, tool_call in enumerate(message.get("tool_calls") or []):
+            chunks.append(chunk({"tool_calls": [{
+                "index": index,
+                "id": tool_call["id"],
+                "type": "function",
+                "function": {"name": tool_call["function"]["name"], "arguments": ""},
+            }]}))
+            chunks.extend(
+                chunk({"tool_calls": [{"index": index, "function": {"arguments": part}}]})
+                for part in self._split(tool_call["function"]["arguments"])
+            )
+        chunks.append(chunk({}, _finish_reason(message)))
+        return chunks
+    
+    def start(self) -> "MockLLMServer":
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容的模拟 LLM 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--script", help="脚本文件（JSON 数组，每项为一个 assistant 回合）")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的响应延迟（秒）")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="流式 chunk 间隔（秒）")
+    args = parser.parse_args(argv)
+    
+    script = None
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = json.load(f)
+    
+    server = MockLLMServer(
+        script,
+        latency=args.latency,
+        chunk_delay=args.chunk_delay,
+        host=args.host,
+        port=args.port
+    )
+    print(f"模拟 LLM 服务已启动: {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
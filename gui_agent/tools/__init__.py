@@ -1,40 +1,154 @@
-"""工具模块"""
+"""
+工具模块
+
+工具在首次访问时才导入（PEP 562），只使用沙箱工具时不会加载 PIL / numpy 与 GUI 后端，
+也不需要可用的显示器。
+
+screenshot / scroll / zoom / actions 既是子模块名也是导出的工具函数。子模块导入时解释器会把
+同名包属性设为子模块本身，本包拒绝这一赋值，因此无论导入顺序如何，gui_agent.tools.scroll 等包属性
+始终是工具函数；需要子模块本身时使用 sys.modules 或 importlib.import_module。
+"""
+
+import importlib
+import sys
+import types
+from typing import TYPE_CHECKING
 
 from ..agent.base import Tool
 
-from .screenshot import SCREENSHOT_TOOL, screenshot
-from .mouse import CLICK_TOOL, click
-from .keyboard import TYPE_TEXT_TOOL, type_text
-from .scroll import SCROLL_TOOL, scroll
-from .sandbox import PYTHON_TOOL, execute_python
+if TYPE_CHECKING:
+    from .base import DisplaySession, get_default_display
+    from .screenshot import SCREENSHOT_TOOL, screenshot
+    from .mouse import CLICK_TOOL, click
+    from .keyboard import TYPE_TEXT_TOOL, type_text
+    from .scroll import SCROLL_TOOL, scroll
+    from .zoom import ZOOM_TOOL, zoom
+    from .actions import ACTIONS_TOOL, actions
+    from .sandbox import (
+        PYTHON_TOOL,
+        execute_python,
+        SandboxPool,
+        SandboxSession,
+        create_python_tool,
+        create_session_tool,
+        get_sandbox_pool,
+    )
+
+# 导出名 -> 所在子模块
+_LAZY_EXPORTS = {
+    "DisplaySession": "base",
+    "get_default_display": "base",
+    "SCREENSHOT_TOOL": "screenshot",
+    "screenshot": "screenshot",
+    "CLICK_TOOL": "mouse",
+    "click": "mouse",
+    "TYPE_TEXT_TOOL": "keyboard",
+    "type_text": "keyboard",
+    "SCROLL_TOOL": "scroll",
+    "scroll": "scroll",
+    "ZOOM_TOOL": "zoom",
+    "zoom": "zoom",
+    "ACTIONS_TOOL": "actions",
+    "actions": "actions",
+    "PYTHON_TOOL": "sandbox",
+    "execute_python": "sandbox",
+    "SandboxPool": "sandbox",
+    "SandboxSession": "sandbox",
+    "create_python_tool": "sandbox",
+    "create_session_tool": "sandbox",
+    "get_sandbox_pool": "sandbox",
+}
+
+
+class _ToolsModule(types.ModuleType):
+    """本包的模块类型：导入子模块时不让同名子模块覆盖导出的工具函数"""
+    
+    def __setattr__(self, name: str, value) -> None:
+        # 导入系统在子模块加载完成后执行 setattr(包, 子模块名, 子模块)；
+        # 忽略后访问该属性时由 __getattr__ 返回工具函数
+        shadowing = (
+            name == _LAZY_EXPORTS.get(name)
+            and isinstance(value, types.ModuleType)
+            and value.__name__ == f"{__name__}.{name}"
+        )
+        if shadowing:
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _ToolsModule
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
 
 def get_all_tools() -> list[Tool]:
     """获取所有 GUI 工具"""
+    from .screenshot import SCREENSHOT_TOOL
+    from .mouse import CLICK_TOOL
+    from .keyboard import TYPE_TEXT_TOOL
+    from .scroll import SCROLL_TOOL
+    from .zoom import ZOOM_TOOL
+    from .actions import ACTIONS_TOOL
+    
     return [
         SCREENSHOT_TOOL,
         CLICK_TOOL,
         TYPE_TEXT_TOOL,
         SCROLL_TOOL,
+        ZOOM_TOOL,
+        ACTIONS_TOOL,
     ]
 
 
-def get_sandbox_tools() -> list[Tool]:
-    """获取沙箱工具"""
+def get_sandbox_tools(stateful: bool = False) -> list[Tool]:
+    """
+    获取沙箱工具
+    
+    Args:
+        stateful: True 返回绑定到新建有状态会话的工具（变量在调用之间保留，每个 Agent 各取一份）；
+            False 返回无状态工具（同时预启动沙箱 worker 池）
+    """
+    from .sandbox import PYTHON_TOOL, create_session_tool, get_sandbox_pool
+    
+    if stateful:
+        return [create_session_tool()]
+    get_sandbox_pool()
     return [PYTHON_TOOL]
 
 
 __all__ = [
     "get_all_tools",
     "get_sandbox_tools",
+    "DisplaySession",
+    "get_default_display",
     "screenshot",
     "click",
     "type_text",
     "scroll",
+    "zoom",
+    "actions",
     "execute_python",
+    "SandboxPool",
+    "SandboxSession",
+    "create_python_tool",
+    "create_session_tool",
+    "get_sandbox_pool",
     "SCREENSHOT_TOOL",
     "CLICK_TOOL",
     "TYPE_TEXT_TOOL",
     "SCROLL_TOOL",
+    "ZOOM_TOOL",
+    "ACTIONS_TOOL",
     "PYTHON_TOOL",
 ]
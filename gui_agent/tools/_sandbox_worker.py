@@ -0,0 +1,317 @@
+"""
+Python 沙箱常驻 worker 进程
+
+由 sandbox.py 以独立脚本方式启动（不导入 gui_agent 包，只依赖标准库），通过 stdin/stdout
+上的长度前缀 JSON 协议接收代码、返回输出。默认每次执行使用全新的全局命名空间，
+效果等同于 `python script.py`，但省去了解释器启动与预加载模块的导入开销；
+会话模式（persist）下各次执行共享同一个命名空间，变量在调用之间保留。
+每次执行时 fd 1/2 重定向到管道，由后台线程读入有界缓冲区（只保留开头和结尾）：
+用户代码的 print 与子进程、os.system、C 扩展的底层写入都会被捕获，输出再多也不会占用过多内存。
+
+启动参数（argv[1]，JSON）：
+    {"preload": ["numpy", ...], "memory_limit": 字节数或 null}
+
+协议：
+    请求  {"code": "...", "persist": false, "max_output": 字节数或 null}
+    响应  {"stdout": "...", "stderr": "...", "returncode": 0, "recycle": false}
+
+非会话模式的执行之间只恢复 sys.path、环境变量与工作目录；sys.modules 中已导入的模块是共享的
+（这正是预加载的意义）。执行结束后仍有用户代码启动的线程在运行、或 builtins 被修改时，
+响应中 recycle 为 true，调用方应回收该 worker，避免残留状态（例如后台线程的输出）进入下一次执行。
+"""
+
+import builtins
+import io
+import json
+import os
+import struct
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# 用户代码的文件名（traceback、__file__ 与 sys.argv[0]）
+SANDBOX_FILENAME = "<sandbox>"
+# 用户代码结束后，等待仍持有输出管道的子进程（例如后台运行的进程）写完的最长时间（秒）
+OUTPUT_DRAIN_TIMEOUT = 1.0
+
+
+class BoundedOutput(io.TextIOBase):
+    """
+    有界输出缓冲区：保留开头 limit/2 字节与结尾 limit/2 字节，中间部分只计数
+    
+    结尾部分以分块队列保存，超出时从队首整块丢弃，每次写入为 O(1) 均摊。
+    既可作为文本流（write str），也可直接写入字节（write_bytes）；文本先攒成批再编码，
+    避免逐行 print 时每次写入都做一遍截断处理。
+    """
+    
+    # 文本攒批的字符数
+    BATCH_CHARS = 64 * 1024
+    
+    def __init__(self, limit=None):
+        """
+        Args:
+            limit: 保留的字节上限，None 表示不限制
+        """
+        self.limit = limit
+        self._head = bytearray()
+        self._tail = deque()
+        self._tail_bytes = 0
+        self.dropped = 0  # 被省略的字节数
+        self._pending: list[str] = []
+        self._pending_chars = 0
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, text: str) -> int:
+        self._pending.append(text)
+        self._pending_chars += len(text)
+        if self._pending_chars >= self.BATCH_CHARS:
+            self.flush()
+        return len(text)
+    
+    def flush(self) -> None:
+        if self._pending:
+            text = "".join(self._pending)
+            self._pending.clear()
+            self._pending_chars = 0
+            self.write_bytes(text.encode("utf-8", "surrogateescape"))
+    
+    def write_bytes(self, data: bytes) -> None:
+        if self.limit is None:
+            self._head += data
+            return
+        
+        head_room = self.limit // 2 - len(self._head)
+        if head_room > 0:
+            self._head += data[:head_room]
+            data = data[head_room:]
+        if not data:
+            return
+        
+        tail_limit = self.limit - self.limit // 2
+        if len(data) > tail_limit:
+            self.dropped += len(data) - tail_limit
+            data = data[-tail_limit:]
+        self._tail.append(data)
+        self._tail_bytes += len(data)
+        
+        # 从队首丢弃超出的部分（最后一块只截掉前半段）
+        while self._tail_bytes > tail_limit:
+            excess = self._tail_bytes - tail_limit
+            first = self._tail[0]
+            if len(first) <= excess:
+                self._tail.popleft()
+                self._tail_bytes -= len(first)
+                self.dropped += len(first)
+            else:
+                self._tail[0] = first[excess:]
+                self._tail_bytes -= excess
+                self.dropped += excess
+    
+    def getvalue(self) -> str:
+        """返回保留的输出，被省略的部分以标记代替"""
+        self.flush()
+        tail = b"".join(self._tail)
+        if not self.dropped:
+            return (bytes(self._head) + tail).decode("utf-8", "replace")
+        return (
+            self._head.decode("utf-8", "replace")
+            + f"\n...[输出过长，已省略 {self.dropped} 字节]...\n"
+            + tail.decode("utf-8", "replace")
+        )
+
+
+class FdCapture:
+    """
+    将文件描述符重定向到管道，由后台线程读入有界缓冲区
+    
+    同一 fd 上 Python 层的写入与子进程、os.system、C 扩展的写入进入同一个缓冲区。
+    """
+    
+    def __init__(self, fd: int, output: BoundedOutput):
+        self.fd = fd
+        self.output = output
+        self._saved = os.dup(fd)
+        read_fd, write_fd = os.pipe()
+        os.dup2(write_fd, fd)
+        os.close(write_fd)
+        self._lock = threading.Lock()
+        self._done = False
+        self._reader = threading.Thread(target=self._drain, args=(read_fd,), daemon=True)
+        # 输出读取线程属于 worker 自身，在管道关闭后结束，不算作用户代码残留的线程
+        self._reader.sandbox_capture = True
+        self._reader.start()
+    
+    def _drain(self, read_fd: int) -> None:
+        with open(read_fd, "rb", buffering=0) as stream:
+            for chunk in iter(lambda: stream.read(65536), b""):
+                with self._lock:
+                    # 已返回结果后仍继续读取（丢弃），避免写入方因管道写满而阻塞
+                    if not self._done:
+                        self.output.write_bytes(chunk)
+    
+    def release(self) -> None:
+        """恢复原 fd（管道写端只剩子进程持有时，读取线程在其退出后结束）"""
+        os.dup2(self._saved, self.fd)
+        os.close(self._saved)
+    
+    def finish(self, deadline: float) -> None:
+        """等待管道中剩余的输出，最多到 deadline（time.monotonic()），之后的输出丢弃"""
+        self._reader.join(max(0.0, deadline - time.monotonic()))
+        with self._lock:
+            self._done = True
+
+
+def read_message(stream) -> dict:
+    """读取一条长度前缀 JSON 消息，流结束时返回 None"""
+    header = stream.read(4)
+    if len(header) < 4:
+        return None
+    (length,) = struct.unpack(">I", header)
+    return json.loads(stream.read(length).decode("utf-8"))
+
+
+def write_message(stream, message: dict) -> None:
+    """写入一条长度前缀 JSON 消息"""
+    data = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    stream.write(struct.pack(">I", len(data)) + data)
+    stream.flush()
+
+
+def _exit_code(code) -> int:
+    """将 SystemExit.code 转换为进程退出码"""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def new_namespace() -> dict:
+    """全新的 __main__ 全局命名空间"""
+    return {"__name__": "__main__", "__file__": SANDBOX_FILENAME, "__builtins__": builtins}
+
+
+def set_memory_limit(limit: int) -> None:
+    """限制进程地址空间，超出时用户代码收到 MemoryError"""
+    if resource is None:
+        return
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+def run_code(code: str, namespace: dict, max_output=None) -> dict:
+    """在给定命名空间中执行代码，捕获 fd 1/2 的全部输出（各自最多保留 max_output 字节）"""
+    stdout, stderr = BoundedOutput(max_output), BoundedOutput(max_output)
+    cwd = os.getcwd()
+    returncode = 0
+    
+    captures = [FdCapture(1, stdout), FdCapture(2, stderr)]
+    # 与 `python script.py` 输出到管道时一致：stdout 块缓冲，stderr 行缓冲
+    out = open(1, "w", encoding="utf-8", errors="backslashreplace", closefd=False)
+    err = open(2, "w", encoding="utf-8", errors="backslashreplace", buffering=1, closefd=False)
+    sys.stdout, sys.stderr = out, err
+    sys.argv = [SANDBOX_FILENAME]
+    try:
+        exec(compile(code, SANDBOX_FILENAME, "exec"), namespace)
+    except SystemExit as e:
+        returncode = _exit_code(e.code)
+    except BaseException as e:
+        # 去掉 worker 自身的栈帧，只保留用户代码部分
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        returncode = 1
+    finally:
+        for stream in (out, err):
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        for capture in captures:
+            capture.release()
+        deadline = time.monotonic() + OUTPUT_DRAIN_TIMEOUT
+        for capture in captures:
+            capture.finish(deadline)
+        os.chdir(cwd)
+    
+    return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "returncode": returncode}
+
+
+def _builtins_changed(initial: dict) -> bool:
+    """builtins 是否与启动时不同（增加、删除或替换了名字）"""
+    current = vars(builtins)
+    return current.keys() != initial.keys() or any(current[name] is not value for name, value in initial.items())
+
+
+def reset_process_state(path: list, environ: dict) -> None:
+    """恢复上一次执行可能修改的进程级状态（sys.path、环境变量），使每次执行互不影响"""
+    sys.path[:] = path
+    if os.environ != environ:
+        os.environ.clear()
+        os.environ.update(environ)
+
+
+def main() -> None:
+    # 不让 worker 所在目录（gui_agent/tools）遮蔽用户代码中的同名模块
+    if sys.path and os.path.abspath(sys.path[0]) == os.path.dirname(os.path.abspath(__file__)):
+        sys.path.pop(0)
+    
+    # 协议使用原始 stdin/stdout 的副本；fd 0/1 指向 devnull，避免用户代码的底层写入破坏协议
+    protocol_in = os.fdopen(os.dup(0), "rb")
+    protocol_out = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    
+    options = json.loads(sys.argv[1]) if len(sys.argv) > 1 else {}
+    sys.argv = [SANDBOX_FILENAME]
+    
+    # 预加载常用模块（导入失败忽略）
+    for module in options.get("preload", []):
+        try:
+            __import__(module)
+        except Exception:
+            pass
+    
+    # 预加载之后再限制内存，避免导入大型库时触发上限
+    if options.get("memory_limit"):
+        set_memory_limit(options["memory_limit"])
+    
+    session_namespace = new_namespace()
+    initial_path, initial_environ = list(sys.path), dict(os.environ)
+    initial_builtins = dict(vars(builtins))
+    while True:
+        request = read_message(protocol_in)
+        if request is None:
+            break
+        if request.get("persist"):
+            namespace = session_namespace
+        else:
+            reset_process_state(initial_path, initial_environ)
+            namespace = new_namespace()
+        threads = set(threading.enumerate())
+        response = run_code(request["code"], namespace, request.get("max_output"))
+        # 非会话模式下，残留的线程或被修改的 builtins 会影响之后的执行（会话模式下它们属于会话状态）
+        if not request.get("persist"):
+            leftover = [
+                thread for thread in threading.enumerate()
+                if thread not in threads and not getattr(thread, "sandbox_capture", False)
+            ]
+            response["recycle"] = bool(leftover) or _builtins_changed(initial_builtins)
+        write_message(protocol_out, response)
+
+
+if __name__ == "__main__":
+    main()
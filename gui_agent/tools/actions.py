@@ -0,0 +1,110 @@
+"""批量操作工具 - actions"""
+
+from typing import Any, Callable, Optional
+
+from ..agent.base import Tool, ToolResult
+from ..config import DEFAULT_SCREENSHOT_DELAY_MS
+from .base import DisplaySession, get_default_display
+from .keyboard import perform_key, perform_type_text, preserve_clipboard
+from .mouse import perform_click
+from .scroll import perform_scroll
+
+
+# 步骤类型 -> 执行函数（参数与对应的单步工具一致）
+ACTION_HANDLERS: dict[str, Callable[..., str]] = {
+    "click": perform_click,
+    "type": perform_type_text,
+    "scroll": perform_scroll,
+    "key": perform_key,
+}
+
+
+def actions(steps: list[dict[str, Any]], display: Optional[DisplaySession] = None) -> ToolResult:
+    """
+    依次执行一组操作，最后只截一张图
+    
+    Args:
+        steps: 操作列表，每项包含 action（click/type/scroll/key）、对应工具的参数，
+            以及可选的 settle（该步执行后等待界面稳定再执行下一步）
+        display: 操作的屏幕，None 使用默认屏幕
+    """
+    if not steps:
+        return ToolResult(text="错误：操作列表不能为空")
+    
+    display = display or get_default_display()
+    result_parts = []
+    # 剪贴板在最终截图之后再恢复（粘贴在界面稳定前可能尚未生效）
+    with preserve_clipboard(display):
+        for index, step in enumerate(steps, start=1):
+            params = dict(step)
+            action = params.pop("action", None)
+            settle = params.pop("settle", False)
+            
+            handler = ACTION_HANDLERS.get(action)
+            try:
+                if handler is None:
+                    raise ValueError(f"未知操作类型: {action}")
+                result_parts.append(f"{index}. {handler(**params, display=display)}")
+            except Exception as e:
+                # 第一个失败的步骤之后不再继续，截图反映失败时的界面
+                failure = f"{index}. 失败（{type(e).__name__}: {e}）"
+                if index < len(steps):
+                    failure += f"，剩余 {len(steps) - index} 步未执行"
+                result_parts.append(failure)
+                break
+            
+            if settle and index < len(steps):
+                display.screen.wait_for_settle()
+        
+        shot = display.screen.shot(delay_ms=DEFAULT_SCREENSHOT_DELAY_MS, settle=True, delta=True)
+    return shot.to_tool_result("\n".join(result_parts))
+
+
+ACTIONS_TOOL = Tool(
+    name="actions",
+    description="""按顺序连续执行多个操作，全部完成后只返回一张截图。
+
+适用场景：可预见结果的多步操作，例如依次填写表单的多个输入框、输入后按 Tab 切换、连续滚动等。
+结果不确定、需要看截图再决定下一步时，请使用单步工具。
+
+每个步骤的 action 与参数：
+- click：x, y, click_type（同 click 工具）
+- type：text, x, y, press_enter（同 type_text 工具）
+- scroll：x, y, direction, amount（同 scroll 工具）
+- key：keys，按键或组合键，例如 "enter"、"tab"、"esc"、"ctrl+a"
+
+坐标均为 0-1000 归一化坐标。步骤可设置 settle=true，表示该步执行后等待界面稳定再执行下一步（例如点击后会弹出菜单）。
+任一步骤失败时立即停止，并返回失败时的截图。""",
+    parameters={
+        "type": "object",
+        "properties": {
+            "steps": {
+                "type": "array",
+                "description": "按顺序执行的操作列表",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "action": {
+                            "type": "string",
+                            "description": "操作类型",
+                            "enum": ["click", "type", "scroll", "key"]
+                        },
+                        "x": {"type": "integer", "description": "X 坐标 (0-1000)"},
+                        "y": {"type": "integer", "description": "Y 坐标 (0-1000)"},
+                        "click_type": {"type": "string", "enum": ["left", "right", "double"]},
+                        "text": {"type": "string", "description": "type 操作要输入的文本"},
+                        "press_enter": {"type": "boolean"},
+                        "direction": {"type": "string", "enum": ["up", "down"]},
+                        "amount": {"type": "integer"},
+                        "keys": {"type": "string", "description": "key 操作的按键，组合键用 + 连接"},
+                        "settle": {"type": "boolean", "description": "执行后是否等待界面稳定，默认 false"}
+                    },
+                    "required": ["action"]
+                }
+            }
+        },
+        "required": ["steps"]
+    },
+    func=actions,
+    accepts_display=True
+)
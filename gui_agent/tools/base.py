@@ -1,26 +1,206 @@
 """
-工具基础类 - 屏幕截图
+工具基础类 - 屏幕截图、显示会话
 """
 
 import base64
+import os
 import platform
 import subprocess
+import threading
 import time
-from datetime import datetime
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
+from typing import Optional
 
-import pyautogui
+import numpy as np
 from PIL import Image
 
-from ..config import SCREENSHOT_DIR
+from ..agent.base import ToolResult, SCREEN_LOCK
+from ..backends import (
+    CaptureBackend,
+    Frame,
+    InputBackend,
+    create_capture_backend,
+    create_input_backend,
+    get_capture_backend,
+    get_input_backend,
+)
+from .. import tracing
+from ..archive import get_screenshot_archive
+from ..imaging import changed_region, perceptual_hash
+from ..config import (
+    SCREENSHOT_DIR,
+    SCREENSHOT_FORMAT,
+    SCREENSHOT_QUALITY,
+    SCREENSHOT_COMPRESS_LEVEL,
+    SAVE_SCREENSHOTS,
+    SETTLE_ENABLED,
+    SETTLE_MIN_MS,
+    SETTLE_MAX_MS,
+    SETTLE_INTERVAL_MS,
+    SETTLE_STABLE_FRAMES,
+    SETTLE_DIFF_THRESHOLD,
+    SCREENSHOT_DELTA_ENABLED,
+    DELTA_MAX_AREA_RATIO,
+    DELTA_FULL_FRAME_INTERVAL,
+    DELTA_BLOCK_SIZE,
+    DELTA_MARGIN,
+    SCREENSHOT_OVERVIEW_SCALE,
+    ZOOM_MAX_SIZE,
+)
+
+
+# 支持的编码格式: 格式名 -> (MIME 类型, 文件扩展名)
+IMAGE_FORMATS = {
+    "PNG": ("image/png", "png"),
+    "JPEG": ("image/jpeg", "jpg"),
+    "WEBP": ("image/webp", "webp"),
+}
+
+
+def encode_image(
+    image: Image.Image,
+    image_format: str = "PNG",
+    quality: int = 80,
+    compress_level: int = 6
+) -> bytes:
+    """
+    将图片编码为指定格式
+    
+    Args:
+        image: PIL 图片
+        image_format: PNG / JPEG / WEBP
+        quality: JPEG/WEBP 质量 (1-100)
+        compress_level: PNG 压缩级别 (0-9)，越小越快；WEBP 时映射为 method (0-6)
+        
+    Returns:
+        编码后的字节
+    """
+    image_format = image_format.upper()
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"不支持的截图格式: {image_format}")
+    
+    buffer = BytesIO()
+    if image_format == "PNG":
+        image.save(buffer, format="PNG", compress_level=compress_level)
+    elif image_format == "JPEG":
+        image.convert("RGB").save(buffer, format="JPEG", quality=quality)
+    else:
+        image.save(buffer, format="WEBP", quality=quality, method=min(compress_level, 6))
+    return buffer.getvalue()
+
+
+# 稳定检测用的缩略图宽度
+_SETTLE_THUMB_WIDTH = 160
+# 单个像素灰度变化超过该值才计为变化（过滤抗锯齿/压缩噪声）
+_PIXEL_DIFF_THRESHOLD = 10
+
+
+def _settle_thumbnail(frame: Frame) -> np.ndarray:
+    """生成稳定检测用的低分辨率灰度缩略图（直接在像素数组上计算，不转换为 PIL 图片）"""
+    return frame.gray_thumbnail(_SETTLE_THUMB_WIDTH)
+
+
+def _changed_ratio(a: np.ndarray, b: np.ndarray) -> float:
+    """两张同尺寸灰度缩略图之间变化像素的占比"""
+    if a.shape != b.shape:
+        return 1.0
+    changed = np.count_nonzero(np.abs(a.astype(np.int16) - b.astype(np.int16)) > _PIXEL_DIFF_THRESHOLD)
+    return changed / a.size
+
+
+@dataclass
+class Screenshot:
+    """一次截图的编码结果"""
+    base64: str
+    mime_type: str
+    width: int
+    height: int
+    settle_ms: Optional[int] = None  # 自适应等待的实际耗时
+    image_hash: Optional[str] = None  # 感知哈希（始终对应整屏）
+    region: Optional[tuple[int, int, int, int]] = None  # 局部截图区域，0-1000 归一化坐标
+    caption: Optional[str] = None  # 上传时附带的说明
+    
+    def to_tool_result(self, text: str) -> ToolResult:
+        """构建附带该截图的工具结果"""
+        return ToolResult(
+            text=text,
+            image_base64=self.base64,
+            image_mime=self.mime_type,
+            settle_ms=self.settle_ms,
+            image_hash=self.image_hash,
+            image_region=self.region,
+            image_caption=self.caption,
+            image_size=(self.width, self.height)
+        )
 
 
 class ScreenCapture:
     """屏幕截图类，封装截图逻辑"""
     
-    def __init__(self):
-        self.scale_factor = self._get_scale_factor()
+    def __init__(
+        self,
+        image_format: str = SCREENSHOT_FORMAT,
+        quality: int = SCREENSHOT_QUALITY,
+        compress_level: int = SCREENSHOT_COMPRESS_LEVEL,
+        save_dir: Optional[Path] = SCREENSHOT_DIR if SAVE_SCREENSHOTS else None,
+        settle: bool = SETTLE_ENABLED,
+        delta: bool = SCREENSHOT_DELTA_ENABLED,
+        overview_scale: float = SCREENSHOT_OVERVIEW_SCALE,
+        capture_backend: Optional[CaptureBackend] = None
+    ):
+        """
+        Args:
+            image_format: 发送给模型的编码格式 PNG / JPEG / WEBP
+            quality: JPEG/WEBP 质量 (1-100)
+            compress_level: PNG 压缩级别 (0-9)
+            save_dir: 截图归档目录（同一目录共享一个归档），None 表示不保存
+            settle: 是否启用自适应等待，关闭时操作后使用固定延迟
+            delta: 是否启用局部截图，只发送与上一张相比发生变化的区域
+            overview_scale: 发送给模型的概览图缩放比例，1.0 表示原尺寸
+            capture_backend: 截屏后端，None 表示首次截屏时使用全局默认后端
+        """
+        self._capture_backend = capture_backend
+        self.settle = settle
+        self.delta = delta
+        self.overview_scale = overview_scale
+        # 当前帧的图像金字塔：第 0 层为原始分辨率截图（HiDPI 屏幕上大于逻辑分辨率），
+        # 第 k 层为其 1/2^k，按需生成，供概览图与 zoom 复用
+        self._pyramid: list[Image.Image] = []
+        # 上一张返回的整屏灰度帧，以及此后连续返回的局部截图数量
+        self._reference: Optional[np.ndarray] = None
+        self._deltas_since_full = 0
+        # 最近一张截图的感知哈希及其之前的基准状态，调用方丢弃该截图时据此撤销（见 discard_shot）
+        self._last_shot: Optional[tuple[str, Optional[np.ndarray], int]] = None
+        self.image_format = image_format.upper()
+        self.quality = quality
+        self.compress_level = compress_level
+        self.archive = get_screenshot_archive(save_dir) if save_dir is not None else None
+        self._scale_factor: Optional[float] = None
+    
+    @property
+    def scale_factor(self) -> float:
+        """屏幕缩放因子（首次截屏时才检测，macOS 上需要调用 system_profiler）"""
+        if self._scale_factor is None:
+            self._scale_factor = self._get_scale_factor()
+        return self._scale_factor
+    
+    @scale_factor.setter
+    def scale_factor(self, value: float) -> None:
+        self._scale_factor = value
+    
+    @property
+    def capture_backend(self) -> CaptureBackend:
+        """截屏后端（未指定时首次使用才创建默认后端）"""
+        if self._capture_backend is None:
+            self._capture_backend = get_capture_backend()
+        return self._capture_backend
+    
+    @property
+    def mime_type(self) -> str:
+        """当前编码格式的 MIME 类型"""
+        return IMAGE_FORMATS[self.image_format][0]
     
     def _get_scale_factor(self) -> float:
         """获取屏幕缩放因子（macOS Retina / Windows 高 DPI）"""
@@ -55,39 +235,397 @@ class ScreenCapture:
         # Linux 及其他系统
         return 1.0
     
-    def capture(self, delay_ms: int = 0) -> str:
+    def _grab_frame(self) -> Frame:
+        """截取屏幕原始像素（未缩放，可能是后端复用缓冲区的视图）"""
+        return self.capture_backend.grab()
+    
+    def _grab_raw(self) -> Image.Image:
+        """截取屏幕原始图片（未缩放）"""
+        return self._grab_frame().to_image()
+    
+    def _capture_raw(self) -> Image.Image:
+        """截取屏幕原始分辨率图片（记录 screen.capture span）"""
+        with tracing.span("screen.capture", backend=type(self.capture_backend).__name__) as span:
+            screenshot = self._grab_raw()
+            span.set(width=screenshot.width, height=screenshot.height)
+        return screenshot
+    
+    def _logical_scale(self) -> float:
+        """原始截图到逻辑分辨率的缩放比例（Retina / 高 DPI 屏幕上小于 1）"""
+        return 1 / self.scale_factor if self.scale_factor > 1 else 1.0
+    
+    def _overview(self, pyramid: Optional[list[Image.Image]] = None) -> Image.Image:
+        """从原始帧金字塔生成发送给模型的概览图：逻辑分辨率再按 overview_scale 缩放"""
+        return self._scaled(self.overview_scale * self._logical_scale(), pyramid)
+    
+    def grab(self) -> Image.Image:
+        """截取屏幕，返回（已按缩放因子还原尺寸的）图片"""
+        return self._scaled(self._logical_scale(), pyramid=[self._capture_raw()])
+    
+    def current_hash(self) -> str:
         """
-        截取屏幕并返回 base64 编码，同时保存到本地
+        当前屏幕的感知哈希，不编码、不影响金字塔与局部截图状态
+        
+        与 shot 返回的 image_hash 一样基于按 overview_scale 缩放后的概览图计算，两者可以直接比较
+        """
+        return perceptual_hash(self._overview(pyramid=[self._capture_raw()]))
+    
+    def wait_for_settle(self, max_ms: int = SETTLE_MAX_MS) -> tuple[Optional[Frame], int]:
+        """
+        等待界面稳定：按固定间隔采样低分辨率帧，连续帧不再变化即返回
+        
+        Args:
+            max_ms: 最长等待时间（毫秒），超时返回最后一帧
+            
+        Returns:
+            (最后一帧原始像素, 实际等待毫秒数)；未启用自适应等待时固定等待 max_ms，帧为 None。
+            帧只在下一次截屏之前有效
+        """
+        with tracing.span("screen.settle", adaptive=self.settle) as span:
+            start = time.monotonic()
+            if not self.settle:
+                time.sleep(max_ms / 1000.0)
+                return None, max_ms
+            
+            time.sleep(min(SETTLE_MIN_MS, max_ms) / 1000.0)
+            frame = self._grab_frame()
+            thumbnail = _settle_thumbnail(frame)
+            stable = 1
+            samples = 1
+            
+            while True:
+                elapsed_ms = int((time.monotonic() - start) * 1000)
+                if stable >= SETTLE_STABLE_FRAMES or elapsed_ms >= max_ms:
+                    span.set(samples=samples, timed_out=stable < SETTLE_STABLE_FRAMES)
+                    return frame, elapsed_ms
+                
+                time.sleep(min(SETTLE_INTERVAL_MS, max_ms - elapsed_ms) / 1000.0)
+                frame = self._grab_frame()
+                samples += 1
+                previous, thumbnail = thumbnail, _settle_thumbnail(frame)
+                if _changed_ratio(previous, thumbnail) <= SETTLE_DIFF_THRESHOLD:
+                    stable += 1
+                else:
+                    stable = 1
+    
+    def _pyramid_level(self, level: int, pyramid: Optional[list[Image.Image]] = None) -> Image.Image:
+        """获取帧金字塔（默认为当前帧的金字塔）的第 level 层（原图的 1/2^level），按需逐层缩小"""
+        pyramid = self._pyramid if pyramid is None else pyramid
+        while len(pyramid) <= level:
+            pyramid.append(pyramid[-1].reduce(2))
+        return pyramid[level]
+    
+    def _scaled(self, scale: float, pyramid: Optional[list[Image.Image]] = None) -> Image.Image:
+        """从金字塔（默认为当前帧的金字塔）中取不小于目标尺寸的最近一层，再缩放到目标尺寸"""
+        pyramid = self._pyramid if pyramid is None else pyramid
+        frame = pyramid[0]
+        size = (max(1, round(frame.width * scale)), max(1, round(frame.height * scale)))
+        
+        level = 0
+        while 0.5 ** (level + 1) >= scale and min(self._pyramid_level(level, pyramid).size) > 1:
+            level += 1
+        image = self._pyramid_level(level, pyramid)
+        return image if image.size == size else image.resize(size, Image.BOX)
+    
+    def reset_delta(self) -> None:
+        """丢弃局部截图的基准帧，下一张截图发送整帧"""
+        self._reference = None
+        self._deltas_since_full = 0
+        self._last_shot = None
+    
+    def discard_shot(self, image_hash: str) -> None:
+        """
+        调用方丢弃了一张截图（例如与上一张几乎相同而未发送）：基准帧退回到此前已发送的帧，
+        低于去重阈值的变化会累积到之后的局部截图中，而不是永远不被发送
+        
+        被丢弃的不是最近一张截图时（之后的截图已经以它为基准），丢弃基准帧，下一张截图发送整帧
+        """
+        if not self.delta:
+            return
+        if self._last_shot is not None and self._last_shot[0] == image_hash:
+            _, self._reference, self._deltas_since_full = self._last_shot
+            self._last_shot = None
+        else:
+            self.reset_delta()
+    
+    def _delta_region(self, screenshot: Image.Image, allow: bool) -> Optional[tuple[int, int, int, int]]:
+        """
+        与上一张返回的整屏帧比较，返回应当发送的局部区域（像素坐标）
+        
+        不允许局部截图、变化过大、没有变化、或连续局部截图过多时返回 None，表示发送整帧
+        """
+        current = np.asarray(screenshot.convert("L"))
+        previous, self._reference = self._reference, current
+        
+        if not allow or previous is None or self._deltas_since_full >= DELTA_FULL_FRAME_INTERVAL:
+            return None
+        
+        region = changed_region(previous, current, block_size=DELTA_BLOCK_SIZE)
+        if region is None:
+            return None
+        
+        left, top, right, bottom = region
+        width, height = screenshot.size
+        left, top = max(0, left - DELTA_MARGIN), max(0, top - DELTA_MARGIN)
+        right, bottom = min(width, right + DELTA_MARGIN), min(height, bottom + DELTA_MARGIN)
+        
+        if (right - left) * (bottom - top) > DELTA_MAX_AREA_RATIO * width * height:
+            return None
+        
+        return left, top, right, bottom
+    
+    def shot(self, delay_ms: int = 0, settle: bool = False, delta: bool = False) -> Screenshot:
+        """
+        截取屏幕并编码（只编码一次），同时提交后台写盘
         
         Args:
             delay_ms: 截图前等待的毫秒数，0 表示不等待
+            settle: 是否自适应等待界面稳定后再截图（启用时替代 delay_ms 固定等待）
+            delta: 是否允许只返回变化区域（需同时启用实例的 delta 模式）
             
         Returns:
-            PNG 图片的 base64 编码字符串
+            Screenshot 编码结果
         """
-        if delay_ms > 0:
-            time.sleep(delay_ms / 1000.0)
+        settle_ms = None
+        if settle and self.settle:
+            frame, settle_ms = self.wait_for_settle()
+            # 复用稳定检测的最后一帧，不再重新截屏
+            with tracing.span("screen.capture", backend=type(self.capture_backend).__name__, reused=True) as span:
+                raw = frame.to_image()
+                span.set(width=raw.width, height=raw.height)
+        else:
+            if delay_ms > 0:
+                time.sleep(delay_ms / 1000.0)
+            raw = self._capture_raw()
+        
+        # 缓存原始分辨率的整帧金字塔（zoom 从中裁剪原生像素），发送逻辑分辨率的概览图
+        self._pyramid = [raw]
+        screenshot = self._overview()
         
-        screenshot = pyautogui.screenshot()
+        image_hash = perceptual_hash(screenshot)
+        
+        # 局部截图：裁剪变化区域，并换算为 0-1000 归一化坐标
+        region = None
+        if self.delta:
+            self._last_shot = (image_hash, self._reference, self._deltas_since_full)
+            pixel_region = self._delta_region(screenshot, allow=delta)
+            if pixel_region is None:
+                self._deltas_since_full = 0
+            else:
+                self._deltas_since_full += 1
+                left, top, right, bottom = pixel_region
+                region = (
+                    left * 1000 // screenshot.width,
+                    top * 1000 // screenshot.height,
+                    -(-right * 1000 // screenshot.width),
+                    -(-bottom * 1000 // screenshot.height),
+                )
+                screenshot = screenshot.crop(pixel_region)
+        
+        return self._encode(screenshot, settle_ms=settle_ms, image_hash=image_hash, region=region)
+    
+    def zoom(self, x1: int, y1: int, x2: int, y2: int, max_size: int = ZOOM_MAX_SIZE) -> Screenshot:
+        """
+        返回当前帧指定区域的高清局部图（复用缓存的金字塔，不重新截屏）
         
-        # Retina 屏幕缩放
-        if self.scale_factor > 1:
-            new_size = (
-                int(screenshot.width / self.scale_factor),
-                int(screenshot.height / self.scale_factor)
+        Args:
+            x1, y1, x2, y2: 区域左上角与右下角，0-1000 归一化坐标
+            max_size: 返回图片的最长边（像素）
+            
+        Returns:
+            Screenshot 编码结果，region 为实际区域
+        """
+        x1, x2 = sorted((max(0, min(1000, x1)), max(0, min(1000, x2))))
+        y1, y2 = sorted((max(0, min(1000, y1)), max(0, min(1000, y2))))
+        if x2 - x1 < 1 or y2 - y1 < 1:
+            raise ValueError("区域为空，请确认 x2 > x1 且 y2 > y1")
+        
+        if not self._pyramid:
+            self._pyramid = [self._capture_raw()]
+        
+        # 归一化坐标与分辨率无关，直接映射到原始分辨率的帧上；选择裁剪后仍不小于目标尺寸的最小一层
+        frame = self._pyramid[0]
+        crop_width = frame.width * (x2 - x1) / 1000
+        crop_height = frame.height * (y2 - y1) / 1000
+        target = min(max_size, max(crop_width, crop_height))
+        level = 0
+        while max(crop_width, crop_height) * 0.5 ** (level + 1) >= target:
+            level += 1
+        
+        image = self._pyramid_level(level)
+        box = (
+            image.width * x1 // 1000,
+            image.height * y1 // 1000,
+            max(image.width * x1 // 1000 + 1, -(-image.width * x2 // 1000)),
+            max(image.height * y1 // 1000 + 1, -(-image.height * y2 // 1000)),
+        )
+        crop = image.crop(box)
+        if max(crop.size) > max_size:
+            crop.thumbnail((max_size, max_size), Image.LANCZOS)
+        
+        caption = (
+            f"这是屏幕区域 ({x1}, {y1}) 到 ({x2}, {y2}) 的放大截图，仅用于查看细节，"
+            f"点击等操作仍使用整屏 0-1000 归一化坐标："
+        )
+        return self._encode(crop, region=(x1, y1, x2, y2), caption=caption)
+    
+    def _encode(self, image: Image.Image, **fields) -> Screenshot:
+        """编码图片（只编码一次），提交后台写盘，返回 Screenshot"""
+        with tracing.span("screen.encode", format=self.image_format, width=image.width, height=image.height) as span:
+            data = encode_image(
+                image,
+                image_format=self.image_format,
+                quality=self.quality,
+                compress_level=self.compress_level
             )
-            screenshot = screenshot.resize(new_size, Image.LANCZOS)
+            span.set(bytes=len(data))
         
-        # 保存截图到本地
-        SCREENSHOT_DIR.mkdir(parents=True, exist_ok=True)
-        filename = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.png"
-        screenshot.save(SCREENSHOT_DIR / filename, format="PNG")
+        # 归档到本地（复用同一份编码结果，相同画面只存一份）
+        if self.archive is not None:
+            self.archive.submit(
+                data,
+                IMAGE_FORMATS[self.image_format][1],
+                width=image.width,
+                height=image.height,
+                region=fields.get("region"),
+                settle_ms=fields.get("settle_ms")
+            )
         
-        # 转换为 PNG base64
-        buffer = BytesIO()
-        screenshot.save(buffer, format="PNG")
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return Screenshot(
+            base64=base64.b64encode(data).decode("utf-8"),
+            mime_type=self.mime_type,
+            width=image.width,
+            height=image.height,
+            **fields
+        )
+    
+    def capture(self, delay_ms: int = 0) -> str:
+        """
+        截取屏幕并返回 base64 编码，同时保存到本地
+        
+        Args:
+            delay_ms: 截图前等待的毫秒数，0 表示不等待
+            
+        Returns:
+            图片的 base64 编码字符串（格式由 image_format 决定）
+        """
+        return self.shot(delay_ms=delay_ms).base64
+
+
+class DisplaySession:
+    """
+    一个屏幕的操作会话：display、截屏后端、输入后端、截图状态与屏幕锁
+    
+    GUI 工具通过 Agent 传入的 DisplaySession 操作屏幕，同一进程中的多个 Agent
+    可以各自绑定不同的 X display（例如多个 Xvfb 虚拟屏幕）并行运行。
+    """
+    
+    def __init__(
+        self,
+        display: Optional[str] = None,
+        capture_backend: Optional[CaptureBackend] = None,
+        input_backend: Optional[InputBackend] = None,
+        screen: Optional[ScreenCapture] = None,
+        lock: Optional[threading.Lock] = None
+    ):
+        """
+        Args:
+            display: X display，例如 ":1"；None 表示当前进程的默认屏幕
+            capture_backend: 截屏后端，None 时指定了 display 则创建 xshm 后端，否则使用全局默认后端
+            input_backend: 输入后端，None 时指定了 display 则创建 xtest 后端，否则使用全局默认后端
+            screen: 截图实例（持有金字塔、局部截图参考帧等状态），None 时新建
+            lock: 屏幕锁，操作屏幕的工具在锁内串行执行，None 时新建
+        """
+        self.display = display
+        if display is not None:
+            if capture_backend is None:
+                capture_backend = create_capture_backend("xshm", display)
+            if input_backend is None:
+                input_backend = create_input_backend("xtest", display)
+        self._input_backend = input_backend
+        self.screen = screen if screen is not None else ScreenCapture(capture_backend=capture_backend)
+        self.lock = lock if lock is not None else threading.Lock()
+        # 进行中的 preserve_clipboard 块保存的剪贴板原内容（None 表示块内尚未使用剪贴板）
+        self.saved_clipboards: list[Optional[str]] = []
+    
+    @property
+    def input(self) -> InputBackend:
+        """输入后端（未指定时为全局默认后端）"""
+        if self._input_backend is None:
+            return get_input_backend()
+        return self._input_backend
+    
+    @property
+    def size(self) -> tuple[int, int]:
+        """屏幕尺寸 (宽, 高)，像素"""
+        return self.input.size()
+    
+    def to_screen(self, x: int, y: int) -> tuple[int, int]:
+        """将归一化坐标 (0-1000) 转换为实际屏幕像素坐标"""
+        screen_width, screen_height = self.size
+        actual_x = int(x / 1000 * screen_width)
+        actual_y = int(y / 1000 * screen_height)
+        return actual_x, actual_y
+    
+    def get_clipboard(self) -> str:
+        """读取剪贴板"""
+        if self.display is None:
+            import pyperclip
+            return pyperclip.paste()
+        result = subprocess.run(
+            ["xclip", "-selection", "clipboard", "-o"],
+            capture_output=True,
+            env={**os.environ, "DISPLAY": self.display}
+        )
+        return result.stdout.decode("utf-8", "replace")
+    
+    def set_clipboard(self, text: str) -> None:
+        """写入剪贴板"""
+        if self.display is None:
+            import pyperclip
+            pyperclip.copy(text)
+            return
+        subprocess.run(
+            ["xclip", "-selection", "clipboard", "-i"],
+            input=text.encode("utf-8"),
+            env={**os.environ, "DISPLAY": self.display},
+            check=True
+        )
+    
+    def close(self) -> None:
+        """释放截屏与输入后端（默认屏幕的全局后端不关闭）"""
+        if self.display is not None:
+            self.screen.capture_backend.close()
+            self._input_backend.close()
+
+
+# 全局截图实例，首次使用时创建（导入本模块不触碰屏幕）
+_screen_capture: Optional[ScreenCapture] = None
+_default_display: Optional[DisplaySession] = None
+_default_display_lock = threading.Lock()
+
+
+def get_screen_capture() -> ScreenCapture:
+    """全局截图实例"""
+    global _screen_capture
+    with _default_display_lock:
+        if _screen_capture is None:
+            _screen_capture = ScreenCapture()
+        return _screen_capture
+
+
+def get_default_display() -> DisplaySession:
+    """当前进程默认屏幕的会话（复用全局截图实例与屏幕锁），未指定 DisplaySession 的工具调用使用它"""
+    global _default_display
+    screen = get_screen_capture()
+    with _default_display_lock:
+        if _default_display is None:
+            _default_display = DisplaySession(screen=screen, lock=SCREEN_LOCK)
+        return _default_display
 
 
-# 全局截图实例
-screen_capture = ScreenCapture()
+def __getattr__(name: str):
+    # 兼容旧代码中的 base.screen_capture
+    if name == "screen_capture":
+        return get_screen_capture()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,72 +1,132 @@
 """键盘工具 - type_text"""
 
 import platform
-import time
-from typing import Optional
-
-import pyautogui
-import pyperclip
+from contextlib import contextmanager
+from typing import Iterator, Optional
 
 from ..agent.base import Tool, ToolResult
-from .base import screen_capture
+from ..config import DEFAULT_SCREENSHOT_DELAY_MS, TYPE_TEXT_DIRECT
+from .base import DisplaySession, get_default_display
 
 
-def _normalize_to_screen(x: int, y: int) -> tuple[int, int]:
-    """将归一化坐标 (0-1000) 转换为实际屏幕像素坐标"""
-    screen_width, screen_height = pyautogui.size()
-    actual_x = int(x / 1000 * screen_width)
-    actual_y = int(y / 1000 * screen_height)
-    return actual_x, actual_y
+@contextmanager
+def preserve_clipboard(display: Optional[DisplaySession] = None) -> Iterator[None]:
+    """
+    退出时恢复剪贴板原内容（仅当块内实际使用了剪贴板）
+    
+    粘贴是异步生效的，应在界面稳定（截图）之后再退出，避免恢复早于粘贴
+    """
+    display = display or get_default_display()
+    display.saved_clipboards.append(None)
+    try:
+        yield
+    finally:
+        original = display.saved_clipboards.pop()
+        if original is not None:
+            display.set_clipboard(original)
 
 
-def type_text(
+def _copy_to_clipboard(display: DisplaySession, text: str) -> None:
+    """写入剪贴板，首次写入前保存原内容以便 preserve_clipboard 恢复"""
+    if display.saved_clipboards and display.saved_clipboards[-1] is None:
+        display.saved_clipboards[-1] = display.get_clipboard()
+    display.set_clipboard(text)
+
+
+def perform_type_text(
     text: str,
     x: Optional[int] = None,
     y: Optional[int] = None,
-    press_enter: bool = False
-) -> ToolResult:
+    press_enter: bool = False,
+    display: Optional[DisplaySession] = None
+) -> str:
     """
-    输入文本（使用剪贴板方式，支持中文）
+    执行文本输入（不截图，需在 preserve_clipboard 内调用）
     
-    Args:
-        text: 要输入的文本
-        x: 可选，输入前先点击的 X 坐标 (0-1000)
-        y: 可选，输入前先点击的 Y 坐标 (0-1000)
-        press_enter: 可选，输入完成后是否按回车键
+    Returns:
+        操作说明
     """
+    display = display or get_default_display()
     result_parts = []
+    backend = display.input
     
     # 如果提供了坐标，先点击获取焦点
     if x is not None and y is not None:
-        actual_x, actual_y = _normalize_to_screen(x, y)
-        pyautogui.click(actual_x, actual_y)
-        time.sleep(0.2)
+        actual_x, actual_y = display.to_screen(x, y)
+        backend.click(actual_x, actual_y)
+        # 等待输入框获得焦点
+        display.screen.wait_for_settle(max_ms=200)
         result_parts.append(f"已点击坐标 ({x}, {y}) 获取焦点")
     
-    # 使用剪贴板输入文本
-    original = pyperclip.paste()
-    pyperclip.copy(text)
-    
-    # macOS: Command+V, 其他: Ctrl+V
-    if platform.system() == "Darwin":
-        pyautogui.hotkey("command", "v")
+    # 后端支持时直接逐键输入（按键事件按顺序到达，回车无需等待）；否则使用剪贴板（支持中文）
+    typed_directly = TYPE_TEXT_DIRECT and backend.can_type(text)
+    if typed_directly:
+        backend.type_text(text)
     else:
-        pyautogui.hotkey("ctrl", "v")
+        _copy_to_clipboard(display, text)
+        
+        # macOS: Command+V, 其他: Ctrl+V
+        if platform.system() == "Darwin":
+            backend.press("command", "v")
+        else:
+            backend.press("ctrl", "v")
+        
+        # 粘贴是异步生效的：等内容落到界面上，之后的剪贴板写入（下一次粘贴或恢复原内容）
+        # 与回车等按键才不会先于粘贴生效
+        display.screen.wait_for_settle(max_ms=300)
     
-    time.sleep(0.3)
-    pyperclip.copy(original)  # 恢复剪贴板
     result_parts.append(f"已输入文本: {text}")
     
     # 如果需要按回车
     if press_enter:
-        pyautogui.press("enter")
+        backend.press("enter")
         result_parts.append("已按回车键")
     
-    image_b64 = screen_capture.capture(delay_ms=500)
-    return ToolResult(
-        text="，".join(result_parts),
-        image_base64=image_b64
-    )
+    return "，".join(result_parts)
+
+
+def perform_key(keys: str, display: Optional[DisplaySession] = None) -> str:
+    """
+    按下按键或组合键（不截图）
+    
+    Args:
+        keys: 按键名，组合键用 + 连接，例如 "enter"、"tab"、"ctrl+a"
+        display: 操作的屏幕，None 使用默认屏幕
+        
+    Returns:
+        操作说明
+    """
+    names = [name.strip().lower() for name in keys.split("+") if name.strip()]
+    if not names:
+        raise ValueError("按键不能为空")
+    
+    (display or get_default_display()).input.press(*names)
+    return f"已按键 {keys}"
+
+
+def type_text(
+    text: str,
+    x: Optional[int] = None,
+    y: Optional[int] = None,
+    press_enter: bool = False,
+    display: Optional[DisplaySession] = None
+) -> ToolResult:
+    """
+    输入文本（ASCII 文本在后端支持时直接逐键输入，其他情况使用剪贴板方式，支持中文）
+    
+    Args:
+        text: 要输入的文本
+        x: 可选，输入前先点击的 X 坐标 (0-1000)
+        y: 可选，输入前先点击的 Y 坐标 (0-1000)
+        press_enter: 可选，输入完成后是否按回车键
+        display: 操作的屏幕，None 使用默认屏幕
+    """
+    display = display or get_default_display()
+    # 界面稳定后粘贴早已完成，截图之后再恢复剪贴板
+    with preserve_clipboard(display):
+        result_text = perform_type_text(text, x, y, press_enter, display=display)
+        shot = display.screen.shot(delay_ms=DEFAULT_SCREENSHOT_DELAY_MS, settle=True, delta=True)
+    return shot.to_tool_result(result_text)
 
 
 TYPE_TEXT_TOOL = Tool(
@@ -92,5 +152,6 @@ TYPE_TEXT_TOOL = Tool(
         },
         "required": ["text"]
     },
-    func=type_text
+    func=type_text,
+    accepts_display=True
 )
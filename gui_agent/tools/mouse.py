@@ -1,45 +1,61 @@
 """鼠标工具 - click"""
 
-import pyautogui
+from typing import Optional
 
 from ..agent.base import Tool, ToolResult
-from .base import screen_capture
+from ..config import DEFAULT_SCREENSHOT_DELAY_MS
+from .base import DisplaySession, get_default_display
 
 
-def _normalize_to_screen(x: int, y: int) -> tuple[int, int]:
-    """将归一化坐标 (0-1000) 转换为实际屏幕像素坐标"""
-    screen_width, screen_height = pyautogui.size()
-    actual_x = int(x / 1000 * screen_width)
-    actual_y = int(y / 1000 * screen_height)
-    return actual_x, actual_y
-
-
-def click(x: int, y: int, click_type: str = "left") -> ToolResult:
+def perform_click(
+    x: int,
+    y: int,
+    click_type: str = "left",
+    display: Optional[DisplaySession] = None
+) -> str:
     """
-    点击指定坐标
+    执行点击（不截图）
     
-    Args:
-        x: 归一化 X 坐标 (0-1000)
-        y: 归一化 Y 坐标 (0-1000)
-        click_type: 点击类型 - left(左键单击), right(右键单击), double(左键双击)
+    Returns:
+        操作说明
     """
-    actual_x, actual_y = _normalize_to_screen(x, y)
+    display = display or get_default_display()
+    actual_x, actual_y = display.to_screen(x, y)
+    
+    backend = display.input
     
     if click_type == "double":
-        pyautogui.doubleClick(actual_x, actual_y)
+        backend.click(actual_x, actual_y, count=2)
         action = "双击"
     elif click_type == "right":
-        pyautogui.rightClick(actual_x, actual_y)
+        backend.click(actual_x, actual_y, button="right")
         action = "右键点击"
     else:
-        pyautogui.click(actual_x, actual_y)
+        backend.click(actual_x, actual_y)
         action = "点击"
     
-    image_b64 = screen_capture.capture(delay_ms=500)
-    return ToolResult(
-        text=f"已{action}坐标 ({x}, {y})",
-        image_base64=image_b64
-    )
+    return f"已{action}坐标 ({x}, {y})"
+
+
+def click(
+    x: int,
+    y: int,
+    click_type: str = "left",
+    display: Optional[DisplaySession] = None
+) -> ToolResult:
+    """
+    点击指定坐标
+    
+    Args:
+        x: 归一化 X 坐标 (0-1000)
+        y: 归一化 Y 坐标 (0-1000)
+        click_type: 点击类型 - left(左键单击), right(右键单击), double(左键双击)
+        display: 操作的屏幕，None 使用默认屏幕
+    """
+    display = display or get_default_display()
+    text = perform_click(x, y, click_type, display=display)
+    shot = display.screen.shot(delay_ms=DEFAULT_SCREENSHOT_DELAY_MS, settle=True, delta=True)
+    return shot.to_tool_result(text)
 
 
 CLICK_TOOL = Tool(
@@ -70,5 +86,6 @@ CLICK_TOOL = Tool(
         },
         "required": ["x", "y"]
     },
-    func=click
+    func=click,
+    accepts_display=True
 )
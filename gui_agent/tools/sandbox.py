@@ -1,33 +1,472 @@
 """Python 代码执行沙箱工具"""
 
+import json
+import os
+import queue
+import signal
+import struct
 import subprocess
 import sys
 import tempfile
+import threading
+import time
 from pathlib import Path
+from typing import Optional
 
+from .. import tracing
 from ..agent.base import Tool, ToolResult
+from ._sandbox_worker import OUTPUT_DRAIN_TIMEOUT, BoundedOutput
+from ..config import (
+    SANDBOX_POOL_SIZE,
+    SANDBOX_MAX_RUNS_PER_WORKER,
+    SANDBOX_PRELOAD_MODULES,
+    SANDBOX_SESSION_MEMORY_LIMIT,
+    SANDBOX_SESSION_IDLE_TIMEOUT,
+    SANDBOX_MAX_OUTPUT_BYTES,
+)
+
+
+# 常驻 worker 脚本（独立运行，不导入 gui_agent 包）
+WORKER_SCRIPT = Path(__file__).with_name("_sandbox_worker.py")
+# 排队等待 worker 时，除执行超时外额外允许的启动时间（秒）
+WORKER_START_TIMEOUT = 10
+# 启动 worker 失败时的尝试次数，以及首次重试前的等待（秒，之后每次翻倍）
+WORKER_SPAWN_ATTEMPTS = 3
+WORKER_SPAWN_RETRY_DELAY = 0.5
+
+
+class SandboxUnavailable(RuntimeError):
+    """沙箱池中没有可用的 worker（启动失败或等待超时），调用方可改为启动新进程执行"""
 
 
-def execute_python(code: str, timeout: int = 30) -> ToolResult:
+def _kill_process_group(process: subprocess.Popen) -> None:
     """
-    执行 Python 代码并返回结果
+    杀死以 start_new_session 启动的进程及其整个进程组
     
-    原理：
-    1. 将代码写入临时 .py 文件
-    2. subprocess 启动新 Python 进程执行
-    3. 捕获 stdout/stderr 返回
-    4. 超时自动终止
+    用户代码启动的子进程（例如后台运行的 shell 命令）同属该进程组，一并终止，不再持有输出管道
+    """
+    if hasattr(os, "killpg"):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+    if process.poll() is None:
+        process.kill()
+    process.wait()
+
+
+class SandboxWorker:
+    """
+    一个常驻的沙箱 worker 进程
     
-    Args:
-        code: 要执行的 Python 代码
-        timeout: 超时时间（秒），默认 30 秒
+    代码通过 stdin 上的长度前缀 JSON 发送，结果由后台线程从 stdout 读取后放入队列，
+    以便按超时等待并在超时后直接杀死进程。
+    """
+    
+    def __init__(self, preload: list[str], memory_limit: Optional[int] = None):
+        """
+        Args:
+            preload: 启动时预加载的模块
+            memory_limit: 进程地址空间上限（字节），None 表示不限制
+        """
+        self.runs = 0
+        # 上一次执行后残留了线程或修改了 builtins，不应再用于无状态执行
+        self.tainted = False
+        options = {"preload": preload, "memory_limit": memory_limit}
+        self.process = subprocess.Popen(
+            [sys.executable, str(WORKER_SCRIPT), json.dumps(options)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        self._responses: queue.Queue = queue.Queue()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+    
+    def _read_loop(self) -> None:
+        """持续读取响应；进程退出时放入 None"""
+        stream = self.process.stdout
+        try:
+            while True:
+                header = stream.read(4)
+                if len(header) < 4:
+                    break
+                (length,) = struct.unpack(">I", header)
+                self._responses.put(json.loads(stream.read(length).decode("utf-8")))
+        except (OSError, ValueError):
+            pass
+        self._responses.put(None)
+    
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+    
+    def run(
+        self,
+        code: str,
+        timeout: float,
+        persist: bool = False,
+        max_output: Optional[int] = None
+    ) -> dict:
+        """
+        执行代码
         
-    Returns:
-        ToolResult 包含执行输出或错误信息
+        Args:
+            code: Python 代码
+            timeout: 超时时间（秒）
+            persist: 是否在 worker 的会话命名空间中执行（变量在调用之间保留）
+            max_output: stdout / stderr 各自保留的字节上限，None 表示不限制
+        
+        Returns:
+            {"stdout", "stderr", "returncode"}
+            
+        Raises:
+            subprocess.TimeoutExpired: 超时（进程已被杀死）
+            RuntimeError: worker 进程在接收代码前已退出
+        """
+        self.runs += 1
+        request = {"code": code, "persist": persist, "max_output": max_output}
+        data = json.dumps(request, ensure_ascii=False).encode("utf-8")
+        try:
+            self.process.stdin.write(struct.pack(">I", len(data)) + data)
+            self.process.stdin.flush()
+        except OSError as e:
+            raise RuntimeError("沙箱进程已退出") from e
+        
+        try:
+            response = self._responses.get(timeout=timeout)
+        except queue.Empty:
+            self.kill()
+            raise subprocess.TimeoutExpired(WORKER_SCRIPT.name, timeout)
+        
+        if response is None:
+            # 用户代码直接终止了进程（如 os._exit），输出已丢失，只返回退出码
+            return {"stdout": "", "stderr": "", "returncode": self.process.wait()}
+        self.tainted = response.pop("recycle", False)
+        return response
+    
+    def kill(self) -> None:
+        """终止进程及其启动的子进程"""
+        _kill_process_group(self.process)
+    
+    def close(self) -> None:
+        """关闭 stdin 让进程自行退出，超时则强制终止"""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+
+class SandboxPool:
     """
-    if not code or not code.strip():
-        return ToolResult(text="错误：代码不能为空")
+    预启动的沙箱 worker 池
+    
+    - 池中 worker 预先启动并预加载模块，执行代码时无需等待解释器启动
+    - 超时的 worker 被杀死，崩溃的 worker 被丢弃，执行满 max_runs 次、或执行后残留了线程、
+      修改了 builtins 的 worker 回收，均在后台补充新的 worker
+    - 所有 worker 都在忙时，调用方排队等待
+    - worker 启动失败时重试，仍失败则在下一次执行时再补充；没有可用 worker 时抛出 SandboxUnavailable
+    """
+    
+    def __init__(
+        self,
+        size: int = SANDBOX_POOL_SIZE,
+        max_runs: int = SANDBOX_MAX_RUNS_PER_WORKER,
+        preload: Optional[list[str]] = None
+    ):
+        """
+        Args:
+            size: worker 数量
+            max_runs: 每个 worker 执行多少次后回收
+            preload: worker 启动时预加载的模块
+        """
+        self.size = size
+        self.max_runs = max_runs
+        self.preload = list(SANDBOX_PRELOAD_MODULES if preload is None else preload)
+        self._idle: queue.Queue = queue.Queue()
+        self._closed = False
+        self._workers = 0  # 存活或正在启动的 worker 数
+        self._lock = threading.Lock()
+        for _ in range(size):
+            self._spawn_async()
+    
+    def _spawn_async(self) -> None:
+        """后台启动一个新的 worker 放入空闲队列，失败时重试，全部失败则放弃"""
+        with self._lock:
+            self._workers += 1
+        
+        def spawn():
+            delay = WORKER_SPAWN_RETRY_DELAY
+            for attempt in range(1, WORKER_SPAWN_ATTEMPTS + 1):
+                if self._closed:
+                    break
+                try:
+                    worker = SandboxWorker(self.preload)
+                except Exception as e:
+                    tracing.event(
+                        "sandbox.spawn_failed",
+                        attempt=attempt,
+                        attempts=WORKER_SPAWN_ATTEMPTS,
+                        error=f"{type(e).__name__}: {e}"
+                    )
+                    if attempt < WORKER_SPAWN_ATTEMPTS:
+                        time.sleep(delay)
+                        delay *= 2
+                    continue
+                if self._closed:
+                    worker.close()
+                    break
+                self._idle.put(worker)
+                return
+            with self._lock:
+                self._workers -= 1
+        
+        threading.Thread(target=spawn, daemon=True).start()
+    
+    def _replace(self, worker: SandboxWorker, kill: bool = False) -> None:
+        """回收 worker（kill 时强制终止），在后台补充新的"""
+        if kill:
+            worker.kill()
+        else:
+            worker.close()
+        with self._lock:
+            self._workers -= 1
+        self._spawn_async()
+    
+    def _acquire(self, timeout: float) -> SandboxWorker:
+        """等待空闲 worker；所有 worker 都已启动失败或等待超时时抛出 SandboxUnavailable"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._idle.get(timeout=min(0.1, max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                if self._workers == 0:
+                    raise SandboxUnavailable("沙箱进程启动失败")
+                if time.monotonic() >= deadline:
+                    raise SandboxUnavailable("没有可用的沙箱进程")
+    
+    def run(self, code: str, timeout: float, max_output: Optional[int] = None) -> dict:
+        """
+        取一个空闲 worker 执行代码（都在忙时排队等待）
+        
+        Args:
+            code: Python 代码
+            timeout: 超时时间（秒）
+            max_output: stdout / stderr 各自保留的字节上限，None 表示不限制
+        
+        Raises:
+            subprocess.TimeoutExpired: 执行超时
+            SandboxUnavailable: 没有可用 worker（启动失败或等待超时）
+            RuntimeError: 池已关闭或 worker 已退出
+        """
+        if self._closed:
+            raise RuntimeError("沙箱池已关闭")
+        
+        # 之前启动失败而放弃的 worker 在此重新补充；一个都没有时不等待，由调用方改用新进程执行
+        with self._lock:
+            missing = self.size - self._workers
+        for _ in range(missing):
+            self._spawn_async()
+        if missing == self.size:
+            raise SandboxUnavailable("沙箱进程启动失败，正在重新启动")
+        
+        # 排队等待空闲 worker（额外留出启动新 worker 的时间）
+        with tracing.span("sandbox.wait", idle=self._idle.qsize()):
+            worker = self._acquire(timeout + WORKER_START_TIMEOUT)
+        try:
+            result = worker.run(code, timeout, max_output=max_output)
+        except BaseException:
+            # 超时或进程已退出：丢弃该 worker，补充新的
+            self._replace(worker, kill=True)
+            raise
+        
+        # 执行次数达到上限、残留了会影响之后执行的状态、或进程已退出：回收并补充新的
+        if worker.runs >= self.max_runs or worker.tainted or not worker.alive:
+            self._replace(worker)
+        else:
+            self._idle.put(worker)
+        return result
+    
+    def close(self) -> None:
+        """关闭池中所有空闲 worker"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_default_pool: Optional[SandboxPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> Optional[SandboxPool]:
+    """获取全局沙箱池（首次调用时创建并预启动 worker），SANDBOX_POOL_SIZE 为 0 时返回 None"""
+    global _default_pool
+    if SANDBOX_POOL_SIZE <= 0:
+        return None
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SandboxPool()
+        return _default_pool
+
+
+class SandboxSession:
+    """
+    有状态的沙箱会话：独占一个 worker 进程，全局变量在多次执行之间保留
+    
+    - 进程在首次执行时启动，reset() 终止进程清空全部状态
+    - 空闲超过 idle_timeout 秒自动终止进程释放内存，下次执行时重新启动
+    - 进程地址空间受 memory_limit 限制，超出时用户代码收到 MemoryError
+    - 执行超时或进程退出都会丢失会话状态，下次执行的输出会附带提示
+    """
+    
+    def __init__(
+        self,
+        memory_limit: Optional[int] = SANDBOX_SESSION_MEMORY_LIMIT,
+        idle_timeout: Optional[float] = SANDBOX_SESSION_IDLE_TIMEOUT,
+        preload: Optional[list[str]] = None
+    ):
+        """
+        Args:
+            memory_limit: 进程地址空间上限（字节），None 表示不限制
+            idle_timeout: 空闲多少秒后终止进程，None 表示不限制
+            preload: 启动时预加载的模块
+        """
+        self.memory_limit = memory_limit
+        self.idle_timeout = idle_timeout
+        self.preload = list(SANDBOX_PRELOAD_MODULES if preload is None else preload)
+        self._worker: Optional[SandboxWorker] = None
+        self._lost_reason: Optional[str] = None  # 上次执行后会话状态丢失的原因
+        self._lock = threading.Lock()
+        self._idle_timer: Optional[threading.Timer] = None
+        self._last_used = 0.0
+    
+    def run(
+        self,
+        code: str,
+        timeout: float,
+        max_output: Optional[int] = None
+    ) -> tuple[dict, Optional[str]]:
+        """
+        在会话中执行代码
+        
+        Args:
+            code: Python 代码
+            timeout: 超时时间（秒）
+            max_output: stdout / stderr 各自保留的字节上限，None 表示不限制
+        
+        Returns:
+            (执行结果, 会话状态丢失的原因)，状态未丢失时原因为 None
+            
+        Raises:
+            subprocess.TimeoutExpired: 执行超时（进程已终止，会话状态丢失）
+        """
+        with self._lock:
+            self._cancel_idle_timer()
+            if self._worker is None:
+                self._worker = SandboxWorker(self.preload, self.memory_limit)
+            lost_reason, self._lost_reason = self._lost_reason, None
+            
+            try:
+                result = self._worker.run(code, timeout, persist=True, max_output=max_output)
+            except BaseException:
+                self._discard("上次执行超时或失败")
+                raise
+            
+            if not self._worker.alive:
+                self._discard(f"进程已退出（退出码: {self._worker.process.wait()}）")
+            else:
+                self._last_used = time.monotonic()
+                self._start_idle_timer()
+            return result, lost_reason
+    
+    def reset(self) -> None:
+        """清空会话状态（终止进程，下次执行时重新启动）"""
+        with self._lock:
+            self._cancel_idle_timer()
+            self._discard(None)
+    
+    def close(self) -> None:
+        """终止会话进程"""
+        self.reset()
+    
+    def _discard(self, reason: Optional[str]) -> None:
+        """终止进程并记录状态丢失原因（调用方持有锁）"""
+        if self._worker is not None:
+            self._worker.kill()
+            self._worker = None
+        self._lost_reason = reason
+    
+    def _expire(self) -> None:
+        """空闲超时回调"""
+        with self._lock:
+            # 计时器触发后、取得锁之前会话可能刚被使用过
+            idle = time.monotonic() - self._last_used
+            if self._worker is not None and idle >= self.idle_timeout:
+                self._discard(f"空闲超过 {self.idle_timeout} 秒")
     
+    def _start_idle_timer(self) -> None:
+        if self.idle_timeout is None:
+            return
+        self._idle_timer = threading.Timer(self.idle_timeout, self._expire)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+    
+    def _cancel_idle_timer(self) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+
+def _format_output(stdout: str, stderr: str, returncode: int) -> str:
+    """组合输出：stdout + stderr + 非零退出码"""
+    output = ""
+    if stdout:
+        output += stdout
+    if stderr:
+        if output:
+            output += "\n"
+        output += f"[stderr]\n{stderr}"
+    
+    if not output:
+        output = "(无输出)"
+    
+    # 添加返回码信息（非零表示异常）
+    if returncode != 0:
+        output += f"\n[退出码: {returncode}]"
+    
+    return output
+
+
+def _execute_in_pool(pool: SandboxPool, code: str, timeout: int, max_output_bytes: Optional[int]) -> ToolResult:
+    """在常驻 worker 中执行代码"""
+    try:
+        result = pool.run(code, timeout, max_output=max_output_bytes)
+    except SandboxUnavailable:
+        # 没有可用的常驻 worker：改为启动新进程执行
+        return _execute_in_subprocess(code, timeout, max_output_bytes)
+    except subprocess.TimeoutExpired:
+        return ToolResult(text=f"执行超时（{timeout}秒），已终止")
+    except Exception as e:
+        return ToolResult(text=f"执行失败：{type(e).__name__}: {e}")
+    
+    return ToolResult(text=_format_output(result["stdout"], result["stderr"], result["returncode"]))
+
+
+def _drain(stream, output: BoundedOutput, lock: threading.Lock) -> None:
+    """持续读取子进程输出管道写入有界缓冲区，直到管道关闭"""
+    with stream:
+        for chunk in iter(lambda: stream.read1(65536), b""):
+            with lock:
+                output.write_bytes(chunk)
+
+
+def _execute_in_subprocess(code: str, timeout: int, max_output_bytes: Optional[int]) -> ToolResult:
+    """将代码写入临时文件，启动新 Python 进程执行"""
     try:
         # 创建临时文件写入代码
         with tempfile.NamedTemporaryFile(
@@ -40,31 +479,36 @@ def execute_python(code: str, timeout: int = 30) -> ToolResult:
             temp_path = Path(f.name)
         
         try:
-            # 执行代码
-            result = subprocess.run(
+            # 执行代码，输出边读取边写入有界缓冲区
+            # 独立进程组：超时时连同用户代码启动的子进程一起终止
+            process = subprocess.Popen(
                 [sys.executable, str(temp_path)],
-                capture_output=True,
-                text=True,
-                timeout=timeout
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True
             )
+            stdout, stderr = BoundedOutput(max_output_bytes), BoundedOutput(max_output_bytes)
+            lock = threading.Lock()
+            readers = [
+                threading.Thread(target=_drain, args=(process.stdout, stdout, lock), daemon=True),
+                threading.Thread(target=_drain, args=(process.stderr, stderr, lock), daemon=True),
+            ]
+            for reader in readers:
+                reader.start()
             
-            # 组合输出
-            output = ""
-            if result.stdout:
-                output += result.stdout
-            if result.stderr:
-                if output:
-                    output += "\n"
-                output += f"[stderr]\n{result.stderr}"
+            try:
+                returncode = process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                _kill_process_group(process)
+                raise
+            finally:
+                # 进程结束后仍在运行的子进程可能继续持有管道，最多再等待 OUTPUT_DRAIN_TIMEOUT 秒
+                deadline = time.monotonic() + OUTPUT_DRAIN_TIMEOUT
+                for reader in readers:
+                    reader.join(max(0.0, deadline - time.monotonic()))
             
-            if not output:
-                output = "(无输出)"
-                
-            # 添加返回码信息（非零表示异常）
-            if result.returncode != 0:
-                output += f"\n[退出码: {result.returncode}]"
-                
-            return ToolResult(text=output)
+            with lock:
+                return ToolResult(text=_format_output(stdout.getvalue(), stderr.getvalue(), returncode))
             
         finally:
             # 清理临时文件
@@ -76,22 +520,155 @@ def execute_python(code: str, timeout: int = 30) -> ToolResult:
         return ToolResult(text=f"执行失败：{type(e).__name__}: {e}")
 
 
-PYTHON_TOOL = Tool(
-    name="execute_python",
-    description="执行 Python 代码并返回输出结果。用于数据处理、计算、分析等任务。代码在独立进程中执行，有 30 秒超时限制。",
-    parameters={
-        "type": "object",
-        "properties": {
-            "code": {
-                "type": "string",
-                "description": "要执行的 Python 代码"
+def execute_python(
+    code: str,
+    timeout: int = 30,
+    max_output_bytes: Optional[int] = SANDBOX_MAX_OUTPUT_BYTES
+) -> ToolResult:
+    """
+    执行 Python 代码并返回结果
+    
+    原理：
+    1. 启用沙箱池时，将代码发送给预启动的常驻 worker 进程执行（全新命名空间）
+    2. 否则将代码写入临时 .py 文件，subprocess 启动新 Python 进程执行
+    3. 捕获 stdout/stderr 返回（各自只保留开头和结尾 max_output_bytes 字节，中间以标记省略）
+    4. 超时自动终止
+    
+    Args:
+        code: 要执行的 Python 代码
+        timeout: 超时时间（秒），默认 30 秒
+        max_output_bytes: stdout / stderr 各自保留的字节上限，None 表示不限制
+        
+    Returns:
+        ToolResult 包含执行输出或错误信息
+    """
+    if not code or not code.strip():
+        return ToolResult(text="错误：代码不能为空")
+    
+    pool = get_sandbox_pool()
+    if pool is not None:
+        return _execute_in_pool(pool, code, timeout, max_output_bytes)
+    return _execute_in_subprocess(code, timeout, max_output_bytes)
+
+
+def execute_python_in_session(
+    session: SandboxSession,
+    code: str,
+    timeout: int = 30,
+    reset: bool = False,
+    max_output_bytes: Optional[int] = SANDBOX_MAX_OUTPUT_BYTES
+) -> ToolResult:
+    """
+    在有状态会话中执行 Python 代码，变量在多次调用之间保留
+    
+    Args:
+        session: 沙箱会话
+        code: 要执行的 Python 代码
+        timeout: 超时时间（秒），默认 30 秒
+        reset: 执行前是否清空会话中的全部变量
+        max_output_bytes: stdout / stderr 各自保留的字节上限，None 表示不限制
+        
+    Returns:
+        ToolResult 包含执行输出或错误信息
+    """
+    if reset:
+        session.reset()
+    if not code or not code.strip():
+        return ToolResult(text="会话已重置" if reset else "错误：代码不能为空")
+    
+    try:
+        result, lost_reason = session.run(code, timeout, max_output=max_output_bytes)
+    except subprocess.TimeoutExpired:
+        return ToolResult(text=f"执行超时（{timeout}秒），已终止，会话变量已丢失")
+    except Exception as e:
+        return ToolResult(text=f"执行失败：{type(e).__name__}: {e}")
+    
+    output = _format_output(result["stdout"], result["stderr"], result["returncode"])
+    if lost_reason:
+        output = f"[会话已重置：{lost_reason}，之前定义的变量已丢失]\n{output}"
+    return ToolResult(text=output)
+
+
+def create_python_tool(max_output_bytes: Optional[int] = SANDBOX_MAX_OUTPUT_BYTES) -> Tool:
+    """
+    创建无状态的 execute_python 工具
+    
+    Args:
+        max_output_bytes: stdout / stderr 各自保留的字节上限，None 表示不限制
+    """
+    def execute(code: str, timeout: int = 30) -> ToolResult:
+        return execute_python(code, timeout, max_output_bytes)
+    
+    return Tool(
+        name="execute_python",
+        description="执行 Python 代码并返回输出结果。用于数据处理、计算、分析等任务。代码在独立进程中执行，有 30 秒超时限制。",
+        parameters={
+            "type": "object",
+            "properties": {
+                "code": {
+                    "type": "string",
+                    "description": "要执行的 Python 代码"
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": "超时时间（秒），默认 30 秒，最大 120 秒"
+                }
             },
-            "timeout": {
-                "type": "integer",
-                "description": "超时时间（秒），默认 30 秒，最大 120 秒"
-            }
+            "required": ["code"]
         },
-        "required": ["code"]
-    },
-    func=execute_python
-)
+        func=execute,
+        uses_screen=False
+    )
+
+
+PYTHON_TOOL = create_python_tool()
+
+
+def create_session_tool(
+    session: Optional[SandboxSession] = None,
+    max_output_bytes: Optional[int] = SANDBOX_MAX_OUTPUT_BYTES
+) -> Tool:
+    """
+    创建绑定到有状态会话的 execute_python 工具
+    
+    每个 Agent 应使用独立的会话工具；Agent.reset() 会清空会话，Agent.close() 会终止会话进程。
+    
+    Args:
+        session: 沙箱会话，None 时按默认配置创建
+        max_output_bytes: stdout / stderr 各自保留的字节上限，None 表示不限制
+    """
+    session = session if session is not None else SandboxSession()
+    
+    def execute(code: str, timeout: int = 30, reset: bool = False) -> ToolResult:
+        return execute_python_in_session(session, code, timeout, reset, max_output_bytes)
+    
+    return Tool(
+        name="execute_python",
+        description=(
+            "在持久的 Python 会话中执行代码并返回输出结果。用于数据处理、计算、分析等任务。"
+            "之前执行中定义的变量、导入的模块在后续调用中仍然可用，无需重复加载数据。"
+            "每次执行有 30 秒超时限制，超时会丢失会话变量。"
+        ),
+        parameters={
+            "type": "object",
+            "properties": {
+                "code": {
+                    "type": "string",
+                    "description": "要执行的 Python 代码"
+                },
+                "timeout": {
+                    "type": "integer",
+                    "description": "超时时间（秒），默认 30 秒，最大 120 秒"
+                },
+                "reset": {
+                    "type": "boolean",
+                    "description": "执行前清空会话中的全部变量，默认 false"
+                }
+            },
+            "required": ["code"]
+        },
+        func=execute,
+        uses_screen=False,
+        reset=session.reset,
+        close=session.close
+    )
@@ -1,16 +1,15 @@
 """截图工具"""
 
+from typing import Optional
+
 from ..agent.base import Tool, ToolResult
-from .base import screen_capture
+from .base import DisplaySession, get_default_display
 
 
-def screenshot() -> ToolResult:
+def screenshot(display: Optional[DisplaySession] = None) -> ToolResult:
     """截取当前屏幕"""
-    image_b64 = screen_capture.capture(delay_ms=0)
-    return ToolResult(
-        text="已截取当前屏幕截图。",
-        image_base64=image_b64
-    )
+    display = display or get_default_display()
+    return display.screen.shot(delay_ms=0).to_tool_result("已截取当前屏幕截图。")
 
 
 SCREENSHOT_TOOL = Tool(
@@ -21,5 +20,6 @@ SCREENSHOT_TOOL = Tool(
         "properties": {},
         "required": []
     },
-    func=screenshot
+    func=screenshot,
+    accepts_display=True
 )
@@ -1,20 +1,46 @@
 """滚动工具 - scroll"""
 
-import pyautogui
+from typing import Optional
 
 from ..agent.base import Tool, ToolResult
-from .base import screen_capture
+from ..config import DEFAULT_SCREENSHOT_DELAY_MS
+from .base import DisplaySession, get_default_display
 
 
-def _normalize_to_screen(x: int, y: int) -> tuple[int, int]:
-    """将归一化坐标 (0-1000) 转换为实际屏幕像素坐标"""
-    screen_width, screen_height = pyautogui.size()
-    actual_x = int(x / 1000 * screen_width)
-    actual_y = int(y / 1000 * screen_height)
-    return actual_x, actual_y
+def perform_scroll(
+    x: int,
+    y: int,
+    direction: str,
+    amount: int = 3,
+    display: Optional[DisplaySession] = None
+) -> str:
+    """
+    执行滚动（不截图）
+    
+    Returns:
+        操作说明
+    """
+    display = display or get_default_display()
+    # 先移动鼠标到指定位置
+    actual_x, actual_y = display.to_screen(x, y)
+    backend = display.input
+    with backend.batch():
+        backend.move(actual_x, actual_y)
+        
+        # 滚动
+        scroll_amount = amount if direction == "up" else -amount
+        backend.scroll(scroll_amount)
+    
+    return f"已在坐标 ({x}, {y}) 向 {direction} 滚动 {amount} 单位"
 
 
-def scroll(x: int, y: int, direction: str, amount: int = 3) -> ToolResult:
+def scroll(
+    x: int,
+    y: int,
+    direction: str,
+    amount: int = 3,
+    display: Optional[DisplaySession] = None
+) -> ToolResult:
     """
     在指定位置滚动屏幕
     
@@ -23,20 +49,12 @@ def scroll(x: int, y: int, direction: str, amount: int = 3) -> ToolResult:
         y: 归一化 Y 坐标 (0-1000)
         direction: 方向 "up" 或 "down"
         amount: 滚动量
+        display: 操作的屏幕，None 使用默认屏幕
     """
-    # 先移动鼠标到指定位置
-    actual_x, actual_y = _normalize_to_screen(x, y)
-    pyautogui.moveTo(actual_x, actual_y)
-    
-    # 滚动
-    scroll_amount = amount if direction == "up" else -amount
-    pyautogui.scroll(scroll_amount)
-    
-    image_b64 = screen_capture.capture(delay_ms=500)
-    return ToolResult(
-        text=f"已在坐标 ({x}, {y}) 向 {direction} 滚动 {amount} 单位",
-        image_base64=image_b64
-    )
+    display = display or get_default_display()
+    text = perform_scroll(x, y, direction, amount, display=display)
+    shot = display.screen.shot(delay_ms=DEFAULT_SCREENSHOT_DELAY_MS, settle=True, delta=True)
+    return shot.to_tool_result(text)
 
 
 SCROLL_TOOL = Tool(
@@ -76,5 +94,6 @@ SCROLL_TOOL = Tool(
         },
         "required": ["x", "y", "direction"]
     },
-    func=scroll
+    func=scroll,
+    accepts_display=True
 )
@@ -0,0 +1,57 @@
+"""放大工具 - zoom"""
+
+from typing import Optional
+
+from ..agent.base import Tool, ToolResult
+from .base import DisplaySession, get_default_display
+
+
+def zoom(
+    x1: int,
+    y1: int,
+    x2: int,
+    y2: int,
+    display: Optional[DisplaySession] = None
+) -> ToolResult:
+    """
+    放大查看屏幕局部区域
+    
+    Args:
+        x1: 区域左上角归一化 X 坐标 (0-1000)
+        y1: 区域左上角归一化 Y 坐标 (0-1000)
+        x2: 区域右下角归一化 X 坐标 (0-1000)
+        y2: 区域右下角归一化 Y 坐标 (0-1000)
+        display: 操作的屏幕，None 使用默认屏幕
+    """
+    display = display or get_default_display()
+    try:
+        shot = display.screen.zoom(x1, y1, x2, y2)
+    except ValueError as e:
+        return ToolResult(text=f"错误：{e}")
+    
+    return shot.to_tool_result(f"已放大区域 ({x1}, {y1}) 到 ({x2}, {y2})")
+
+
+ZOOM_TOOL = Tool(
+    name="zoom",
+    description="""放大查看最近一张截图中的局部区域，返回该区域的高清图片。
+
+适用场景：
+- 截图中文字太小、看不清
+- 需要精确定位小按钮、图标、输入框后再点击
+
+坐标系统：使用 0-1000 归一化坐标，(x1, y1) 为区域左上角，(x2, y2) 为区域右下角。
+注意：放大图只用于查看细节，click/type_text/scroll 仍然使用整屏 0-1000 坐标。""",
+    parameters={
+        "type": "object",
+        "properties": {
+            "x1": {"type": "integer", "description": "区域左上角 X 坐标 (0-1000)"},
+            "y1": {"type": "integer", "description": "区域左上角 Y 坐标 (0-1000)"},
+            "x2": {"type": "integer", "description": "区域右下角 X 坐标 (0-1000)"},
+            "y2": {"type": "integer", "description": "区域右下角 Y 坐标 (0-1000)"}
+        },
+        "required": ["x1", "y1", "x2", "y2"]
+    },
+    func=zoom,
+    accepts_display=True
+)
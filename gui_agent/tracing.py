@@ -0,0 +1,291 @@
+"""
+追踪 - 以 span 记录 Agent 每次迭代、LLM 调用、工具调用、截屏与编码的耗时与属性
+
+span 通过 contextvars 自动形成父子关系（同一线程 / 同一 asyncio 任务内嵌套即为子 span，
+提交到线程池的调用需用 contextvars.copy_context() 传递上下文），结束时交给已注册的导出器：
+    
+    JsonlExporter    每个 span 一行 JSON，追加写入文件，可用于离线分析耗时分布
+    ConsoleExporter  可读的执行日志（替代原先的 print 输出），开始时与结束时各输出一次
+
+没有 span 持续时间的日志以事件（duration_ms 为 0 的 span）记录。
+
+用法:
+    from gui_agent import tracing
+    tracing.tracer.add_exporter(tracing.JsonlExporter("trace.jsonl"))
+    with tracing.span("my.step", size=3) as span:
+        ...
+        span.set(result="ok")
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator, Optional, TextIO
+
+from .config import TRACE_CONSOLE, TRACE_CONSOLE_MAX_CHARS, TRACE_FILE, TRACE_FILE_MAX_CHARS
+
+
+def _new_id() -> str:
+    return os.urandom(8).hex()
+
+
+@dataclass
+class Span:
+    """一段计时的操作"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time: float = 0.0  # Unix 时间戳（秒）
+    duration_ms: float = 0.0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None  # 以异常结束时为 "类型: 信息"
+    _start: float = field(default=0.0, repr=False)  # perf_counter 起点
+    
+    def set(self, **attributes) -> "Span":
+        """添加或更新属性"""
+        self.attributes.update(attributes)
+        return self
+    
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        del data["_start"]
+        return data
+
+
+class SpanExporter:
+    """导出器基类：on_start 在 span 开始时调用，export 在结束时调用（可能来自多个线程）"""
+    
+    def on_start(self, span: Span) -> None:
+        pass
+    
+    def export(self, span: Span) -> None:
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        pass
+
+
+def _truncate(value: Any, max_chars: int) -> Any:
+    """截断过长的字符串（含嵌套在字典、列表中的，例如工具参数中的代码），附上原文长度与 SHA-256 以便比对"""
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        digest = hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
+        return f"{value[:max_chars]}...（共 {len(value)} 字符，sha256:{digest}）"
+    if isinstance(value, dict):
+        return {key: _truncate(item, max_chars) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_truncate(item, max_chars) for item in value]
+    return value
+
+
+class JsonlExporter(SpanExporter):
+    """将结束的 span 逐行追加写入 JSONL 文件"""
+    
+    def __init__(self, path: os.PathLike, max_chars: Optional[int] = TRACE_FILE_MAX_CHARS):
+        """
+        Args:
+            path: 输出文件（追加写入）
+            max_chars: 文本属性的最大长度，超出部分截断；None 表示完整写入
+        """
+        self.path = path
+        self.max_chars = max_chars
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+    
+    def export(self, span: Span) -> None:
+        data = span.to_dict()
+        if self.max_chars is not None:
+            data["attributes"] = _truncate(data["attributes"], self.max_chars)
+        line = json.dumps(data, ensure_ascii=False, default=str)
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+                self._file.flush()
+    
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def _shorten(text: Any, max_chars: int) -> str:
+    text = str(text)
+    return text if len(text) <= max_chars else text[:max_chars] + "..."
+
+
+class ConsoleExporter(SpanExporter):
+    """可读的执行日志输出"""
+    
+    def __init__(self, stream: Optional[TextIO] = None, max_chars: int = TRACE_CONSOLE_MAX_CHARS):
+        """
+        Args:
+            stream: 输出流，None 表示输出时的 sys.stdout
+            max_chars: 工具结果、回复等文本的最大显示长度
+        """
+        self.stream = stream
+        self.max_chars = max_chars
+    
+    def _write(self, text: str) -> None:
+        print(text, file=self.stream if self.stream is not None else sys.stdout)
+    
+    def on_start(self, span: Span) -> None:
+        attributes = span.attributes
+        if span.name == "agent.iteration":
+            self._write(f"\n--- 迭代 {attributes['iteration']}/{attributes['max_iterations']} ---")
+        elif span.name == "tool.call":
+            self._write(f"[Tool Call] {attributes['tool']}({attributes['arguments']})")
+        elif span.name == "agent.replay":
+            self._write(f"\n[Replay] 回放已录制的轨迹（{attributes['steps']} 步）")
+    
+    def export(self, span: Span) -> None:
+        attributes = span.attributes
+        name = span.name
+        if name == "agent.register_tool":
+            self._write(f"[Agent] 注册工具: {attributes['tool']}")
+        elif name == "agent.reset":
+            self._write("[Agent] 对话历史已重置")
+        elif name == "agent.user_input":
+            self._write(f"\n[User] {_shorten(attributes['text'], self.max_chars)}")
+            if attributes.get("image_length"):
+                self._write(f"[User] (附带图片，长度: {attributes['image_length']})")
+        elif name == "agent.reply":
+            self._write(f"\n[Assistant] {attributes['text']}")
+        elif name == "tool.result":
+            self._write(f"[Tool Result] {_shorten(attributes['text'], self.max_chars)}")
+            if attributes.get("duplicate"):
+                self._write("[Tool Result] (屏幕无变化，跳过截图)")
+            elif attributes.get("image_length"):
+                self._write(f"[User] (上传截图，长度: {attributes['image_length']})")
+        elif name == "llm.call":
+            if attributes.get("cached"):
+                self._write("[LLM] 命中响应缓存")
+            else:
+                self._write(
+                    f"[LLM] {span.duration_ms:.0f}ms，请求 {attributes.get('payload_bytes', 0) / 1024:.1f}KB，"
+                    f"prompt {attributes.get('prompt_tokens', 0)} / completion {attributes.get('completion_tokens', 0)} tokens"
+                )
+        elif name == "replay.diverged":
+            if attributes.get("step") is None:
+                self._write("[Replay] 回放结束时画面与录制时不一致，交由模型继续")
+            else:
+                self._write(f"[Replay] 第 {attributes['step']} 步执行前画面与录制时不一致，交由模型继续")
+        elif name == "sandbox.spawn_failed":
+            self._write(
+                f"[Sandbox] 启动 worker 失败（第 {attributes['attempt']}/{attributes['attempts']} 次）: {attributes['error']}"
+            )
+        elif name == "archive.dropped":
+            self._write(f"[Archive] 写盘跟不上（{attributes.get('pending')} 张待写），丢弃一张截图")
+        # 工具异常已体现在 tool.result 的文本中
+        if span.error is not None and name.startswith(("agent.", "llm.", "archive.")):
+            self._write(f"[Error] {name}: {span.error}")
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("gui_agent_span", default=None)
+
+
+class Tracer:
+    """创建 span 并分发给导出器，线程安全"""
+    
+    def __init__(self, exporters: Optional[list[SpanExporter]] = None):
+        self._exporters: list[SpanExporter] = list(exporters or [])
+        self._lock = threading.Lock()
+    
+    @property
+    def exporters(self) -> list[SpanExporter]:
+        return list(self._exporters)
+    
+    def add_exporter(self, exporter: SpanExporter) -> None:
+        with self._lock:
+            self._exporters = self._exporters + [exporter]
+    
+    def remove_exporter(self, exporter: SpanExporter) -> None:
+        with self._lock:
+            self._exporters = [item for item in self._exporters if item is not exporter]
+    
+    def set_exporters(self, exporters: list[SpanExporter]) -> None:
+        """替换全部导出器（不关闭被替换的导出器）"""
+        with self._lock:
+            self._exporters = list(exporters)
+    
+    def _new_span(self, name: str, attributes: dict) -> Span:
+        parent = _current_span.get()
+        return Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else _new_id(),
+            span_id=_new_id(),
+            parent_id=parent.span_id if parent is not None else None,
+            start_time=time.time(),
+            attributes=attributes,
+            _start=time.perf_counter()
+        )
+    
+    def _export(self, span: Span) -> None:
+        for exporter in self._exporters:
+            try:
+                exporter.export(span)
+            except Exception:
+                pass
+    
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        记录一段操作，块内创建的 span 为其子 span
+        
+        Args:
+            name: span 名称，例如 "llm.call"
+            **attributes: 初始属性，块内可通过 span.set() 追加
+        """
+        span = self._new_span(name, attributes)
+        for exporter in self._exporters:
+            try:
+                exporter.on_start(span)
+            except Exception:
+                pass
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.duration_ms = (time.perf_counter() - span._start) * 1000
+            self._export(span)
+    
+    def event(self, name: str, **attributes) -> None:
+        """记录一个瞬时事件（duration_ms 为 0 的 span）"""
+        self._export(self._new_span(name, attributes))
+    
+    def close(self) -> None:
+        """关闭并移除全部导出器"""
+        with self._lock:
+            exporters, self._exporters = self._exporters, []
+        for exporter in exporters:
+            exporter.close()
+
+
+def current_span() -> Optional[Span]:
+    """当前上下文中正在进行的 span"""
+    return _current_span.get()
+
+
+def _default_exporters() -> list[SpanExporter]:
+    exporters: list[SpanExporter] = []
+    if TRACE_CONSOLE:
+        exporters.append(ConsoleExporter())
+    if TRACE_FILE:
+        exporters.append(JsonlExporter(TRACE_FILE))
+    return exporters
+
+
+# 全局 tracer：Agent、工具与截图模块都通过它记录 span
+tracer = Tracer(_default_exporters())
+span = tracer.span
+event = tracer.event
@@ -0,0 +1,65 @@
+"""测试用的内存屏幕与输入后端（不需要显示器）"""
+
+import numpy as np
+
+from gui_agent.backends import CaptureBackend, Frame, InputBackend
+
+
+class FakeCapture(CaptureBackend):
+    """内存中的屏幕，每次 touch 改变一小块区域"""
+    
+    name = "fake"
+    
+    def __init__(self, width: int = 320, height: int = 240):
+        self.pixels = np.full((height, width, 3), 200, dtype=np.uint8)
+        self.touches = 0
+    
+    def size(self) -> tuple[int, int]:
+        return self.pixels.shape[1], self.pixels.shape[0]
+    
+    def grab(self) -> Frame:
+        return Frame(self.pixels.copy())
+    
+    def touch(self) -> None:
+        x = 20 + (self.touches * 40) % 260
+        self.pixels[100:116, x:x + 16] = (self.touches * 50) % 256
+        self.touches += 1
+
+
+class FakeInput(InputBackend):
+    """记录注入的事件；ASCII 文本可逐键输入"""
+    
+    name = "fake"
+    
+    def __init__(self, width: int = 320, height: int = 240, on_event=None):
+        self.width, self.height = width, height
+        self.events: list[tuple] = []
+        self.on_event = on_event
+    
+    def _record(self, *event) -> None:
+        self.events.append(event)
+        if self.on_event is not None:
+            self.on_event(event)
+    
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+    
+    def move(self, x: int, y: int) -> None:
+        self._record("move", x, y)
+    
+    def click(self, x: int, y: int, button: str = "left", count: int = 1) -> None:
+        self._record("click", x, y, button, count)
+    
+    def scroll(self, amount: int) -> None:
+        self._record("scroll", amount)
+    
+    def press(self, *keys: str) -> None:
+        if "nosuchkey" in keys:
+            raise ValueError("未知按键: nosuchkey")
+        self._record("press", *keys)
+    
+    def can_type(self, text: str) -> bool:
+        return text.isascii()
+    
+    def type_text(self, text: str) -> None:
+        self._record("type", text)
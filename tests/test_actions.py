@@ -0,0 +1,144 @@
+"""批量操作工具：按顺序执行、失败即停、只截一张图、剪贴板在截图后恢复"""
+
+import pytest
+
+from gui_agent.tools.actions import actions
+from gui_agent.tools.base import DisplaySession, ScreenCapture
+
+from tests.fakes import FakeCapture, FakeInput
+
+
+class FakeDisplay(DisplaySession):
+    """剪贴板保存在内存中"""
+    
+    def __init__(self):
+        self.capture = FakeCapture()
+        self.input_backend = FakeInput(on_event=self._on_event)
+        self.clipboard = "original"
+        self.clipboard_writes: list[str] = []
+        # 输入事件、剪贴板写入与等待界面稳定按发生顺序记录
+        self.timeline: list[tuple] = []
+        self.shots = 0
+        screen = ScreenCapture(capture_backend=self.capture, save_dir=None, settle=True, delta=False)
+        super().__init__(capture_backend=self.capture, input_backend=self.input_backend, screen=screen)
+        shot = screen.shot
+        wait_for_settle = screen.wait_for_settle
+        
+        def counted_shot(*args, **kwargs):
+            self.shots += 1
+            return shot(*args, **kwargs)
+        
+        def recorded_wait_for_settle(*args, **kwargs):
+            self.timeline.append(("settle",))
+            return wait_for_settle(*args, **kwargs)
+        
+        screen.shot = counted_shot
+        screen.wait_for_settle = recorded_wait_for_settle
+    
+    def _on_event(self, event: tuple) -> None:
+        self.timeline.append(event)
+        self.capture.touch()
+    
+    def get_clipboard(self) -> str:
+        return self.clipboard
+    
+    def set_clipboard(self, text: str) -> None:
+        self.timeline.append(("clipboard", text))
+        self.clipboard_writes.append(text)
+        self.clipboard = text
+
+
+@pytest.fixture
+def display():
+    return FakeDisplay()
+
+
+def test_steps_run_in_order_behind_one_screenshot(display):
+    result = actions([
+        {"action": "click", "x": 500, "y": 500},
+        {"action": "type", "text": "hello", "press_enter": True},
+        {"action": "scroll", "x": 0, "y": 1000, "direction": "down", "amount": 2},
+        {"action": "key", "keys": "Ctrl+A", "settle": True},
+    ], display=display)
+    
+    assert display.input_backend.events == [
+        ("click", 160, 120, "left", 1),
+        ("type", "hello"),
+        ("press", "enter"),
+        ("move", 0, 240),
+        ("scroll", -2),
+        ("press", "ctrl", "a"),
+    ]
+    assert display.shots == 1
+    assert result.image_base64
+    assert result.text.splitlines()[:4] == [
+        "1. 已点击坐标 (500, 500)",
+        "2. 已输入文本: hello，已按回车键",
+        "3. 已在坐标 (0, 1000) 向 down 滚动 2 单位",
+        "4. 已按键 Ctrl+A",
+    ]
+
+
+def test_failed_step_stops_the_batch(display):
+    result = actions([
+        {"action": "click", "x": 0, "y": 0},
+        {"action": "key", "keys": "nosuchkey"},
+        {"action": "click", "x": 1000, "y": 1000},
+        {"action": "drag"},
+    ], display=display)
+    
+    assert display.input_backend.events == [("click", 0, 0, "left", 1)]
+    assert "2. 失败（ValueError: 未知按键: nosuchkey），剩余 2 步未执行" in result.text
+    assert display.shots == 1
+    assert result.image_base64
+
+
+def test_unknown_action_is_reported(display):
+    result = actions([{"action": "drag", "x": 1, "y": 2}], display=display)
+    assert "1. 失败（ValueError: 未知操作类型: drag）" in result.text
+    assert "剩余" not in result.text
+
+
+def test_empty_batch_is_rejected(display):
+    result = actions([], display=display)
+    assert result.text.startswith("错误")
+    assert display.shots == 0
+
+
+def test_clipboard_is_restored_after_the_screenshot(display):
+    restored_before_shot = []
+    shot = display.screen.shot
+    
+    def checking_shot(*args, **kwargs):
+        restored_before_shot.append(display.clipboard == "original")
+        return shot(*args, **kwargs)
+    
+    display.screen.shot = checking_shot
+    actions([
+        {"action": "type", "text": "你好"},
+        {"action": "type", "text": "世界", "press_enter": True},
+    ], display=display)
+    
+    assert restored_before_shot == [False]
+    # 原内容只保存一次，截图之后恢复
+    assert display.clipboard_writes == ["你好", "世界", "original"]
+    assert display.clipboard == "original"
+
+
+def test_each_paste_settles_before_the_clipboard_is_written_again(display):
+    actions([
+        {"action": "type", "text": "你好"},
+        {"action": "key", "keys": "tab"},
+        {"action": "type", "text": "世界"},
+        {"action": "type", "text": "！"},
+    ], display=display)
+    
+    # shot 本身也会等待界面稳定，因此最后一次粘贴之后有两次等待
+    assert display.timeline == [
+        ("clipboard", "你好"), ("press", "ctrl", "v"), ("settle",),
+        ("press", "tab"),
+        ("clipboard", "世界"), ("press", "ctrl", "v"), ("settle",),
+        ("clipboard", "！"), ("press", "ctrl", "v"), ("settle",),
+        ("settle",),
+        ("clipboard", "original"),
+    ]
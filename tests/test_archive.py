@@ -0,0 +1,145 @@
+"""截图归档：内容去重、按运行采样、按大小与保存时长淘汰（含旧版本文件）、丢弃与写盘失败可观测"""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from gui_agent import tracing
+from gui_agent.archive import ScreenshotArchive, archive_run
+from gui_agent.metrics import MetricsExporter, MetricsRegistry
+
+
+@pytest.fixture
+def exporter():
+    exporter = MetricsExporter(MetricsRegistry())
+    tracing.tracer.add_exporter(exporter)
+    yield exporter
+    tracing.tracer.remove_exporter(exporter)
+
+
+def object_files(archive: ScreenshotArchive) -> list[str]:
+    return sorted(path.name for path in archive.objects_dir.glob("*/*"))
+
+
+def manifest(archive: ScreenshotArchive, run_id: str) -> list[dict]:
+    lines = archive.manifest_path(run_id).read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_identical_screenshots_are_stored_once(tmp_path, exporter):
+    archive = ScreenshotArchive(tmp_path)
+    with archive_run(run_id="run") as run:
+        for data in (b"a" * 100, b"b" * 100, b"a" * 100):
+            assert archive.submit(data, "png", width=10, height=10)
+    archive.flush()
+    
+    assert (archive.saved, archive.deduplicated) == (2, 1)
+    assert len(object_files(archive)) == 2 and archive.size_bytes == 200
+    records = manifest(archive, run.run_id)
+    assert [record["object"] for record in records][0] == records[2]["object"]
+    assert all((tmp_path / record["object"]).exists() and record["width"] == 10 for record in records)
+    assert exporter.archive_writes.value(deduplicated="true") == 1
+    assert exporter.archive_bytes.value() == 200
+
+
+def test_runs_sample_and_disable_archiving(tmp_path):
+    archive = ScreenshotArchive(tmp_path)
+    with archive_run(run_id="sampled", sample_rate=0.25):
+        submitted = [archive.submit(bytes([index]) * 10, "png") for index in range(8)]
+    with archive_run(run_id="disabled", enabled=False):
+        assert not archive.submit(b"x" * 10, "png")
+    archive.flush()
+    
+    assert submitted == [True, False, False, False, True, False, False, False]
+    assert len(manifest(archive, "sampled")) == 2
+    assert not archive.manifest_path("disabled").exists()
+
+
+def test_least_recently_referenced_objects_are_evicted(tmp_path):
+    archive = ScreenshotArchive(tmp_path, max_bytes=250)
+    for data in (b"a" * 100, b"b" * 100, b"a" * 100, b"c" * 100):
+        archive.submit(data, "png")
+        archive.flush()
+    
+    assert archive.size_bytes == 200
+    remaining = {(tmp_path / name).read_bytes()[:1] for name in archive._objects}
+    assert remaining == {b"a", b"c"}
+
+
+def test_legacy_and_expired_files_are_counted_and_evicted(tmp_path):
+    old = time.time() - 3600
+    (tmp_path / "screenshot_20240101_000000_000000.png").write_bytes(b"o" * 100)
+    os.utime(tmp_path / "screenshot_20240101_000000_000000.png", (old, old))
+    (tmp_path / "screenshot_20240102_000000_000000.png").write_bytes(b"n" * 100)
+    (tmp_path / "runs").mkdir()
+    (tmp_path / "runs" / "old.jsonl").write_text("{}\n", encoding="utf-8")
+    os.utime(tmp_path / "runs" / "old.jsonl", (old, old))
+    
+    archive = ScreenshotArchive(tmp_path, max_bytes=150, max_age=60)
+    archive.submit(b"x" * 100, "png")
+    archive.flush()
+    
+    # 过期的旧文件与清单被删除；未过期的旧文件计入总大小，作为最久未引用的对象被淘汰
+    assert sorted(path.name for path in tmp_path.glob("screenshot_*")) == []
+    assert not (tmp_path / "runs" / "old.jsonl").exists()
+    assert archive.size_bytes == 100 and len(object_files(archive)) == 1
+
+
+def test_manifests_are_capped_without_max_age(tmp_path):
+    (tmp_path / "runs").mkdir()
+    for index in range(3):
+        path = tmp_path / "runs" / f"existing-{index}.jsonl"
+        path.write_text("{}\n", encoding="utf-8")
+        os.utime(path, (1000 + index, 1000 + index))
+    
+    archive = ScreenshotArchive(tmp_path, max_age=None, max_manifests=3)
+    for index in range(4):
+        with archive_run(run_id=f"run-{index}"):
+            archive.submit(bytes([index]) * 10, "png")
+            archive.submit(bytes([index]) * 20, "png")
+        archive.flush()
+    
+    # 最旧的清单（含启动前已有的）先被删除，当前运行追加写入时不重复计数
+    assert sorted(path.stem for path in archive.runs_dir.glob("*.jsonl")) == ["run-1", "run-2", "run-3"]
+    assert len(manifest(archive, "run-3")) == 2
+    assert archive._manifests == 3
+
+
+def test_full_queue_drops_and_is_reported(tmp_path, exporter):
+    archive = ScreenshotArchive(tmp_path, max_pending=1)
+    release = threading.Event()
+    write = archive._write
+    
+    def blocked_write(*args):
+        release.wait(10)
+        return write(*args)
+    
+    archive._write = blocked_write
+    try:
+        for index in range(10):
+            archive.submit(bytes([index]) * 10, "png")
+    finally:
+        release.set()
+    archive.flush()
+    
+    assert archive.dropped >= 8
+    assert archive.saved + archive.dropped == 10
+    assert exporter.archive_dropped.value() == archive.dropped
+
+
+def test_write_errors_are_reported_and_do_not_stop_the_writer(tmp_path, exporter):
+    archive = ScreenshotArchive(tmp_path)
+    archive.flush()
+    archive.objects_dir.write_text("not a directory", encoding="utf-8")
+    archive.submit(b"a" * 10, "png")
+    archive.flush()
+    assert archive.errors == 1
+    assert exporter.archive_errors.value() == 1
+    
+    archive.objects_dir.unlink()
+    archive.submit(b"b" * 10, "png")
+    archive.flush()
+    assert archive.saved == 1
@@ -0,0 +1,42 @@
+"""异步 Agent：不创建 requests 会话，写历史 / 轨迹等阻塞操作不在事件循环线程中执行"""
+
+import asyncio
+import threading
+
+from gui_agent.agent.async_agent import AsyncReActAgent
+from gui_agent.agent.base import AgentConfig, Tool, ToolResult
+from gui_agent.testing import MockLLMServer
+
+
+def test_blocking_history_updates_run_off_the_event_loop():
+    script = [{"tool_calls": [{"name": "note", "arguments": {}}]}, {"content": "完成"}]
+    threads = {}
+    
+    class Agent(AsyncReActAgent):
+        def _append_user_input(self, *args):
+            threads["user_input"] = threading.current_thread()
+            return super()._append_user_input(*args)
+        
+        def _commit_tool_result(self, tool_call, result):
+            threads["tool_result"] = threading.current_thread()
+            return super()._commit_tool_result(tool_call, result)
+        
+        def _append_final_reply(self, message):
+            threads["final_reply"] = threading.current_thread()
+            return super()._append_final_reply(message)
+    
+    async def main() -> Agent:
+        async with Agent(AgentConfig(api_url=server.url, api_key="k", model="m")) as agent:
+            assert agent._session is None
+            agent.register_tool(Tool(
+                name="note", description="", parameters={"type": "object"}, func=lambda: ToolResult(text="ok")
+            ))
+            assert await agent.arun("任务", image_base64="aGVsbG8=") == "完成"
+        return agent
+    
+    with MockLLMServer(script) as server:
+        agent = asyncio.run(main())
+    
+    assert set(threads) == {"user_input", "tool_result", "final_reply"}
+    assert all(thread is not threading.main_thread() for thread in threads.values())
+    assert [message["role"] for message in agent.messages] == ["user", "assistant", "tool", "assistant"]
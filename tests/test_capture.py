@@ -0,0 +1,77 @@
+"""截屏后端：Frame 的像素转换与缩略图、XShm 截屏（需要 X display）"""
+
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from gui_agent.backends import Frame, create_capture_backend
+
+
+def bgrx_buffer(width: int, height: int, stride: int) -> tuple[np.ndarray, np.ndarray]:
+    """模拟 XShm 共享内存：每行有填充的 BGRX 缓冲区，返回 (缓冲区, 对应的 RGB 像素)"""
+    rng = np.random.default_rng(0)
+    rgb = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    buffer = np.zeros((height, stride, 4), dtype=np.uint8)
+    buffer[:, :width, 0] = rgb[:, :, 2]
+    buffer[:, :width, 1] = rgb[:, :, 1]
+    buffer[:, :width, 2] = rgb[:, :, 0]
+    buffer[:, :width, 3] = 255
+    return buffer, rgb
+
+
+def test_bgrx_frame_converts_padded_rows_to_rgb():
+    buffer, rgb = bgrx_buffer(37, 11, stride=40)
+    frame = Frame(buffer[:, :37], channel_order="BGRX")
+    assert (frame.width, frame.height) == (37, 11)
+    
+    image = frame.to_image()
+    assert image.mode == "RGB" and image.size == (37, 11)
+    assert np.array_equal(np.asarray(image), rgb)
+    
+    # 图片是拷贝：后端复用缓冲区后不受影响
+    buffer[:] = 0
+    assert np.array_equal(np.asarray(frame.to_image()), rgb)
+
+
+def test_rgb_frame_and_image_frame_agree():
+    rgb = np.random.default_rng(1).integers(0, 256, (9, 13, 3), dtype=np.uint8)
+    from_array = Frame(rgb)
+    from_image = Frame.from_image(Image.fromarray(rgb).convert("RGBA"))
+    assert (from_image.width, from_image.height) == (13, 9)
+    assert np.array_equal(np.asarray(from_array.to_image()), rgb)
+    assert np.array_equal(from_image.array, rgb)
+
+
+def test_gray_thumbnail_averages_green_blocks():
+    buffer, rgb = bgrx_buffer(64, 32, stride=64)
+    thumbnail = Frame(buffer, channel_order="BGRX").gray_thumbnail(16)
+    assert thumbnail.shape == (8, 16)
+    expected = rgb[:, :, 1].reshape(8, 4, 16, 4).mean(axis=(1, 3)).astype(np.uint8)
+    assert np.array_equal(thumbnail, expected)
+    # 与通道顺序无关：RGB 帧的绿色通道位置相同
+    assert np.array_equal(Frame(rgb).gray_thumbnail(16), expected)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_capture_backend("gdi")
+
+
+@pytest.mark.skipif(not os.environ.get("DISPLAY"), reason="需要 X display")
+def test_xshm_grab_reuses_the_shared_buffer():
+    try:
+        backend = create_capture_backend("xshm")
+    except RuntimeError as e:
+        pytest.skip(str(e))
+    try:
+        width, height = backend.size()
+        first = backend.grab()
+        assert (first.width, first.height) == (width, height)
+        assert first.to_image().size == (width, height)
+        second = backend.grab()
+        assert np.shares_memory(first.array, second.array)
+    finally:
+        backend.close()
+        backend.close()
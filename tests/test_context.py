@@ -0,0 +1,135 @@
+"""上下文管理：截图数量上限、token 预算、按轮次淘汰与摘要"""
+
+import pytest
+
+from gui_agent.agent.context import POLICY_SUMMARIZE, POLICY_TRUNCATE, ContextManager
+
+
+def image_message(text: str) -> dict:
+    return {
+        "role": "user",
+        "content": [
+            {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}},
+            {"type": "text", "text": text},
+        ]
+    }
+
+
+def tool_turn(context: ContextManager, index: int, screenshot: bool = True) -> dict:
+    """追加一轮 tool call：assistant 消息、tool 结果、（可选）截图消息，返回截图消息"""
+    call_id = f"call_{index}"
+    context.append({
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [{"id": call_id, "type": "function", "function": {"name": "click", "arguments": "{}"}}]
+    })
+    context.append({"role": "tool", "tool_call_id": call_id, "content": f"clicked {index}"})
+    message = image_message(f"screen {index}")
+    if screenshot:
+        context.append(message, image_size=(100, 75))
+    return message
+
+
+def view_images(context: ContextManager) -> list[str]:
+    """视图中仍带图片的消息的文本"""
+    return [
+        message["content"][1]["text"]
+        for message in context.view()
+        if isinstance(message["content"], list)
+    ]
+
+
+def test_oldest_screenshots_are_downgraded_to_text():
+    context = ContextManager(max_screenshots=2)
+    context.append({"role": "user", "content": "task"})
+    for index in range(4):
+        tool_turn(context, index)
+    
+    assert view_images(context) == ["screen 2", "screen 3"]
+    assert {"role": "user", "content": "[截图已省略] screen 0"} in context.view()
+    # 完整历史不受影响
+    assert len(context.messages) == 1 + 4 * 3
+    assert context.messages[3] == image_message("screen 0")
+
+
+def test_images_since_counts_screenshots_still_in_view():
+    context = ContextManager(max_screenshots=3)
+    context.append({"role": "user", "content": "task"})
+    first = tool_turn(context, 0)
+    assert context.images_since(first) == 1
+    second = tool_turn(context, 1)
+    tool_turn(context, 2, screenshot=False)
+    assert context.images_since(first) == 2
+    assert context.images_since(second) == 1
+    
+    tool_turn(context, 3)
+    tool_turn(context, 4)
+    # first 已被降级
+    assert context.images_since(first) is None
+    assert context.images_since(second) == 3
+    assert context.images_since(image_message("screen 1")) is None
+
+
+def test_token_budget_downgrades_images_before_evicting_turns():
+    # 文本约 190 token，每张截图 100 token
+    context = ContextManager(max_screenshots=10, max_tokens=350, image_token_estimator=lambda size: 100)
+    context.append({"role": "user", "content": "task"})
+    for index in range(3):
+        tool_turn(context, index)
+    
+    # 降级两张旧截图后已在预算内，不淘汰任何轮次
+    assert context.total_tokens <= 350
+    assert context.image_tokens == 100
+    assert view_images(context) == ["screen 2"]
+    assert len(context.view()) == len(context.messages)
+    
+    # 只剩最新一张截图时仍超出预算，才淘汰最早的轮次（最新一张截图始终保留）
+    context.max_tokens = 250
+    tool_turn(context, 3)
+    assert context.total_tokens <= 250
+    assert view_images(context) == ["screen 3"]
+    assert len(context.view()) < len(context.messages)
+
+
+@pytest.mark.parametrize("policy", [POLICY_TRUNCATE, POLICY_SUMMARIZE])
+def test_turns_are_evicted_whole_and_totals_stay_consistent(policy):
+    context = ContextManager(max_screenshots=1, max_tokens=60, policy=policy)
+    context.append({"role": "user", "content": "task"})
+    for index in range(8):
+        tool_turn(context, index)
+    
+    view = context.view()
+    assert view[0] == {"role": "user", "content": "task"}
+    assert view[-1] == image_message("screen 7")
+    # tool 结果不会与对应的 assistant 消息分离
+    call_ids = {call["id"] for message in view for call in message.get("tool_calls") or []}
+    assert {message["tool_call_id"] for message in view if message["role"] == "tool"} <= call_ids
+    assert "call_0" not in call_ids
+    
+    summary = [message for message in view if str(message["content"]).startswith("[早期对话摘要]")]
+    if policy == POLICY_SUMMARIZE:
+        assert len(summary) == 1 and "click({})" in summary[0]["content"]
+    else:
+        assert summary == []
+    
+    # 增量维护的总量与重新计算一致
+    fresh = ContextManager(max_screenshots=100, policy=policy)
+    for message in view:
+        fresh.append(message, image_size=(100, 75) if isinstance(message["content"], list) else None)
+    assert context.total_tokens == fresh.total_tokens
+    assert context.total_bytes == fresh.total_bytes
+
+
+def test_byte_budget_counts_referenced_image_bytes():
+    context = ContextManager(max_screenshots=10, max_bytes=5000)
+    context.append({"role": "user", "content": "task"})
+    context.append(image_message("ref"), image_bytes=4000)
+    assert view_images(context) == ["ref"]
+    context.append(image_message("ref 2"), image_bytes=4000)
+    assert view_images(context) == ["ref 2"]
+    assert context.total_bytes <= 5000
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ContextManager(policy="drop-everything")
@@ -0,0 +1,84 @@
+"""局部截图：基准整帧不在模型的上下文中时必须发送整帧"""
+
+import pytest
+
+from gui_agent.agent.base import AgentConfig, Tool
+from gui_agent.agent.react_agent import ReActAgent
+from gui_agent.testing import MockLLMServer
+from gui_agent.tools.base import DisplaySession, ScreenCapture
+
+from tests.fakes import FakeCapture
+
+
+@pytest.fixture
+def display():
+    backend = FakeCapture()
+    screen = ScreenCapture(capture_backend=backend, save_dir=None, settle=False, delta=True)
+    return DisplaySession(capture_backend=backend, screen=screen)
+
+
+def make_agent(server: MockLLMServer, display: DisplaySession, regions: list, **config) -> ReActAgent:
+    def act(display: DisplaySession):
+        display.screen.capture_backend.touch()
+        shot = display.screen.shot(delta=True)
+        regions.append(shot.region)
+        return shot.to_tool_result("已操作。")
+    
+    agent = ReActAgent(AgentConfig(api_url=server.url, api_key="k", model="m", **config), display=display)
+    agent.register_tool(Tool(name="act", description="", parameters={"type": "object"}, func=act, accepts_display=True))
+    return agent
+
+
+def script(steps: int) -> list[dict]:
+    return [{"tool_calls": [{"name": "act", "arguments": {}}]}] * steps + [{"content": "完成"}]
+
+
+def test_delta_follows_full_frame_within_run(display):
+    regions = []
+    with MockLLMServer(script(3)) as server:
+        make_agent(server, display, regions).run("任务")
+    assert regions[0] is None
+    assert regions[1] is not None and regions[2] is not None
+
+
+def test_new_run_and_reset_start_with_full_frame(display):
+    regions = []
+    with MockLLMServer(script(2)) as server:
+        agent = make_agent(server, display, regions)
+        agent.run("任务")
+        agent.reset()
+        agent.run("任务")
+        # 另一个 Agent 共用同一屏幕：不沿用前一个 Agent 的基准帧
+        make_agent(server, display, regions).run("任务")
+    assert regions[0::2] == [None, None, None]
+    assert all(region is not None for region in regions[1::2])
+
+
+def test_full_frame_when_base_would_leave_context(display):
+    regions = []
+    with MockLLMServer(script(5)) as server:
+        make_agent(server, display, regions, max_screenshots=2, dedup_screenshots=False).run("任务")
+    # 视图最多 2 张图片：整帧 + 1 张局部截图后，下一张局部截图会挤出基准，必须重新发送整帧
+    assert [region is None for region in regions] == [True, False, True, False, True]
+
+
+def test_changes_in_deduplicated_frames_reach_the_next_delta(display):
+    regions = []
+    pixels = display.screen.capture_backend.pixels
+    
+    def paint(display: DisplaySession, x: int, size: int, value: int):
+        pixels[100:100 + size, x:x + size] = value
+        shot = display.screen.shot(delta=True)
+        regions.append(shot.region)
+        return shot.to_tool_result("已操作。")
+    
+    steps = [{"x": 20, "size": 40, "value": 0}, {"x": 100, "size": 1, "value": 150}, {"x": 20, "size": 40, "value": 100}]
+    turns = [{"tool_calls": [{"name": "paint", "arguments": step}]} for step in steps] + [{"content": "完成"}]
+    with MockLLMServer(turns) as server:
+        agent = ReActAgent(AgentConfig(api_url=server.url, api_key="k", model="m"), display=display)
+        agent.register_tool(Tool(name="paint", description="", parameters={"type": "object"}, func=paint, accepts_display=True))
+        agent.run("任务")
+    
+    # 第二步的微小变化被去重，未发送；它必须出现在下一张局部截图中
+    assert sum("未重复上传截图" in str(message["content"]) for message in agent.messages) == 1
+    assert regions[2] is not None and regions[2][2] > 100 * 1000 // 320
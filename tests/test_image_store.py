@@ -0,0 +1,81 @@
+"""图片存储：内容去重、溢出到磁盘与重新读取、close 清理、Agent 只清理自己创建的存储"""
+
+import base64
+
+from gui_agent.agent.base import AgentConfig
+from gui_agent.agent.image_store import ImageStore
+from gui_agent.agent.react_agent import ReActAgent
+
+
+def image(byte: int, size: int = 100) -> str:
+    return base64.b64encode(bytes([byte]) * size).decode("ascii")
+
+
+def test_identical_images_are_stored_once():
+    store = ImageStore()
+    first = store.put(image(1))
+    assert store.put(image(1)) == first
+    assert store.put(image(2)) != first
+    assert store.memory_bytes == 200
+    assert store.get(first) == ("image/png", bytes([1]) * 100)
+
+
+def test_least_recently_used_images_spill_to_disk_and_reload(tmp_path):
+    store = ImageStore(max_memory_bytes=250, spill_dir=tmp_path)
+    ids = [store.put(image(byte)) for byte in range(3)]
+    store.put(image(1))  # 重复存入不会重复占用空间，但会刷新 LRU 顺序
+    ids.append(store.put(image(3)))
+    
+    assert (store.memory_bytes, store.disk_bytes) == (200, 200)
+    assert sorted(path.stem for path in tmp_path.iterdir()) == sorted([ids[0], ids[2]])
+    
+    # 从磁盘读回的图片回到内存，并把最久未使用的图片挤出
+    assert store.get(ids[0]) == ("image/png", bytes([0]) * 100)
+    assert sorted(path.stem for path in tmp_path.iterdir()) == sorted([ids[1], ids[2]])
+    assert (store.memory_bytes, store.disk_bytes) == (200, 200)
+    assert store.data_url(store.ref(ids[2])) == f"data:image/png;base64,{image(2)}"
+
+
+def test_disk_limit_expires_images():
+    store = ImageStore(max_memory_bytes=100, max_disk_bytes=100)
+    ids = [store.put(image(byte)) for byte in range(3)]
+    assert store.get(ids[0]) is None
+    
+    message = {"role": "user", "content": [{"type": "image_url", "image_url": {"url": store.ref(ids[0])}}]}
+    assert store.materialize([message]) == [{"role": "user", "content": [{"type": "text", "text": "[截图已过期]"}]}]
+    assert message["content"][0]["image_url"]["url"] == store.ref(ids[0])
+
+
+def test_close_removes_spilled_files(tmp_path):
+    owned = ImageStore(max_memory_bytes=100)
+    owned.put(image(1))
+    owned.put(image(2))
+    spill_dir = owned._spill_dir
+    assert spill_dir.exists()
+    owned.close()
+    assert not spill_dir.exists()
+    assert (owned.memory_bytes, owned.disk_bytes) == (0, 0)
+    
+    # 调用方指定的溢出目录只删除其中的图片文件
+    given = ImageStore(max_memory_bytes=100, spill_dir=tmp_path)
+    given.put(image(1))
+    given.put(image(2))
+    given.close()
+    assert tmp_path.exists() and list(tmp_path.iterdir()) == []
+
+
+def test_reset_only_clears_the_agents_own_store():
+    config = AgentConfig(api_url="http://127.0.0.1:9", api_key="k", model="m")
+    shared = ImageStore()
+    shared_id = shared.put(image(1))
+    sharing = ReActAgent(config, image_store=shared)
+    owning = ReActAgent(config)
+    owned_id = owning.image_store.put(image(2))
+    
+    sharing.reset()
+    owning.reset()
+    sharing.close()
+    owning.close()
+    
+    assert shared.get(shared_id) is not None
+    assert owning.image_store.get(owned_id) is None
@@ -0,0 +1,65 @@
+"""XTest 输入后端：当前键盘布局中没有的字符不逐键输入，交给剪贴板"""
+
+import threading
+
+import pytest
+
+pytest.importorskip("Xlib")
+from Xlib import X, XK
+
+from gui_agent.backends.input import XTestInputBackend
+
+
+class FakeXDisplay:
+    """只包含小写字母、数字、空格与回车的键盘布局（keycode -> 该键位上的 keysym）"""
+    
+    def __init__(self):
+        keysyms = [ord(char) for char in "abcdefghijklmnopqrstuvwxyz0123456789 "]
+        keysyms += [XK.string_to_keysym(name) for name in ("Return", "Shift_L")]
+        self.keymap = {keycode: keysym for keycode, keysym in enumerate(keysyms, start=10)}
+        self.events: list[tuple[int, int]] = []
+    
+    def keysym_to_keycode(self, keysym: int) -> int:
+        keysym = ord(chr(keysym).lower()) if 0x41 <= keysym <= 0x5A else keysym
+        return next((keycode for keycode, value in self.keymap.items() if value == keysym), 0)
+    
+    def keycode_to_keysym(self, keycode: int, index: int) -> int:
+        return self.keymap.get(keycode, 0)
+    
+    def sync(self) -> None:
+        pass
+
+
+class FakeXTest:
+    @staticmethod
+    def fake_input(display: FakeXDisplay, event_type: int, detail: int = 0, **kwargs) -> None:
+        display.events.append((event_type, detail))
+
+
+@pytest.fixture
+def backend() -> XTestInputBackend:
+    backend = XTestInputBackend.__new__(XTestInputBackend)
+    backend._X, backend._XK, backend._xtest = X, XK, FakeXTest
+    backend._display = FakeXDisplay()
+    backend._shift = backend._display.keysym_to_keycode(XK.string_to_keysym("Shift_L"))
+    backend._lock = threading.RLock()
+    backend._batch_depth = 0
+    return backend
+
+
+def test_can_type_checks_the_keymap(backend):
+    assert backend.can_type("Hello world 42\n")
+    assert not backend.can_type("a|b")
+    assert not backend.can_type("你好")
+
+
+def test_typeable_text_is_typed_with_shift_where_needed(backend):
+    backend.type_text("Hi\n")
+    shift, h, i, enter = backend._shift, *(backend._keycode(char)[0] for char in "hi\n")
+    assert backend._display.events == [
+        (X.KeyPress, shift), (X.KeyPress, h), (X.KeyRelease, h), (X.KeyRelease, shift),
+        (X.KeyPress, i), (X.KeyRelease, i),
+        (X.KeyPress, enter), (X.KeyRelease, enter),
+    ]
+    with pytest.raises(ValueError):
+        backend.type_text("|")
@@ -0,0 +1,71 @@
+"""按需导入：import gui_agent 不加载重依赖，与子模块同名的工具函数不被子模块覆盖"""
+
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+
+def run_python(code: str) -> str:
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(code)], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+
+def test_import_does_not_load_heavy_dependencies():
+    output = run_python("""
+        import sys
+        import gui_agent, gui_agent.agent, gui_agent.tools
+        print(sorted(name for name in ("PIL", "numpy", "requests", "httpx", "pyautogui") if name in sys.modules))
+    """)
+    assert output == "[]\n"
+
+
+def test_tool_functions_are_not_shadowed_by_submodules():
+    output = run_python("""
+        import types
+        from gui_agent.tools import get_all_tools
+        get_all_tools()
+        import gui_agent.runner.runner  # 导入工具子模块
+        import gui_agent, gui_agent.tools as tools
+        from gui_agent.tools import screenshot, scroll, zoom, actions
+        values = [screenshot, scroll, zoom, actions, tools.scroll, gui_agent.actions, gui_agent.zoom]
+        print(all(callable(value) and not isinstance(value, types.ModuleType) for value in values))
+    """)
+    assert output == "True\n"
+
+
+# 先导入子模块、再访问同名导出（两种顺序各在新进程中执行）
+SUBMODULE_FIRST = {
+    "from_import": """
+        from gui_agent.tools.scroll import SCROLL_TOOL
+        from gui_agent.tools import scroll
+        value = scroll
+    """,
+    "package_attribute": """
+        import gui_agent.tools.zoom
+        import gui_agent
+        value = gui_agent.zoom
+    """,
+    "tools_attribute": """
+        import gui_agent.tools.actions
+        import gui_agent.tools
+        value = gui_agent.tools.actions
+    """,
+    "after_export": """
+        import gui_agent
+        gui_agent.screenshot
+        import gui_agent.tools.screenshot
+        value = gui_agent.tools.screenshot
+    """,
+}
+
+
+@pytest.mark.parametrize("code", SUBMODULE_FIRST.values(), ids=SUBMODULE_FIRST.keys())
+def test_exports_win_over_submodules_in_any_import_order(code):
+    output = run_python(code + """
+        import types
+        print(callable(value) and not isinstance(value, types.ModuleType))
+    """)
+    assert output == "True\n"
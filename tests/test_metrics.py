@@ -0,0 +1,195 @@
+"""运行指标：Prometheus 文本输出、直方图分桶、span 到指标的转换与 /metrics 端点"""
+
+import threading
+import time
+
+import pytest
+import requests
+
+from gui_agent import tracing
+from gui_agent.agent.base import AgentConfig
+from gui_agent.agent.react_agent import ReActAgent
+from gui_agent.agent.response_cache import ResponseCache
+from gui_agent.metrics import MetricsExporter, MetricsRegistry, MetricsServer
+from gui_agent.testing import MockLLMServer
+from gui_agent.tools.sandbox import SandboxPool
+
+
+class Collector(tracing.SpanExporter):
+    def __init__(self):
+        self.spans: list[tracing.Span] = []
+    
+    def export(self, span: tracing.Span) -> None:
+        self.spans.append(span)
+    
+    def named(self, name: str) -> list[tracing.Span]:
+        return [span for span in self.spans if span.name == name]
+
+
+@pytest.fixture
+def exporter():
+    exporter = MetricsExporter(MetricsRegistry())
+    tracing.tracer.add_exporter(exporter)
+    yield exporter
+    tracing.tracer.remove_exporter(exporter)
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests_total = registry.counter("requests_total", "请求数", ["path"])
+    requests_total.inc(path='/a"b\\c\n')
+    requests_total.inc(2, path="/")
+    registry.gauge("queue_depth", "队列长度").set(1.5)
+    registry.counter("empty_total", "未使用的计数器")
+    
+    assert registry.render() == (
+        "# HELP requests_total 请求数\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{path="/a\\"b\\\\c\\n"} 1\n'
+        'requests_total{path="/"} 2\n'
+        "# HELP queue_depth 队列长度\n"
+        "# TYPE queue_depth gauge\n"
+        "queue_depth 1.5\n"
+        "# HELP empty_total 未使用的计数器\n"
+        "# TYPE empty_total counter\n"
+        "empty_total 0\n"
+    )
+    
+    # 同名同类型返回已注册的指标，类型不同则报错
+    assert registry.counter("requests_total", "请求数", ["path"]) is requests_total
+    with pytest.raises(ValueError):
+        registry.gauge("requests_total", "请求数")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "延迟", ["model"], buckets=(1.0, 0.1))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, model="m")
+    
+    assert histogram.buckets == (0.1, 1.0, float("inf"))
+    assert histogram.count(model="m") == 4
+    assert histogram.count(model="other") == 0
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{model="m",le="0.1"} 2',
+        'latency_seconds_bucket{model="m",le="1"} 3',
+        'latency_seconds_bucket{model="m",le="+Inf"} 4',
+        'latency_seconds_sum{model="m"} 3.65',
+        'latency_seconds_count{model="m"} 4',
+    ]
+
+
+def test_llm_latency_comes_from_http_span(exporter, tmp_path):
+    collector = Collector()
+    tracing.tracer.add_exporter(collector)
+    cache = ResponseCache(tmp_path)
+    try:
+        with MockLLMServer([{"content": "完成"}], latency=0.05) as server:
+            for _ in range(2):
+                agent = ReActAgent(AgentConfig(api_url=server.url, api_key="k", model="m"), response_cache=cache)
+                assert agent.run("任务") == "完成"
+    finally:
+        tracing.tracer.remove_exporter(collector)
+    
+    # 第二次运行命中缓存，不发送请求，也不计入延迟
+    assert len(server.requests) == 1
+    assert exporter.llm_cache_hits.value(model="m") == 1
+    assert exporter.llm_duration.count(model="m", stream="false") == 1
+    
+    http, = collector.named("llm.http")
+    first_call = collector.named("llm.call")[0]
+    assert http.parent_id == first_call.span_id
+    assert http.duration_ms >= 50
+    series = exporter.llm_duration._series[("m", "false")]
+    assert series["sum"] == pytest.approx(http.duration_ms / 1000)
+    # 序列化在 llm.http 之外
+    assert collector.named("llm.serialize")[0].parent_id == first_call.span_id
+    
+    assert exporter.iterations.value() == 2
+    assert exporter.runs.value(completed="true") == 2
+    assert exporter.running.value() == 0
+
+
+def test_failed_llm_call_counts_as_error(exporter):
+    agent = ReActAgent(AgentConfig(api_url="http://127.0.0.1:9", api_key="k", model="m", timeout=1))
+    with pytest.raises(Exception):
+        agent.run("任务")
+    assert exporter.llm_errors.value(model="m") == 1
+    assert exporter.llm_duration.count(model="m", stream="false") == 0
+    assert exporter.runs.value(completed="false") == 1
+
+
+def test_sandbox_wait_tracks_queue_depth(exporter):
+    pool = SandboxPool(size=1)
+    try:
+        pool.run("pass", timeout=10)
+        busy = threading.Thread(target=pool.run, args=("import time\ntime.sleep(1)", 10))
+        busy.start()
+        time.sleep(0.2)
+        waiting = threading.Thread(target=pool.run, args=("pass", 10))
+        waiting.start()
+        
+        deadline = time.monotonic() + 1
+        while exporter.sandbox_queue.value() != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert exporter.sandbox_queue.value() == 1
+        
+        busy.join()
+        waiting.join()
+    finally:
+        pool.close()
+    
+    assert exporter.sandbox_queue.value() == 0
+    assert exporter.sandbox_wait.count() == 3
+
+
+def test_spans_started_before_enabling_do_not_underflow_gauges():
+    exporter = MetricsExporter(MetricsRegistry())
+    with tracing.span("sandbox.wait"):
+        # 启用前已开始的 span 结束时不减
+        tracing.tracer.add_exporter(exporter)
+        with tracing.span("sandbox.wait"):
+            assert exporter.sandbox_queue.value() == 1
+    tracing.tracer.remove_exporter(exporter)
+    assert exporter.sandbox_queue.value() == 0
+    assert exporter.sandbox_wait.count() == 2
+
+
+def test_span_attributes_map_to_metrics(exporter):
+    tracing.event("llm.serialize", payload_bytes=5000, images=2, image_tokens=1500)
+    tracing.event("llm.call", model="m", cached=False, prompt_tokens=10, completion_tokens=3)
+    with pytest.raises(RuntimeError):
+        with tracing.span("tool.call", tool="click"):
+            raise RuntimeError("失败")
+    tracing.event("screen.encode", format="png", bytes=2048)
+    tracing.event("sandbox.spawn_failed")
+    tracing.event("archive.write", deduplicated=True, archive_bytes=4096)
+    tracing.event("archive.dropped")
+    
+    assert exporter.llm_bytes.count() == 1
+    assert exporter.llm_images.value() == 2
+    assert exporter.llm_image_tokens.value() == 1500
+    assert exporter.llm_tokens.value(model="m", type="prompt") == 10
+    assert exporter.llm_tokens.value(model="m", type="completion") == 3
+    assert exporter.llm_cache_hits.value(model="m") == 0
+    assert exporter.tool_duration.count(tool="click") == 1
+    assert exporter.tool_errors.value(tool="click") == 1
+    assert exporter.encode_bytes.count(format="png") == 1
+    assert exporter.sandbox_spawn_failures.value() == 1
+    assert exporter.archive_writes.value(deduplicated="true") == 1
+    assert exporter.archive_bytes.value() == 4096
+    assert exporter.archive_dropped.value() == 1
+
+
+def test_metrics_server_serves_registry():
+    registry = MetricsRegistry()
+    registry.counter("served_total", "计数").inc()
+    server = MetricsServer(registry, port=0)
+    try:
+        response = requests.get(server.url, timeout=5)
+        assert response.status_code == 200
+        assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+        assert "served_total 1" in response.text
+        assert requests.get(server.url.replace("/metrics", "/other"), timeout=5).status_code == 404
+    finally:
+        server.stop()
@@ -0,0 +1,83 @@
+"""LLM 响应缓存：缓存键、LRU 淘汰、跨实例与重启后的恢复、Agent 重复运行命中缓存"""
+
+import json
+import os
+
+from gui_agent.agent.base import AgentConfig, Tool, ToolResult
+from gui_agent.agent.react_agent import ReActAgent
+from gui_agent.agent.response_cache import ResponseCache
+from gui_agent.testing import MockLLMServer
+
+
+def reply(text: str) -> dict:
+    return {"role": "assistant", "content": text}
+
+
+def entry_size(text: str) -> int:
+    return len(json.dumps({"message": reply(text)}, ensure_ascii=False).encode("utf-8"))
+
+
+def test_key_ignores_none_fields_but_not_content():
+    messages = [{"role": "user", "content": "任务"}, {"role": "assistant", "content": None, "tool_calls": []}]
+    same = [{"role": "user", "content": "任务"}, {"role": "assistant", "tool_calls": []}]
+    assert ResponseCache.key("m", None, messages) == ResponseCache.key("m", None, same)
+    assert ResponseCache.key("m", None, messages) != ResponseCache.key("other", None, messages)
+    assert ResponseCache.key("m", None, messages) != ResponseCache.key("m", [{"name": "click"}], messages)
+    assert ResponseCache.key("m", None, messages) != ResponseCache.key("m", None, messages[:1])
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=3 * entry_size("0"))
+    for key in "abc":
+        cache.put(key, reply(key))
+    assert cache.get("a") == reply("a")
+    
+    cache.put("d", reply("d"))
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == [reply(key) for key in "acd"]
+    assert cache.size_bytes == 3 * entry_size("0")
+    assert sorted(path.stem for path in tmp_path.glob("*.json")) == ["a", "c", "d"]
+    assert (cache.hits, cache.misses) == (4, 1)
+
+
+def test_lru_order_is_restored_from_access_times(tmp_path):
+    cache = ResponseCache(tmp_path)
+    for index, key in enumerate("abc"):
+        cache.put(key, reply(key))
+        os.utime(tmp_path / f"{key}.json", (1000 + index, 1000 + index))
+    os.utime(tmp_path / "a.json", (2000, 2000))
+    
+    reopened = ResponseCache(tmp_path, max_bytes=2 * entry_size("0"))
+    assert reopened.size_bytes == 2 * entry_size("0")
+    assert reopened.get("b") is None
+    assert reopened.get("a") == reply("a") and reopened.get("c") == reply("c")
+
+
+def test_instances_share_a_directory(tmp_path):
+    first, second = ResponseCache(tmp_path), ResponseCache(tmp_path)
+    first.put("k", reply("共享"))
+    assert second.get("k") == reply("共享")
+
+
+def test_corrupt_entries_are_misses_and_removed(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("k", reply("x"))
+    (tmp_path / "k.json").write_text("{", encoding="utf-8")
+    assert cache.get("k") is None
+    assert not (tmp_path / "k.json").exists()
+    assert cache.size_bytes == 0
+
+
+def test_repeated_run_is_answered_from_cache(tmp_path):
+    script = [{"tool_calls": [{"name": "note", "arguments": {}}]}, {"content": "完成"}]
+    note = Tool(name="note", description="", parameters={"type": "object"}, func=lambda: ToolResult(text="ok"))
+    cache = ResponseCache(tmp_path)
+    with MockLLMServer(script) as server:
+        for _ in range(2):
+            agent = ReActAgent(AgentConfig(api_url=server.url, api_key="k", model="m"), response_cache=cache)
+            agent.register_tool(note)
+            assert agent.run("任务") == "完成"
+            agent.close()
+        assert len(server.requests) == 2
+    assert (cache.hits, cache.misses) == (2, 2)
+
@@ -0,0 +1,166 @@
+"""批量任务运行器：屏幕复用与销毁、每个 Agent 的沙箱会话在任务结束后关闭、命令行参数"""
+
+import argparse
+import functools
+import json
+
+import pytest
+
+from gui_agent.agent.base import AgentConfig
+from gui_agent.runner import cli
+from gui_agent.runner.runner import Task, TaskRunner, summarize
+from gui_agent.testing import MockLLMServer
+from gui_agent.tools import sandbox
+from gui_agent.tools.base import DisplaySession, ScreenCapture
+
+from tests.fakes import FakeCapture, FakeInput
+
+
+class FakeDisplay:
+    """内存中的屏幕，接口同 XvfbDisplay"""
+    
+    def __init__(self, number: int):
+        self.name = f":{number}"
+        self.alive = True
+        capture = FakeCapture()
+        screen = ScreenCapture(capture_backend=capture, save_dir=None, settle=False)
+        self.session = DisplaySession(capture_backend=capture, input_backend=FakeInput(), screen=screen)
+
+
+class FakeDisplayPool:
+    """按需创建内存屏幕的屏幕池，记录创建与归还"""
+    
+    def __init__(self):
+        self.created: list[FakeDisplay] = []
+        self.released: list[tuple[str, bool]] = []
+        self._idle: list[FakeDisplay] = []
+        self.closed = False
+    
+    def acquire(self) -> FakeDisplay:
+        if self._idle:
+            return self._idle.pop()
+        display = FakeDisplay(len(self.created))
+        self.created.append(display)
+        return display
+    
+    def release(self, display: FakeDisplay, reuse: bool = True) -> None:
+        self.released.append((display.name, reuse))
+        if reuse:
+            self._idle.append(display)
+        else:
+            display.alive = False
+    
+    def close(self) -> None:
+        self.closed = True
+
+
+def responder(body: dict) -> dict:
+    """每个任务先点击并执行一段 Python，再给出最终回复"""
+    if any(message["role"] == "tool" for message in body["messages"]):
+        return {"content": "完成"}
+    return {"tool_calls": [
+        {"name": "click", "arguments": {"x": 500, "y": 500}},
+        {"name": "execute_python", "arguments": {"code": "value = 41\nprint(value + 1)"}},
+    ]}
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    """记录运行器为各 Agent 创建的沙箱会话及其 worker 进程"""
+    created = []
+    
+    class RecordingSession(sandbox.SandboxSession):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.processes = []
+            created.append(self)
+        
+        def run(self, *args, **kwargs):
+            result = super().run(*args, **kwargs)
+            self.processes.append(self._worker.process)
+            return result
+    
+    monkeypatch.setattr(sandbox, "SandboxSession", RecordingSession)
+    return created
+
+
+@pytest.mark.parametrize("reuse", [True, False])
+def test_tasks_share_or_replace_displays_and_close_sandbox_sessions(sessions, reuse):
+    pool = FakeDisplayPool()
+    with MockLLMServer(responder=responder) as server:
+        config = AgentConfig(api_url=server.url, api_key="k", model="m")
+        with TaskRunner(config, concurrency=1, reuse_displays=reuse, sandbox=True, display_pool=pool) as runner:
+            results = runner.run([Task("a", id="a"), Task("b", expect="完成"), Task("c", expect="不存在")])
+    
+    assert [result.task_id for result in results] == ["a", "task-1", "task-2"]
+    assert [result.success for result in results] == [True, True, False]
+    assert all(result.iterations == 2 and result.error is None for result in results)
+    assert summarize(results)["succeeded"] == 2
+    
+    assert len(pool.created) == (1 if reuse else 3)
+    # 工具操作的是任务所在屏幕
+    assert all(("click", 160, 120, "left", 1) in display.session.input.events for display in pool.created)
+    assert [reused for _, reused in pool.released] == [reuse] * 3
+    # 运行器不关闭调用方提供的屏幕池
+    assert not pool.closed
+    
+    # 每个 Agent 一个会话，任务结束后会话进程已终止
+    assert len(sessions) == 3
+    assert all(len(session.processes) == 1 for session in sessions)
+    assert all(session._worker is None and session.processes[0].poll() is not None for session in sessions)
+
+
+def test_failed_task_display_is_not_reused(monkeypatch):
+    pool = FakeDisplayPool()
+    
+    def broken_screenshot(display):
+        raise RuntimeError("屏幕已断开")
+    
+    monkeypatch.setattr("gui_agent.runner.runner.screenshot", broken_screenshot)
+    with TaskRunner(AgentConfig(api_url="http://127.0.0.1:9", api_key="k", model="m"), display_pool=pool) as runner:
+        result = runner.run_task(Task("a"))
+    
+    assert not result.success and result.error == "RuntimeError: 屏幕已断开"
+    assert pool.released == [(":0", False)]
+
+
+def test_parser_reads_options_and_environment(monkeypatch):
+    monkeypatch.setenv("GUI_AGENT_MODEL", "env-model")
+    args = cli.build_parser().parse_args([
+        "tasks.jsonl", "-j", "3", "--screen", "800X600", "--no-reuse-displays", "--sandbox", "--stream"
+    ])
+    assert args.model == "env-model"
+    assert (args.concurrency, args.screen) == (3, (800, 600))
+    assert args.no_reuse_displays and args.sandbox and args.stream
+    
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli._parse_screen_size("800")
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args(["tasks.jsonl", "--screen", "large"])
+
+
+def test_main_requires_api_options(monkeypatch, tmp_path, capsys):
+    for name in ("GUI_AGENT_API_URL", "GUI_AGENT_API_KEY", "GUI_AGENT_MODEL"):
+        monkeypatch.delenv(name, raising=False)
+    assert cli.main([str(tmp_path / "tasks.jsonl"), "--model", "m"]) == 2
+    assert "--api-url, --api-key" in capsys.readouterr().err
+
+
+def test_main_runs_task_file_and_writes_results(monkeypatch, tmp_path):
+    tasks = tmp_path / "tasks.jsonl"
+    tasks.write_text('# 注释\n\n{"prompt": "a", "id": "json-task"}\n打开设置\n', encoding="utf-8")
+    output = tmp_path / "results.jsonl"
+    pool = FakeDisplayPool()
+    monkeypatch.setattr(cli, "TaskRunner", functools.partial(TaskRunner, display_pool=pool))
+    
+    with MockLLMServer(responder=lambda body: {"content": "完成"}) as server:
+        code = cli.main([
+            str(tasks), "--api-url", server.url, "--api-key", "k", "--model", "m",
+            "-j", "1", "--no-reuse-displays", "--no-archive", "--output", str(output)
+        ])
+    
+    assert code == 0
+    results = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(result["task_id"] for result in results) == ["json-task", "task-1"]
+    assert all(result["success"] for result in results)
+    assert [reused for _, reused in pool.released] == [False, False]
@@ -0,0 +1,144 @@
+"""Python 沙箱：常驻 worker 的输出捕获、执行之间的隔离、超时、启动失败"""
+
+import subprocess
+import time
+from unittest import mock
+
+import pytest
+
+from gui_agent import tracing
+from gui_agent.tools import sandbox
+from gui_agent.tools.sandbox import SandboxPool, SandboxSession, _execute_in_pool, _execute_in_subprocess
+
+# 用户代码启动的、比超时更长寿的后台进程（会继承输出管道）
+BACKGROUND_CHILD = "import subprocess, time\nsubprocess.Popen('sleep 6', shell=True)\n"
+
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool(size=1, max_runs=100)
+    yield pool
+    pool.close()
+
+
+def test_pool_captures_output_of_child_processes(pool):
+    result = pool.run(
+        "import os, sys\n"
+        "print('from-python')\n"
+        "os.system('echo from-child')\n"
+        "os.system('echo child-err >&2')\n",
+        timeout=10
+    )
+    assert "from-python" in result["stdout"]
+    assert "from-child" in result["stdout"]
+    assert "child-err" in result["stderr"]
+    assert result["returncode"] == 0
+
+
+def test_pool_output_is_bounded(pool):
+    result = pool.run("import os\nos.system('yes x | head -c 200000')\nprint('y' * 200000)", timeout=10, max_output=1000)
+    assert len(result["stdout"].encode("utf-8")) < 2000
+    assert "已省略" in result["stdout"]
+
+
+def test_pool_runs_do_not_share_process_state(pool):
+    first = pool.run(
+        "import os, sys\n"
+        "print(sys.argv, __file__)\n"
+        "sys.argv.append('leak'); sys.path.append('/leak'); os.environ['SANDBOX_LEAK'] = '1'\n"
+        "leaked = True\n",
+        timeout=10
+    )
+    assert first["stdout"] == "['<sandbox>'] <sandbox>\n"
+    second = pool.run(
+        "import os, sys\n"
+        "print(sys.argv, '/leak' in sys.path, os.environ.get('SANDBOX_LEAK'), 'leaked' in globals())\n",
+        timeout=10
+    )
+    assert second["stdout"] == "['<sandbox>'] False None False\n"
+
+
+def test_session_keeps_variables_and_captures_child_output():
+    session = SandboxSession(idle_timeout=None)
+    try:
+        session.run("x = 41", timeout=10)
+        result, lost_reason = session.run("import os\nos.system('echo child')\nprint(x + 1)", timeout=10)
+    finally:
+        session.close()
+    assert lost_reason is None
+    assert "child" in result["stdout"] and "42" in result["stdout"]
+
+
+def test_pool_timeout_kills_worker_and_its_children(pool):
+    start = time.monotonic()
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run(BACKGROUND_CHILD + "time.sleep(30)", timeout=1)
+    assert time.monotonic() - start < 5
+    # 超时后池子仍可用
+    assert pool.run("print('ok')", timeout=10)["stdout"] == "ok\n"
+
+
+def test_subprocess_timeout_is_not_held_by_grandchild():
+    start = time.monotonic()
+    result = _execute_in_subprocess(BACKGROUND_CHILD + "time.sleep(30)", timeout=1, max_output_bytes=None)
+    assert time.monotonic() - start < 5
+    assert "超时" in result.text
+
+
+def test_subprocess_returns_when_background_child_keeps_pipe_open():
+    start = time.monotonic()
+    result = _execute_in_subprocess(BACKGROUND_CHILD + "print('done')", timeout=10, max_output_bytes=None)
+    assert time.monotonic() - start < 5
+    assert "done" in result.text
+
+
+@pytest.mark.parametrize("code", [
+    "import threading, time\n"
+    "threading.Thread(target=lambda: (time.sleep(0.5), print('late-output')), daemon=True).start()\n",
+    "import builtins\nbuiltins.open = None\n",
+])
+def test_pool_recycles_worker_with_leftover_state(pool, code):
+    first = pool.run("import os\nprint(os.getpid())\n" + code, timeout=10)
+    time.sleep(0.2)
+    second = pool.run("import os, time\ntime.sleep(0.6)\nprint(os.getpid(), open is None)\n", timeout=10)
+    pid, open_is_none = second["stdout"].split()
+    assert pid != first["stdout"].strip() and open_is_none == "False"
+    assert "late-output" not in second["stdout"]
+
+
+def test_pool_keeps_worker_without_leftover_state(pool):
+    code = "import os, threading\nthread = threading.Thread(target=print)\nthread.start()\nthread.join()\nprint(os.getpid())"
+    pids = {pool.run(code, timeout=10)["stdout"].split()[-1] for _ in range(3)}
+    assert len(pids) == 1
+
+
+class EventCollector(tracing.SpanExporter):
+    def __init__(self):
+        self.spans: list[tracing.Span] = []
+    
+    def export(self, span: tracing.Span) -> None:
+        self.spans.append(span)
+
+
+def test_pool_spawn_failures_are_reported_and_fall_back(monkeypatch):
+    collector = EventCollector()
+    tracing.tracer.add_exporter(collector)
+    monkeypatch.setattr(sandbox, "WORKER_SPAWN_RETRY_DELAY", 0)
+    monkeypatch.setattr(sandbox, "SandboxWorker", mock.Mock(side_effect=OSError("no more processes")))
+    pool = SandboxPool(size=1)
+    try:
+        deadline = time.monotonic() + 5
+        while pool._workers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool._workers == 0
+        failures = [span for span in collector.spans if span.name == "sandbox.spawn_failed"]
+        assert [span.attributes["attempt"] for span in failures] == [1, 2, 3]
+        
+        # 没有可用 worker 时改为启动新进程执行，并在后台重新补充 worker
+        monkeypatch.undo()
+        result = _execute_in_pool(pool, "print('fallback')", timeout=10, max_output_bytes=None)
+        assert result.text.strip().endswith("fallback")
+        assert pool.run("print('pooled')", timeout=10)["stdout"] == "pooled\n"
+    finally:
+        tracing.tracer.remove_exporter(collector)
+        pool.close()
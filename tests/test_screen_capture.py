@@ -0,0 +1,53 @@
+"""ScreenCapture：current_hash 与 shot 的 image_hash 可比较，HiDPI 屏幕上 zoom 返回原生像素"""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from gui_agent.tools.base import ScreenCapture
+
+from tests.fakes import FakeCapture
+
+
+@pytest.fixture
+def backend():
+    backend = FakeCapture(width=640, height=400)
+    backend.pixels[:] = np.random.default_rng(0).integers(0, 256, backend.pixels.shape, dtype=np.uint8)
+    return backend
+
+
+@pytest.mark.parametrize("scale_factor", [1.0, 2.0])
+@pytest.mark.parametrize("overview_scale", [1.0, 0.5, 0.3])
+def test_current_hash_matches_shot_hash(backend, overview_scale, scale_factor):
+    screen = ScreenCapture(capture_backend=backend, save_dir=None, settle=False, overview_scale=overview_scale)
+    screen.scale_factor = scale_factor
+    assert screen.current_hash() == screen.shot().image_hash
+    backend.touch()
+    assert screen.current_hash() == screen.shot().image_hash
+
+
+def test_current_hash_does_not_replace_the_pyramid(backend):
+    screen = ScreenCapture(capture_backend=backend, save_dir=None, settle=False, overview_scale=0.5)
+    screen.shot()
+    pyramid = screen._pyramid
+    backend.pixels[:] = 0
+    screen.current_hash()
+    # 金字塔仍是上一次 shot 的帧（zoom 基于它裁剪）
+    assert screen._pyramid is pyramid and np.asarray(pyramid[0]).any()
+
+
+def test_hidpi_zoom_crops_native_pixels(backend):
+    screen = ScreenCapture(capture_backend=backend, save_dir=None, settle=False)
+    screen.scale_factor = 2.0
+    overview = screen.shot()
+    # 概览图为逻辑分辨率
+    assert (overview.width, overview.height) == (320, 200)
+    
+    zoomed = screen.zoom(500, 500, 600, 600)
+    assert (zoomed.width, zoomed.height) == (64, 40)
+    expected = backend.pixels[200:240, 320:384]
+    pixels = np.asarray(Image.open(io.BytesIO(base64.b64decode(zoomed.base64))).convert("RGB"))
+    assert np.array_equal(pixels, expected)
@@ -0,0 +1,171 @@
+"""流式响应：StreamAssembler 的增量组装，以及生成过程中提交的工具不计入 llm.call 的耗时"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from gui_agent import tracing
+from gui_agent.agent.async_agent import AsyncReActAgent
+from gui_agent.agent.base import AgentConfig, Tool, ToolResult
+from gui_agent.agent.react_agent import ReActAgent
+from gui_agent.agent.streaming import StreamAssembler
+from gui_agent.testing import MockLLMServer
+
+
+def tool_delta(index=None, id=None, name=None, arguments=None) -> dict:
+    delta = {"function": {}}
+    if index is not None:
+        delta["index"] = index
+    if id is not None:
+        delta["id"] = id
+    if name is not None:
+        delta["function"]["name"] = name
+    if arguments is not None:
+        delta["function"]["arguments"] = arguments
+    return delta
+
+
+def chunk(*tool_deltas, content=None) -> dict:
+    delta = {"tool_calls": list(tool_deltas)} if tool_deltas else {}
+    if content is not None:
+        delta["content"] = content
+    return {"choices": [{"delta": delta}]}
+
+
+def ready_names(ready: list[tuple[int, dict]]) -> list[tuple[int, str, str]]:
+    return [(position, call["function"]["name"], call["function"]["arguments"]) for position, call in ready]
+
+
+def test_complete_json_is_ready_before_the_next_index():
+    assembler = StreamAssembler()
+    assert assembler.feed_chunk(chunk(tool_delta(0, "a", "click", '{"x": '))) == []
+    assert ready_names(assembler.feed_chunk(chunk(tool_delta(0, arguments="1}")))) == [(0, "click", '{"x": 1}')]
+    # 已返回过的 tool call 不会因为下一个 index 出现而重复返回
+    assert assembler.feed_chunk(chunk(tool_delta(1, "b", "type", '{"text"'))) == []
+    assert ready_names(assembler.finish()) == [(1, "type", '{"text"')]
+    assert assembler.finish() == []
+
+
+def test_next_index_completes_calls_without_arguments():
+    assembler = StreamAssembler()
+    assert assembler.feed_chunk(chunk(tool_delta(0, "a", "screenshot"))) == []
+    assert ready_names(assembler.feed_line("data: " + json.dumps(chunk(tool_delta(1, "b", "wait"))))) == [
+        (0, "screenshot", "")
+    ]
+    assert ready_names(assembler.finish()) == [(1, "wait", "")]
+
+
+def test_interleaved_indices_wait_for_complete_arguments():
+    assembler = StreamAssembler()
+    assert assembler.feed_chunk(chunk(tool_delta(0, "a", "click", '{"x"'))) == []
+    assert assembler.feed_chunk(chunk(tool_delta(1, "b", "type", '{"text": "hi"'))) == []
+    assert ready_names(assembler.feed_chunk(chunk(tool_delta(0, arguments=": 1}")))) == [(0, "click", '{"x": 1}')]
+    assert ready_names(assembler.feed_chunk(chunk(tool_delta(1, arguments="}")))) == [(1, "type", '{"text": "hi"}')]
+    
+    message = assembler.message()
+    assert [call["function"]["arguments"] for call in message["tool_calls"]] == ['{"x": 1}', '{"text": "hi"}']
+
+
+def test_missing_ids_and_indices_keep_positions():
+    assembler = StreamAssembler()
+    ready = []
+    for delta in (
+        tool_delta(name="click", arguments='{"x"'),
+        tool_delta(arguments=": 1}"),
+        tool_delta(name="click", arguments="{}"),
+        tool_delta(3, name="wait", arguments="{}"),
+    ):
+        ready.extend(assembler.feed_chunk(chunk(delta)))
+    ready.extend(assembler.finish())
+    
+    assert ready_names(ready) == [(0, "click", '{"x": 1}'), (1, "click", "{}"), (2, "wait", "{}")]
+    assert [call["id"] for call in assembler.message()["tool_calls"]] == ["", "", ""]
+
+
+def test_content_usage_and_errors():
+    assembler = StreamAssembler()
+    for line in ("", ": keep-alive", "event: ping", 'data: {"choices": [{"delta": {"content": "你"}}]}'):
+        assert assembler.feed_line(line) == []
+    assembler.feed_chunk({"choices": [{"delta": {"content": "好"}}], "usage": {"total_tokens": 3}})
+    assert assembler.feed_line("data: [DONE]") == []
+    assert assembler.finish() == []
+    assert assembler.message() == {"role": "assistant", "content": "你好"}
+    assert assembler.usage == {"total_tokens": 3}
+    
+    with pytest.raises(RuntimeError):
+        assembler.feed_chunk({"error": {"message": "overloaded"}})
+
+
+# 屏幕工具比整个响应流慢得多
+TOOL_SECONDS = 0.3
+SCRIPT = [
+    {"tool_calls": [{"name": "slow", "arguments": {}}, {"name": "slow", "arguments": {}}]},
+    {"content": "完成"},
+]
+
+
+class Collector(tracing.SpanExporter):
+    def __init__(self):
+        self.spans: list[tracing.Span] = []
+    
+    def export(self, span: tracing.Span) -> None:
+        self.spans.append(span)
+    
+    def named(self, name: str) -> list[tracing.Span]:
+        return [span for span in self.spans if span.name == name]
+
+
+@pytest.fixture
+def collector():
+    collector = Collector()
+    tracing.tracer.add_exporter(collector)
+    yield collector
+    tracing.tracer.remove_exporter(collector)
+
+
+def register_slow(agent: ReActAgent) -> None:
+    def slow() -> ToolResult:
+        time.sleep(TOOL_SECONDS)
+        return ToolResult(text="ok")
+    
+    agent.register_tool(Tool(name="slow", description="", parameters={"type": "object"}, func=slow))
+
+
+def assert_tools_outside_llm_call(collector: Collector) -> None:
+    first_call = collector.named("llm.call")[0]
+    first_iteration = collector.named("agent.iteration")[0]
+    tool_calls = collector.named("tool.call")
+    
+    assert len(tool_calls) == 2
+    assert all(span.parent_id == first_iteration.span_id for span in tool_calls)
+    assert first_call.parent_id == first_iteration.span_id
+    assert first_call.duration_ms < TOOL_SECONDS * 1000
+    # LLM 延迟指标来自只覆盖响应流的 llm.http
+    first_http = collector.named("llm.http")[0]
+    assert first_http.parent_id == first_call.span_id and first_http.attributes["stream"] is True
+    # 屏幕工具仍按顺序执行
+    assert tool_calls[0].start_time + TOOL_SECONDS <= tool_calls[1].start_time + 0.01
+
+
+def test_streamed_tools_run_outside_llm_call(collector):
+    with MockLLMServer(SCRIPT) as server:
+        agent = ReActAgent(AgentConfig(api_url=server.url, api_key="k", model="m", stream=True))
+        register_slow(agent)
+        assert agent.run("任务") == "完成"
+        agent.close()
+    
+    assert_tools_outside_llm_call(collector)
+
+
+def test_async_streamed_tools_run_outside_llm_call(collector):
+    async def main() -> None:
+        async with AsyncReActAgent(AgentConfig(api_url=server.url, api_key="k", model="m", stream=True)) as agent:
+            register_slow(agent)
+            assert await agent.arun("任务") == "完成"
+    
+    with MockLLMServer(SCRIPT) as server:
+        asyncio.run(main())
+    
+    assert_tools_outside_llm_call(collector)
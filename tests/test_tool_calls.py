@@ -0,0 +1,77 @@
+"""同一轮的多个 tool call：结果按位置对应，id 缺失或重复时也不会覆盖或遗漏"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from gui_agent.agent.async_agent import AsyncReActAgent
+from gui_agent.agent.base import AgentConfig, Tool, ToolResult
+from gui_agent.agent.react_agent import ReActAgent
+from gui_agent.testing import MockLLMServer
+
+
+# 并行工具 slow 比之后的屏幕工具 echo 晚完成
+SCRIPT = [
+    {"tool_calls": [
+        {"name": "slow", "arguments": {"text": "a"}, "id": "dup"},
+        {"name": "echo", "arguments": {"text": "b"}, "id": "dup"},
+        {"name": "slow", "arguments": {"text": "c"}, "id": ""},
+        {"name": "echo", "arguments": {"text": "d"}, "id": ""},
+    ]},
+    {"content": "完成"},
+]
+
+
+def register_tools(agent: ReActAgent, calls: list) -> None:
+    lock = threading.Lock()
+    
+    def echo(text: str) -> ToolResult:
+        with lock:
+            calls.append(text)
+        return ToolResult(text=f"echo {text}")
+    
+    def slow(text: str) -> ToolResult:
+        time.sleep(0.05)
+        return echo(text)
+    
+    agent.register_tool(Tool(name="echo", description="", parameters={"type": "object"}, func=echo))
+    agent.register_tool(Tool(name="slow", description="", parameters={"type": "object"}, func=slow, uses_screen=False))
+
+
+def tool_messages(agent: ReActAgent) -> list[tuple[str, str]]:
+    return [(message["tool_call_id"], message["content"]) for message in agent.messages if message["role"] == "tool"]
+
+
+EXPECTED = [("dup", "echo a"), ("dup", "echo b"), ("", "echo c"), ("", "echo d")]
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_results_follow_tool_call_positions(stream):
+    calls = []
+    with MockLLMServer(SCRIPT, chunk_size=4) as server:
+        agent = ReActAgent(AgentConfig(api_url=server.url, api_key="k", model="m", stream=stream))
+        register_tools(agent, calls)
+        assert agent.run("任务") == "完成"
+        agent.close()
+    
+    assert sorted(calls) == ["a", "b", "c", "d"]
+    assert tool_messages(agent) == EXPECTED
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_async_results_follow_tool_call_positions(stream):
+    calls = []
+    
+    async def main() -> AsyncReActAgent:
+        async with AsyncReActAgent(AgentConfig(api_url=server.url, api_key="k", model="m", stream=stream)) as agent:
+            register_tools(agent, calls)
+            assert await agent.arun("任务") == "完成"
+        return agent
+    
+    with MockLLMServer(SCRIPT, chunk_size=4) as server:
+        agent = asyncio.run(main())
+    
+    assert sorted(calls) == ["a", "b", "c", "d"]
+    assert tool_messages(agent) == EXPECTED
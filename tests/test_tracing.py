@@ -0,0 +1,66 @@
+"""追踪：嵌套 span 的父子关系、JSONL 导出与过长属性截断"""
+
+import json
+
+from gui_agent import tracing
+
+
+def read_spans(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_jsonl_exporter_records_nested_spans(tmp_path):
+    exporter = tracing.JsonlExporter(tmp_path / "trace.jsonl")
+    tracing.tracer.add_exporter(exporter)
+    try:
+        with tracing.span("outer", size=3) as outer:
+            with tracing.span("inner"):
+                tracing.event("mark", ok=True)
+            outer.set(result="ok")
+        with tracing.span("other"):
+            pass
+    finally:
+        tracing.tracer.remove_exporter(exporter)
+        exporter.close()
+    
+    spans = {span["name"]: span for span in read_spans(tmp_path / "trace.jsonl")}
+    assert list(spans) == ["mark", "inner", "outer", "other"]
+    assert spans["outer"]["parent_id"] is None
+    assert spans["inner"]["parent_id"] == spans["outer"]["span_id"]
+    assert spans["mark"]["parent_id"] == spans["inner"]["span_id"]
+    assert spans["mark"]["trace_id"] == spans["inner"]["trace_id"] == spans["outer"]["trace_id"]
+    # 顶层 span 开始新的 trace
+    assert spans["other"]["trace_id"] != spans["outer"]["trace_id"]
+    assert spans["outer"]["attributes"] == {"size": 3, "result": "ok"}
+    assert spans["outer"]["duration_ms"] >= spans["inner"]["duration_ms"] >= 0
+    assert "_start" not in spans["outer"]
+    
+    # 关闭后不再写入
+    exporter.export(tracing.Span(name="late", trace_id="t", span_id="s"))
+    assert len(read_spans(tmp_path / "trace.jsonl")) == 4
+
+
+def test_jsonl_exporter_truncates_long_attributes(tmp_path):
+    code = "print(1)\n" * 1000
+    exporter = tracing.JsonlExporter(tmp_path / "trace.jsonl", max_chars=50)
+    full = tracing.JsonlExporter(tmp_path / "full.jsonl", max_chars=None)
+    span = tracing.Span(
+        name="tool.call", trace_id="t", span_id="s",
+        attributes={"tool": "execute_python", "arguments": {"code": code, "lines": [code]}, "text": "x" * 51, "count": 7}
+    )
+    for target in (exporter, full):
+        target.export(span)
+        target.close()
+    
+    attributes = read_spans(tmp_path / "trace.jsonl")[0]["attributes"]
+    truncated = attributes["arguments"]["code"]
+    assert truncated.startswith(code[:50] + "...") and len(truncated) < 100
+    assert f"共 {len(code)} 字符" in truncated
+    assert attributes["arguments"]["lines"] == [truncated]
+    assert attributes["text"].startswith("x" * 50 + "...")
+    assert (attributes["tool"], attributes["count"]) == ("execute_python", 7)
+    # 不同内容截断后仍可区分
+    assert truncated != tracing._truncate("print(1)\n" * 999, 50)
+    # span 本身不受影响
+    assert span.attributes["arguments"]["code"] == code
+    assert read_spans(tmp_path / "full.jsonl")[0]["attributes"]["arguments"]["code"] == code
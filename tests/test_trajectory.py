@@ -0,0 +1,125 @@
+"""轨迹录制与回放：画面一致时不调用 LLM，偏离或无法截屏时交由模型继续"""
+
+import numpy as np
+import pytest
+
+from gui_agent import tracing
+from gui_agent.agent.base import AgentConfig, Tool, ToolResult
+from gui_agent.agent.react_agent import ReActAgent
+from gui_agent.agent.trajectory import TrajectoryStore
+from gui_agent.testing import MockLLMServer
+from gui_agent.tools.base import DisplaySession, ScreenCapture
+
+from tests.fakes import FakeCapture
+
+
+SCRIPT = [{"tool_calls": [{"name": "act", "arguments": {"step": 1}}]}, {"content": "完成"}]
+
+
+def new_display() -> DisplaySession:
+    backend = FakeCapture()
+    screen = ScreenCapture(capture_backend=backend, save_dir=None, settle=False)
+    return DisplaySession(capture_backend=backend, screen=screen)
+
+
+def act(step: int, display: DisplaySession) -> ToolResult:
+    display.screen.capture_backend.touch()
+    return display.screen.shot().to_tool_result(f"第 {step} 步")
+
+
+def new_agent(server: MockLLMServer, store: TrajectoryStore, display: DisplaySession) -> ReActAgent:
+    agent = ReActAgent(
+        AgentConfig(api_url=server.url, api_key="k", model="m"),
+        display=display,
+        trajectory_store=store
+    )
+    agent.register_tool(Tool(name="act", description="", parameters={"type": "object"}, func=act, accepts_display=True))
+    return agent
+
+
+class Collector(tracing.SpanExporter):
+    def __init__(self):
+        self.spans: list[tracing.Span] = []
+    
+    def export(self, span: tracing.Span) -> None:
+        self.spans.append(span)
+
+
+@pytest.fixture
+def collector():
+    collector = Collector()
+    tracing.tracer.add_exporter(collector)
+    yield collector
+    tracing.tracer.remove_exporter(collector)
+
+
+@pytest.fixture
+def store(tmp_path) -> TrajectoryStore:
+    """已录制了一次成功运行的轨迹存储"""
+    store = TrajectoryStore(tmp_path)
+    with MockLLMServer(SCRIPT) as server:
+        assert new_agent(server, store, new_display()).run("任务") == "完成"
+    
+    trajectory = store.get("", "任务")
+    assert [(step.tool, step.arguments) for step in trajectory.steps] == [("act", {"step": 1})]
+    assert trajectory.steps[0].pre_hash is not None and trajectory.steps[0].post_hash is not None
+    assert trajectory.final_reply == "完成"
+    return store
+
+
+def test_matching_screen_replays_without_llm(store):
+    with MockLLMServer([{"content": "不应调用"}]) as server:
+        agent = new_agent(server, store, new_display())
+        assert agent.run("任务") == "完成"
+    
+    assert server.requests == []
+    assert agent.completed
+    assert [message["content"] for message in agent.messages if message["role"] == "tool"] == [
+        "第 1 步 截图已生成，用户将上传截图。"
+    ]
+
+
+def test_diverged_screen_falls_back_to_llm(store, collector):
+    display = new_display()
+    display.screen.capture_backend.pixels[:] = np.random.default_rng(0).integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    with MockLLMServer([{"content": "模型完成"}]) as server:
+        agent = new_agent(server, store, display)
+        assert agent.run("任务") == "模型完成"
+    
+    assert len(server.requests) == 1
+    assert [span.attributes["step"] for span in collector.spans if span.name == "replay.diverged"] == [1]
+    # 模型完成后覆盖旧轨迹
+    assert store.get("", "任务").final_reply == "模型完成"
+
+
+def test_failing_screen_hash_falls_back_to_llm(store, collector):
+    display = new_display()
+    
+    def broken_current_hash():
+        raise OSError("截屏失败")
+    
+    display.screen.current_hash = broken_current_hash
+    with MockLLMServer([{"content": "模型完成"}]) as server:
+        assert new_agent(server, store, display).run("任务") == "模型完成"
+    assert len(server.requests) == 1
+    assert any(span.name == "replay.diverged" for span in collector.spans)
+
+
+def test_agents_without_screen_tools_never_capture(tmp_path, monkeypatch):
+    def no_display():
+        raise AssertionError("不应截屏")
+    
+    monkeypatch.setattr("gui_agent.tools.base.get_default_display", no_display)
+    store = TrajectoryStore(tmp_path)
+    for script in (SCRIPT, []):
+        with MockLLMServer(script) as server:
+            agent = ReActAgent(AgentConfig(api_url=server.url, api_key="k", model="m"), trajectory_store=store)
+            agent.register_tool(Tool(
+                name="act", description="", parameters={"type": "object"},
+                func=lambda step: ToolResult(text=f"第 {step} 步"), uses_screen=False
+            ))
+            assert agent.run("任务") == "完成"
+    
+    # 第二次运行直接回放
+    assert server.requests == []
+    assert store.get("", "任务").steps[0].pre_hash is None